@@ -0,0 +1,315 @@
+"""Headless keystroke-replay benchmark for the typing hot path.
+
+Drives ``MainWindow.eventFilter`` (and therefore ``TypingCoach.feed``) with a
+synthetic or recorded keystroke stream under ``QT_QPA_PLATFORM=offscreen`` and
+reports per-keystroke latency percentiles for the whole path plus every stage:
+
+    feed -> _update_target -> flash_* -> bubbles.spawn -> trainer.refresh -> _check_lint
+
+Usage (from the project root):
+
+    python benchmarks/keystroke_bench.py                      # synthetic run, compare to baseline
+    python benchmarks/keystroke_bench.py --stream keys.json   # replay a recorded stream
+    python benchmarks/keystroke_bench.py --update-baseline    # record new baseline (release machine)
+
+Recorded streams are JSON lists of either plain strings (one char each) or
+objects ``{"ch": "a"}``; a plain ``.txt`` file is replayed char by char.
+
+The app runs on a throwaway data directory with licensing stubbed out, so
+a run neither touches the user's profiles nor talks to any server.
+
+Exit code is 1 when any p95 exceeds ``baseline * threshold`` (default 1.25),
+so the script can gate a release build, and 2 when there is no baseline to
+compare against (none recorded, or a measured stage missing from it).
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+BASELINE_JSON = os.path.join(BENCH_DIR, "baselines.json")
+DEFAULT_THRESHOLD = 1.25
+
+STAGES = [
+    "total", "feed", "_update_target", "flash_pressed", "flash_correct",
+    "flash_wrong", "bubbles.spawn", "trainer.refresh", "_check_lint", "paint",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = (len(s) - 1) * (pct / 100.0)
+    lo = int(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def summarize(samples: Dict[str, List[float]]) -> Dict[str, dict]:
+    out = {}
+    for name in STAGES:
+        vals = samples.get(name) or []
+        if not vals:
+            continue
+        out[name] = {
+            "n": len(vals),
+            "p50_us": round(percentile(vals, 50), 1),
+            "p95_us": round(percentile(vals, 95), 1),
+            "p99_us": round(percentile(vals, 99), 1),
+        }
+    return out
+
+
+class StageTimer:
+    """Wraps bound methods on live objects and records inclusive time per call (µs)."""
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {name: [] for name in STAGES}
+        self.enabled = False
+
+    def wrap(self, obj, attr: str, name: str):
+        orig: Callable = getattr(obj, attr)
+        samples = self.samples[name]
+
+        def timed(*args, **kwargs):
+            if not self.enabled:
+                return orig(*args, **kwargs)
+            t0 = time.perf_counter_ns()
+            try:
+                return orig(*args, **kwargs)
+            finally:
+                samples.append((time.perf_counter_ns() - t0) / 1000.0)
+
+        setattr(obj, attr, timed)
+
+
+def load_stream(path: str) -> List[str]:
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        out = []
+        for entry in data:
+            ch = entry.get("ch", "") if isinstance(entry, dict) else str(entry)
+            if ch:
+                out.append(ch)
+        return out
+    with open(path, "r", encoding="utf-8") as f:
+        return [c for c in f.read() if c not in "\r\n"]
+
+
+def synthetic_stream(count: int, error_rate: float, rng: random.Random) -> List[Optional[str]]:
+    """None entries mean 'type whatever the coach expects right now'."""
+    out: List[Optional[str]] = []
+    for _ in range(count):
+        if rng.random() < error_rate:
+            out.append(rng.choice("qwertzuiopasdfghjklyxcvbnm"))
+        else:
+            out.append(None)
+    return out
+
+
+def run(args) -> Dict[str, dict]:
+    import main as app_main
+    # keep the benchmark off the network: fetches fail fast against a closed local port
+    app_main.SERVER_URL = "http://127.0.0.1:9"
+    # profiles, history, coach stats, session logs and the outbox of the run go
+    # to a throwaway directory, never into the user's data
+    data_dir = tempfile.mkdtemp(prefix="qwertype-bench-")
+    app_main.DATA_DIR = data_dir
+    app_main.HIGHSCORES_JSON = os.path.join(data_dir, "highscores.json")
+    app_main.OUTBOX_JSONL = os.path.join(data_dir, "score_outbox.jsonl")
+
+    from PySide6.QtCore import Qt, QEvent, QObject
+    from PySide6.QtGui import QKeyEvent
+    from PySide6.QtWidgets import QApplication
+
+    class OfflineLicense(app_main.LicenseManager):
+        """No lease file, no license API."""
+        def __init__(self, net=None):
+            QObject.__init__(self)
+
+        def is_active(self) -> bool:
+            return True
+
+        def activate(self, key: str):
+            pass
+
+        def check_silent(self):
+            pass
+
+    app_main.LicenseManager = OfflineLicense
+
+    app = QApplication.instance() or QApplication([])
+    theme = app_main.Theme("dark")
+    i18n = app_main.I18N(app_main.DEFAULT_LANG)
+    win = app_main.MainWindow(theme, i18n)
+    win.resize(1600, 900)
+    win.show()
+    app.processEvents()
+
+    if args.layout:
+        win.layout = args.layout
+        win.layout_table = app_main.layout_table(args.layout)
+        win.keyboard.set_layout(args.layout)
+    if args.renderer:
+        win.kb_renderer = args.renderer
+        win._rebuild_keyboard()
+    if args.mode:
+        win.mode = args.mode
+        win.coach.set_items(win._items_for_mode(args.mode))
+
+    timer = StageTimer()
+    timer.wrap(win.coach, "feed", "feed")
+    timer.wrap(win, "_update_target", "_update_target")
+    timer.wrap(win.keyboard, "flash_pressed", "flash_pressed")
+    timer.wrap(win.keyboard, "flash_correct", "flash_correct")
+    timer.wrap(win.keyboard, "flash_wrong", "flash_wrong")
+    timer.wrap(win.bubbles, "spawn", "bubbles.spawn")
+    timer.wrap(win.trainer, "refresh", "trainer.refresh")
+    timer.wrap(win, "_check_lint", "_check_lint")
+
+    win.start_session()
+    win.session_end = time.time() + 10 ** 6
+    win.overlay.hide()
+    app.processEvents()
+
+    rng = random.Random(args.seed)
+    stream = load_stream(args.stream) if args.stream else synthetic_stream(args.count, args.error_rate, rng)
+
+    total = timer.samples["total"]
+    paint = timer.samples["paint"]
+    for i, ch in enumerate(stream):
+        if ch is None:
+            ch = win.coach.expected_char() or " "
+        ev = QKeyEvent(QEvent.KeyPress, 0, Qt.NoModifier, ch)
+        timer.enabled = i >= args.warmup
+        t0 = time.perf_counter_ns()
+        win.eventFilter(win, ev)
+        t1 = time.perf_counter_ns()
+        if args.paint:
+            app.processEvents()
+        t2 = time.perf_counter_ns()
+        if timer.enabled:
+            total.append((t1 - t0) / 1000.0)
+            if args.paint:
+                paint.append((t2 - t1) / 1000.0)
+
+    # tear down without closeEvent, which would save the synthetic coach stats
+    win.session_active = False
+    win.timer.stop()
+    win.sync_timer.stop()
+    win.session_log.close()
+    win.server_sync.close()
+    win.net.shutdown()
+    win.dlc_manager.index.close()
+    win.profiles.close()
+    win.hide()
+    shutil.rmtree(data_dir, ignore_errors=True)
+    return summarize(timer.samples)
+
+
+def missing_stages(result: Dict[str, dict], baseline: dict) -> List[str]:
+    ref = baseline.get("results") or {}
+    return [name for name in result if not (ref.get(name) or {}).get("p95_us")]
+
+
+def compare(result: Dict[str, dict], baseline: dict, threshold: float) -> List[str]:
+    regressions = []
+    ref = baseline.get("results") or {}
+    for name, stats in result.items():
+        base = ref.get(name)
+        if not base or not base.get("p95_us"):
+            continue
+        limit = base["p95_us"] * threshold
+        if stats["p95_us"] > limit:
+            regressions.append(f"{name}: p95 {stats['p95_us']:.1f}µs > {limit:.1f}µs (baseline {base['p95_us']:.1f}µs)")
+    return regressions
+
+
+def print_report(result: Dict[str, dict], baseline: dict):
+    ref = baseline.get("results") or {}
+    print(f"{'stage':<18}{'n':>7}{'p50 µs':>11}{'p95 µs':>11}{'p99 µs':>11}{'base p95':>11}")
+    for name in STAGES:
+        st = result.get(name)
+        if not st:
+            continue
+        base = (ref.get(name) or {}).get("p95_us")
+        base_txt = f"{base:.1f}" if base else "-"
+        print(f"{name:<18}{st['n']:>7}{st['p50_us']:>11.1f}{st['p95_us']:>11.1f}{st['p99_us']:>11.1f}{base_txt:>11}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="qwerType keystroke latency benchmark")
+    ap.add_argument("--stream", help="recorded keystroke stream (.json or .txt)")
+    ap.add_argument("--count", type=int, default=2000, help="synthetic keystrokes (default 2000)")
+    ap.add_argument("--warmup", type=int, default=100, help="keystrokes excluded from stats")
+    ap.add_argument("--error-rate", type=float, default=0.05, help="synthetic typo rate")
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--layout", default=None, help="keyboard layout override (DE/US)")
+    ap.add_argument("--renderer", default=None, choices=["widgets", "atlas"], help="keyboard renderer override")
+    ap.add_argument("--mode", default=None, help="training mode override (words, sentences, py, ...)")
+    ap.add_argument("--no-paint", dest="paint", action="store_false", help="skip timing the repaint after each key")
+    ap.add_argument("--baseline", default=BASELINE_JSON)
+    ap.add_argument("--threshold", type=float, default=None, help=f"allowed p95 factor (default {DEFAULT_THRESHOLD})")
+    ap.add_argument("--update-baseline", action="store_true", help="write this run as the new baseline")
+    ap.add_argument("--json", dest="json_out", help="also write the raw result to this file")
+    args = ap.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    threshold = args.threshold or baseline.get("threshold", DEFAULT_THRESHOLD)
+
+    result = run(args)
+    print_report(result, baseline)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    if args.update_baseline:
+        baseline = {
+            "version": 1,
+            "threshold": threshold,
+            "recorded": int(time.time()),
+            "count": args.count,
+            "results": result,
+        }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"Baseline written: {args.baseline}")
+        return 0
+
+    if not baseline.get("results"):
+        print("\nNO BASELINE: record one with --update-baseline on the release machine.")
+        return 2
+    missing = missing_stages(result, baseline)
+    if missing:
+        print("\nNO BASELINE for: " + ", ".join(missing) + " (re-record with --update-baseline).")
+        return 2
+
+    regressions = compare(result, baseline, threshold)
+    if regressions:
+        print("\nREGRESSION (threshold x%.2f):" % threshold)
+        for r in regressions:
+            print("  " + r)
+        return 1
+    print("\nOK: within x%.2f of baseline." % threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,5 +4,6 @@ UI-independent engine + validators for DLC courses.
 """
 
 from .engine import CourseEngine, flatten_course_steps
-from .validators import validate_step
-from .ghost import GhostTyper
+from .htmlindex import HtmlIndex, index_html
+from .validators import CourseSpecError, compile_plans, validate_step
+from .ghost import DemoTimeline, GhostTyper
@@ -1,41 +1,344 @@
 from __future__ import annotations
-from PySide6.QtCore import QObject, QTimer, Signal
+import math
+import time
+from array import array
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional
+
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+
+# A demo is a list of segments ({"code", "explain", "pause"}); it is compiled
+# once into a DemoTimeline: the concatenated text, per segment the time its
+# pause starts, the time typing starts and its char offset, and the time of
+# every key. Any playhead time maps to (segment, char position) with one
+# bisect, so seeking and speed changes never replay or re-slice the text.
+#
+# Keys are evenly spaced at the timeline's WPM, or follow a timing profile
+# (any object with ``intervals(text, prev) -> [ms, ...]``, e.g. a
+# qwertype_core.TimingProfile recorded from the user's sessions), rescaled
+# per segment so the segment still takes as long as at the target WPM.
+
+EXPLAIN_KEYS = ("explain", "content", "note", "notes", "hint")
+TEXT_KEYS = ("code", "text", "snippet")
+
+
+def _first(segment: Dict[str, Any], keys) -> Any:
+    for key in keys:
+        if segment.get(key):
+            return segment[key]
+    return None
+
+
+class DemoTimeline:
+    __slots__ = ("text", "segments", "explains", "wpm", "per_char_ms", "default_pause_ms",
+                 "timing", "starts", "typing", "offsets", "keys", "duration_ms")
+
+    def __init__(self, segments: List[Dict[str, Any]], wpm: int = 120, default_pause_ms: int = 0,
+                 timing: Optional[Any] = None):
+        self.segments = [s for s in (segments or []) if isinstance(s, dict)]
+        self.explains: List[Any] = [_first(s, EXPLAIN_KEYS) for s in self.segments]
+        self.wpm = max(1, int(wpm))
+        self.per_char_ms = 60000 / self.wpm / 5
+        self.default_pause_ms = default_pause_ms
+        self.timing = timing
+        self.starts: List[float] = []   # segment i starts (pause begins); starts[-1] == duration
+        self.typing: List[float] = []   # segment i starts typing
+        self.offsets: List[int] = []    # char offset of segment i; offsets[-1] == len(text)
+        self.keys = array("d")          # keys[i]: time char i is typed (position becomes i + 1)
+        parts: List[str] = []
+        t = 0.0
+        pos = 0
+        for seg in self.segments:
+            chunk = str(_first(seg, TEXT_KEYS) or "")
+            pause = seg.get("pause", default_pause_ms)
+            try:
+                pause = max(0.0, float(pause))
+            except (TypeError, ValueError):
+                pause = float(default_pause_ms)
+            self.starts.append(t)
+            self.offsets.append(pos)
+            t += pause
+            self.typing.append(t)
+            self._add_keys(t, chunk, parts[-1][-1:] if parts else "")
+            t += len(chunk) * self.per_char_ms
+            pos += len(chunk)
+            parts.append(chunk)
+        self.starts.append(t)
+        self.offsets.append(pos)
+        self.text = "".join(parts)
+        self.duration_ms = t
+
+    def _add_keys(self, t: float, chunk: str, prev: str):
+        span = len(chunk) * self.per_char_ms
+        gaps = self.timing.intervals(chunk, prev) if self.timing is not None and chunk else None
+        total = sum(gaps) if gaps else 0.0
+        if total <= 0:
+            self.keys.extend(t + (j + 1) * self.per_char_ms for j in range(len(chunk)))
+            return
+        scale = span / total
+        for g in gaps:
+            t += g * scale
+            self.keys.append(t)
+
+    @classmethod
+    def from_ghost(cls, ghost: Optional[Dict[str, Any]], wpm: int = 120,
+                   timing: Optional[Any] = None) -> "DemoTimeline":
+        """A step's "ghost" block: its "segments", or one segment of final_code/code."""
+        ghost = ghost or {}
+        segments = ghost.get("segments")
+        if not (isinstance(segments, list) and segments):
+            segments = [{"code": str(ghost.get("final_code") or ghost.get("code") or "")}]
+        return cls(segments, wpm, timing=timing)
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def segment_at(self, t: float) -> int:
+        """Segment playing at ``t``; len(self) once the demo is over."""
+        if t >= self.duration_ms:
+            return len(self.segments)
+        return max(0, bisect_right(self.starts, t) - 1)
+
+    def position_at(self, t: float, seg: Optional[int] = None) -> int:
+        if seg is None:
+            seg = self.segment_at(t)
+        if seg >= len(self.segments):
+            return len(self.text)
+        if t < self.typing[seg]:
+            return self.offsets[seg]
+        return bisect_right(self.keys, t, self.offsets[seg], self.offsets[seg + 1])
+
+    def time_of(self, pos: int) -> float:
+        """Playhead time at which the position has just become ``pos`` (the key
+        before it is typed), so at a segment boundary the next pause is still ahead."""
+        pos = max(0, min(pos, len(self.text)))
+        return self.keys[pos - 1] if pos else 0.0
+
+    def next_event(self, seg: int, pos: int) -> float:
+        """When playback at (seg, pos) next has something to emit."""
+        if pos < self.offsets[seg + 1]:
+            return self.keys[pos]
+        return self.starts[seg + 1]
+
+    def retimed(self, wpm: int) -> "DemoTimeline":
+        return DemoTimeline(self.segments, wpm, self.default_pause_ms, self.timing)
+
 
 class GhostTyper(QObject):
-    """Small, reliable ghost typer for demos."""
+    """
+    Ghost playback engine for demos: plays a DemoTimeline with play/pause,
+    seek and playback speed.
+
+    The playhead follows a monotonic clock, not the number of timer ticks:
+    each tick emits ``typed_text`` with every character due by now (plus
+    ``typed_count``, the new position), and the timer is then set for the
+    next due key, but at most once per frame (MIN_INTERVAL_MS). A late or
+    slow tick therefore never makes the demo drift, however high the WPM.
+
+    A seek emits ``seeked(position)``; views rebuild from ``timeline.text``
+    then. ``segment_changed(i)`` fires when segment i begins (its pause,
+    i.e. the time to read its explanation, starts), ``segment_finished(i)``
+    when its text is complete. With ``hold_at_segments`` playback pauses
+    after each segment until ``play()`` is called again.
+    """
     typed_count = Signal(int)
+    typed_text = Signal(str)  # just the characters added by this tick
+    seeked = Signal(int)
+    segment_changed = Signal(int)
+    segment_finished = Signal(int)
+    state_changed = Signal(bool)  # playing
     finished = Signal()
 
+    # one tick per frame at most; faster speeds type several chars per tick
+    MIN_INTERVAL_MS = 16
+
     def __init__(self, wpm: int = 18, parent=None):
         super().__init__(parent)
         self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
         self._timer.timeout.connect(self._tick)
-        self._text = ""
+        self.wpm = max(1, int(wpm))
+        self.speed = 1.0
+        self.hold_at_segments = False
+        self.timing: Optional[Any] = None  # used by start(); load() takes it from the timeline
+        self.timeline = DemoTimeline([], self.wpm)
+        self._t = 0.0
         self._pos = 0
-        self.set_wpm(wpm)
+        self._seg = 0
+        self._playing = False
+        self._anchor = (0.0, 0.0)  # (monotonic s, playhead ms) when the clock was last set
 
-    def set_wpm(self, wpm: int):
-        interval = int(60000 / max(1, wpm) / 5)
-        self._timer.setInterval(max(8, interval))
+    # --- loading ---
 
-    def start(self, text: str):
+    def load(self, timeline: DemoTimeline):
         self.stop()
-        self._text = text or ""
+        self.timeline = timeline
+        self._t = 0.0
         self._pos = 0
-        self._timer.start()
+        self._seg = timeline.segment_at(0.0)
+        if self._seg < len(timeline):
+            self.segment_changed.emit(self._seg)
 
-    def stop(self):
-        if self._timer.isActive():
-            self._timer.stop()
+    def start(self, text: str):
+        """Type ``text`` from the beginning (a one-segment timeline)."""
+        self.load(DemoTimeline([{"code": text or ""}], self.wpm, timing=self.timing))
+        self.play()
 
-    def _tick(self):
-        if self._pos >= len(self._text):
-            self.stop()
-            self.finished.emit()
+    def set_wpm(self, wpm: int):
+        """Recompile the timeline at a new typing speed, keeping the playhead's place."""
+        self.wpm = max(1, int(wpm))
+        old = self.timeline
+        if old.wpm == self.wpm:
             return
-        self._pos += 1
-        self.typed_count.emit(self._pos)
+        self._sync()
+        new = old.retimed(self.wpm)
+        seg = self._seg
+        if seg >= len(new):
+            t = new.duration_ms
+        elif self._t < old.typing[seg]:
+            t = new.starts[seg] + (self._t - old.starts[seg])  # pauses keep their length
+        elif self._pos == new.offsets[seg]:
+            t = new.typing[seg]  # nothing of this segment typed yet
+        else:
+            t = new.time_of(self._pos)
+        self.timeline = new
+        self._t = t
+        self._reschedule()
+
+    def set_speed(self, speed: float):
+        """Playback rate (pauses included), like a video player's."""
+        self._sync()
+        self.speed = max(0.05, float(speed))
+        self._reschedule()
+
+    # --- transport ---
 
     @property
     def text(self) -> str:
-        return self._text
+        return self.timeline.text
+
+    @property
+    def position(self) -> int:
+        return self._pos
+
+    @property
+    def segment(self) -> int:
+        return self._seg
+
+    @property
+    def time_ms(self) -> float:
+        return self._clock() if self._playing else self._t
+
+    @property
+    def is_playing(self) -> bool:
+        return self._playing
+
+    @property
+    def at_end(self) -> bool:
+        return self._seg >= len(self.timeline)
+
+    def play(self):
+        if self.at_end or self._playing:
+            return
+        self._playing = True
+        self._reschedule()
+        self.state_changed.emit(True)
+
+    def pause(self):
+        if self._playing:
+            self._sync()
+            self._halt()
+
+    stop = pause
+
+    def seek(self, t_ms: float):
+        tl = self.timeline
+        t = max(0.0, min(float(t_ms), tl.duration_ms))
+        seg = tl.segment_at(t)
+        self._t = t
+        self._pos = tl.position_at(t, seg)
+        self._reschedule()
+        self.seeked.emit(self._pos)
+        self.typed_count.emit(self._pos)
+        if seg != self._seg:
+            self._seg = seg
+            if seg < len(tl):
+                self.segment_changed.emit(seg)
+
+    def seek_segment(self, i: int):
+        tl = self.timeline
+        self.seek(tl.starts[max(0, min(i, len(tl)))])
+
+    def seek_position(self, pos: int):
+        self.seek(self.timeline.time_of(pos))
+
+    # --- playback ---
+
+    def _clock(self) -> float:
+        wall, t = self._anchor
+        return t + (time.monotonic() - wall) * 1000.0 * self.speed
+
+    def _sync(self):
+        """Move the playhead to the clock, short of anything not emitted yet."""
+        if self._playing and self._seg < len(self.timeline):
+            due = self.timeline.next_event(self._seg, self._pos)
+            self._t = max(self._t, min(self._clock(), due))
+
+    def _reschedule(self):
+        """The playhead was moved (or the rate changed): restart the clock from it."""
+        self._anchor = (time.monotonic(), self._t)
+        self._arm()
+
+    def _arm(self):
+        if not self._playing:
+            return
+        if self._seg >= len(self.timeline):
+            self._timer.stop()
+            return
+        wait = (self.timeline.next_event(self._seg, self._pos) - self._clock()) / self.speed
+        self._timer.start(max(self.MIN_INTERVAL_MS, int(math.ceil(wait))))
+
+    def _halt(self):
+        self._timer.stop()
+        self._playing = False
+        self.state_changed.emit(False)
+
+    def _tick(self):
+        if not self._playing:
+            return
+        tl = self.timeline
+        self._advance(self._clock())
+        if self._playing and self.timeline is tl:
+            self._arm()
+
+    def _emit_to(self, pos: int):
+        if pos > self._pos:
+            chunk = self.timeline.text[self._pos:pos]
+            self._pos = pos
+            self.typed_text.emit(chunk)
+            self.typed_count.emit(pos)
+
+    def _advance(self, t: float):
+        tl = self.timeline
+        n = len(tl)
+        while self._seg < n:
+            end = tl.starts[self._seg + 1]
+            if t < end:
+                self._t = t
+                self._emit_to(tl.position_at(t, self._seg))
+                return
+            done = self._seg
+            self._t = end
+            self._emit_to(tl.offsets[done + 1])
+            self._seg = done + 1
+            self.segment_finished.emit(done)
+            if self.timeline is not tl or not self._playing:
+                return  # a handler loaded, seeked or stopped
+            if self._seg < n:
+                self.segment_changed.emit(self._seg)
+                if self.hold_at_segments:
+                    self._halt()
+                    return
+        self._halt()
+        self.finished.emit()
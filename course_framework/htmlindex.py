@@ -0,0 +1,120 @@
+from __future__ import annotations
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+# One streaming html.parser pass over a submission builds a flat element
+# table (tag, parent, attrs, position, closed) plus lookups by tag and id.
+# Structural checks are then answered from the tables: existence in O(1),
+# nesting by walking parents in O(depth).
+
+VOID_TAGS = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+))
+# end tag may be left out (HTML spec); closing them implicitly is not an error
+OPTIONAL_END_TAGS = frozenset((
+    "html", "head", "body", "p", "li", "dt", "dd", "option", "optgroup",
+    "tr", "td", "th", "thead", "tbody", "tfoot", "colgroup", "rt", "rp",
+))
+
+
+class HtmlIndex:
+    __slots__ = ("tags", "parents", "attrs", "positions", "closed",
+                 "by_tag", "ids", "doctype", "errors")
+
+    def __init__(self):
+        self.tags: List[str] = []
+        self.parents: List[int] = []              # -1 for top-level elements
+        self.attrs: List[Dict[str, str]] = []
+        self.positions: List[Tuple[int, int]] = []  # (line, column) of the start tag
+        self.closed: List[bool] = []              # explicit end tag seen (or void element)
+        self.by_tag: Dict[str, List[int]] = {}    # tag -> element numbers, document order
+        self.ids: Dict[str, int] = {}             # id attribute -> first element
+        self.doctype: Optional[str] = None
+        self.errors: List[Tuple[int, int, str]] = []  # (line, column, message)
+
+    def find(self, tag: str) -> List[int]:
+        return self.by_tag.get(tag, [])
+
+    def has(self, tag: str, closed: bool = True) -> bool:
+        els = self.by_tag.get(tag)
+        if not els:
+            return False
+        return not closed or any(self.closed[e] for e in els)
+
+    def within(self, el: int, ancestor_tag: str) -> bool:
+        p = self.parents[el]
+        while p >= 0:
+            if self.tags[p] == ancestor_tag:
+                return True
+            p = self.parents[p]
+        return False
+
+
+class _Builder(HTMLParser):
+    def __init__(self, index: HtmlIndex):
+        super().__init__(convert_charrefs=True)
+        self.ix = index
+        self.stack: List[int] = []
+
+    def handle_decl(self, decl):
+        if self.ix.doctype is None and decl.lower().startswith("doctype"):
+            self.ix.doctype = decl[7:].strip().lower()
+
+    def _add(self, tag, attrs) -> int:
+        ix = self.ix
+        el = len(ix.tags)
+        ix.tags.append(tag)
+        ix.parents.append(self.stack[-1] if self.stack else -1)
+        a = {k: (v if v is not None else "") for k, v in attrs}
+        ix.attrs.append(a)
+        ix.positions.append(self.getpos())
+        ix.closed.append(tag in VOID_TAGS)
+        ix.by_tag.setdefault(tag, []).append(el)
+        if "id" in a:
+            ix.ids.setdefault(a["id"], el)
+        return el
+
+    def handle_starttag(self, tag, attrs):
+        el = self._add(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.stack.append(el)
+
+    def handle_startendtag(self, tag, attrs):
+        el = self._add(tag, attrs)
+        self.ix.closed[el] = True
+
+    def handle_endtag(self, tag):
+        ix = self.ix
+        if tag in VOID_TAGS:
+            return
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if ix.tags[self.stack[depth]] == tag:
+                for el in self.stack[depth + 1:]:
+                    self._unclosed(el)
+                ix.closed[self.stack[depth]] = True
+                del self.stack[depth:]
+                return
+        line, col = self.getpos()
+        ix.errors.append((line, col, f"</{tag}> ohne öffnendes <{tag}>"))
+
+    def _unclosed(self, el: int):
+        tag = self.ix.tags[el]
+        if tag not in OPTIONAL_END_TAGS:
+            line, col = self.ix.positions[el]
+            self.ix.errors.append((line, col, f"<{tag}> wird nicht geschlossen"))
+
+    def finish(self):
+        self.close()
+        for el in self.stack:
+            self._unclosed(el)
+        self.stack.clear()
+        self.ix.errors.sort()
+
+
+def index_html(code: str) -> HtmlIndex:
+    ix = HtmlIndex()
+    b = _Builder(ix)
+    b.feed(code or "")
+    b.finish()
+    return ix
@@ -1,53 +1,168 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import re
 
-def _has_tag(code_lower: str, tag: str) -> bool:
-    tag = (tag or "").strip().lower()
-    if not tag:
-        return True
-    return f"<{tag}" in code_lower and f"</{tag}>" in code_lower
+from .htmlindex import HtmlIndex, index_html
+
+# Checks are compiled once per step into a ValidationPlan: regexes are
+# pre-compiled and structural checks (elements, attributes, nesting, order)
+# are answered from one HtmlIndex, built by a single parser pass the first
+# time a run needs it. The plan is stored on the (flattened) step and
+# rebuilt when the step's validation_checks are replaced (spec reloaded).
+
+PATTERN_FLAGS = re.IGNORECASE | re.MULTILINE
+_SELECTOR_RE = re.compile(r"^\s*([a-zA-Z][a-zA-Z0-9-]*)?\s*\[\s*([^\]\s=]+)\s*\]\s*$")
+
+# plain checks
+_CONTAINS, _REGEX, _LOWER = range(3)
+# structural checks: (kind, arg, fail) with arg evaluated against the HtmlIndex
+_ELEMENT, _ATTR, _NESTED = range(10, 13)
+
+
+class CourseSpecError(ValueError):
+    """Invalid validation checks in a course spec (found when it is loaded)."""
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
 
-def validate_step(step: Dict[str, Any], code: str) -> Tuple[bool, str]:
-    """Validate user input for a step. Returns (ok, message)."""
-    checks: List[Dict[str, Any]] = (step or {}).get("validation_checks", []) or []
-    if not checks:
-        return True, step.get("success_msg", "OK")
 
-    code = code or ""
-    low = code.lower()
+_NO_CHECKS: List[Dict[str, Any]] = []
 
-    for chk in checks:
+
+class ValidationPlan:
+    __slots__ = ("source", "checks", "errors")
+
+    def __init__(self, checks: List[Dict[str, Any]]):
+        self.source = checks
+        self.checks: List[Tuple[int, Any, str]] = []
+        self.errors: List[str] = []
+        for chk in checks:
+            self._add(chk)
+
+    def _add(self, chk: Dict[str, Any]):
         ctype = chk.get("type")
         if ctype == "element_exists":
-            target = chk.get("target", "")
-            if not _has_tag(low, target):
-                return False, chk.get("fail_msg", f"<{target}> fehlt oder ist nicht geschlossen.")
+            tag = (chk.get("target") or "").strip().lower()
+            if tag:
+                self.checks.append((_ELEMENT, tag, chk.get("fail_msg", f"<{tag}> fehlt oder ist nicht geschlossen.")))
         elif ctype == "contains":
             val = chk.get("value", "")
-            if val and val not in code:
-                return False, chk.get("fail_msg", f"Fehlt: {val}")
+            if val:
+                self.checks.append((_CONTAINS, val, chk.get("fail_msg", f"Fehlt: {val}")))
         elif ctype == "regex":
-            pat = chk.get("pattern", "")
-            flags = re.IGNORECASE | re.MULTILINE
-            try:
-                if not re.search(pat, code, flags):
-                    return False, chk.get("fail_msg", "Pattern passt nicht.")
-            except re.error:
-                return False, chk.get("fail_msg", "Ungültiges Regex im Kurs-Check.")
+            rx = self._compile(chk.get("pattern", ""))
+            self.checks.append((_REGEX, rx, chk.get("fail_msg", "Pattern passt nicht.")))
         elif ctype == "attribute_exists_or_matches_pattern":
-            pat = chk.get("pattern", "")
-            if pat:
-                try:
-                    if not re.search(pat, code, re.IGNORECASE | re.MULTILINE):
-                        return False, chk.get("fail_msg", "Attribut/Pattern stimmt nicht.")
-                except re.error:
-                    return False, chk.get("fail_msg", "Ungültiges Regex im Kurs-Check.")
+            self._add_attribute(chk)
+        elif ctype in ("nested_in", "nesting"):
+            tag = (chk.get("target") or "").strip().lower()
+            parent = (chk.get("parent") or "").strip().lower()
+            if tag and parent:
+                self.checks.append((_NESTED, (tag, parent), chk.get("fail_msg", f"<{tag}> muss in <{parent}> stehen.")))
+
+    def _add_attribute(self, chk: Dict[str, Any]):
+        pat = chk.get("pattern", "")
+        target = chk.get("target") or ""
+        fail = chk.get("fail_msg", "Attribut/Pattern stimmt nicht." if pat else "Attribut fehlt.")
+        rx = self._compile(pat) if pat else None
+        m = _SELECTOR_RE.match(target)
+        # "tag[attr]": the pattern is about the attribute value; patterns
+        # that spell out markup ("<meta ...") still run on the whole code
+        if m and not (pat and "<" in pat):
+            tag = (m.group(1) or "").lower()
+            self.checks.append((_ATTR, (tag, m.group(2).lower(), rx, bool(pat)), fail))
+        elif pat:
+            self.checks.append((_REGEX, rx, fail))
+        elif target:
+            self.checks.append((_LOWER, target.lower(), fail))
+
+    def _compile(self, pattern: str) -> Optional[re.Pattern]:
+        try:
+            return re.compile(pattern, PATTERN_FLAGS)
+        except re.error as e:
+            self.errors.append(f"{pattern!r}: {e}")
+            return None
+
+    def run(self, code: str) -> Optional[str]:
+        """None if all checks pass, else the first failure message."""
+        low = None
+        ix: Optional[HtmlIndex] = None
+        for kind, arg, fail in self.checks:
+            if kind >= _ELEMENT:
+                if ix is None:
+                    ix = index_html(code)
+                msg = _STRUCTURAL[kind](ix, arg, fail)
+                if msg is not None:
+                    return msg
+            elif kind == _CONTAINS:
+                if arg not in code:
+                    return fail
+            elif kind == _REGEX:
+                if arg is None:
+                    return fail  # invalid pattern; reported by compile_plans at load
+                if not arg.search(code):
+                    return fail
             else:
-                target = chk.get("target", "")
-                if target and target.lower() not in low:
-                    return False, chk.get("fail_msg", "Attribut fehlt.")
-        else:
+                if low is None:
+                    low = code.lower()
+                if arg not in low:
+                    return fail
+        return None
+
+
+def _check_element(ix: HtmlIndex, tag: str, fail: str) -> Optional[str]:
+    return None if ix.has(tag) else fail
+
+
+def _check_attr(ix: HtmlIndex, arg, fail: str) -> Optional[str]:
+    tag, attr, rx, has_pattern = arg
+    els = ix.find(tag) if tag else range(len(ix.tags))
+    for el in els:
+        value = ix.attrs[el].get(attr)
+        if value is None:
             continue
+        if not has_pattern or (rx is not None and rx.search(value)):
+            return None
+    return fail
+
+
+def _check_nested(ix: HtmlIndex, arg, fail: str) -> Optional[str]:
+    tag, parent = arg
+    return None if any(ix.within(el, parent) for el in ix.find(tag)) else fail
+
+
+_STRUCTURAL = {
+    _ELEMENT: _check_element,
+    _ATTR: _check_attr,
+    _NESTED: _check_nested,
+}
+
 
+def plan_for(step: Dict[str, Any]) -> ValidationPlan:
+    checks = step.get("validation_checks") or _NO_CHECKS
+    plan = step.get("_plan")
+    if plan is None or plan.source is not checks:
+        plan = ValidationPlan(checks)
+        step["_plan"] = plan
+    return plan
+
+
+def compile_plans(steps: List[Dict[str, Any]]) -> None:
+    """Build every step's plan up front; raises CourseSpecError listing bad patterns."""
+    errors: List[str] = []
+    for st in steps:
+        plan = plan_for(st)
+        errors.extend(f"step {st.get('id', '?')}: {e}" for e in plan.errors)
+    if errors:
+        raise CourseSpecError(errors)
+
+
+def validate_step(step: Dict[str, Any], code: str) -> Tuple[bool, str]:
+    """Validate user input for a step. Returns (ok, message)."""
+    plan = plan_for(step or {})
+    if not plan.checks:
+        return True, step.get("success_msg", "OK")
+    fail = plan.run(code or "")
+    if fail is not None:
+        return False, fail
     return True, step.get("success_msg", "✅ Korrekt!")
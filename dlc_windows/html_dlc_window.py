@@ -2,14 +2,16 @@ from __future__ import annotations
 
 from typing import Any, Dict, Optional, List
 
+from PySide6.QtGui import QTextCursor
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QFrame,
     QLabel, QPushButton, QPlainTextEdit, QTextBrowser
 )
 
-from course_framework import CourseEngine, flatten_course_steps, GhostTyper
-from course_framework.validators import validate_step
+from course_framework import CourseEngine, DemoTimeline, flatten_course_steps, GhostTyper
+from course_framework.validators import compile_plans, validate_step
 from course_framework.progress import badge_for_ratio
+from dlc_windows.preview import PreviewPipeline
 
 
 class HtmlDlcWindow(QMainWindow):
@@ -30,17 +32,19 @@ class HtmlDlcWindow(QMainWindow):
 
         self.spec = spec_data or {}
         self.steps = flatten_course_steps(self.spec)
+        compile_plans(self.steps)  # raises CourseSpecError for broken checks
         self.engine = CourseEngine(self.steps)
 
+        # segmented demos stop after each segment; Run Demo plays the next one
         self.ghost = GhostTyper(wpm=120, parent=self)
-        self.ghost.typed_count.connect(self._on_ghost_typed)
+        self.ghost.hold_at_segments = True
+        self.ghost.typed_text.connect(self._on_ghost_typed)
+        self.ghost.seeked.connect(self._on_ghost_seeked)
+        self.ghost.segment_changed.connect(self._on_ghost_segment)
+        self.ghost.segment_finished.connect(self._on_ghost_segment_finished)
+        self.ghost.state_changed.connect(self._on_ghost_state)
         self.ghost.finished.connect(self._on_ghost_finished)
 
-        self._ghost_full_text = ""
-        self._ghost_base_text = ""
-        self._ghost_segment_text = ""
-        self._ghost_segments: List[Dict[str, Any]] = []
-        self._ghost_segment_index = 0
         self._ghost_segment_mode = False
 
         self._last_badge: Optional[str] = None
@@ -110,6 +114,8 @@ class HtmlDlcWindow(QMainWindow):
         self.preview = QTextBrowser()
         self.preview.setFrameShape(QFrame.NoFrame)
         wp.addWidget(self.preview, 2)
+        # debounced; skips renders that would not change what is shown
+        self.preview_pipeline = PreviewPipeline(self.preview, self)
 
         actions = QHBoxLayout()
         self.btn_check = QPushButton("Check")
@@ -209,47 +215,22 @@ class HtmlDlcWindow(QMainWindow):
     def _set_left_content(self, content: Any):
         self.txt_content.setHtml(self._content_to_html(content))
 
-    def _segment_explain_content(self, segment: Dict[str, Any]) -> Optional[Any]:
-        for key in ("explain", "content", "note", "notes", "hint"):
-            if key in segment and segment[key]:
-                return segment[key]
-        return None
-
-    def _apply_segment_explain(self, segment: Dict[str, Any]):
-        content = self._segment_explain_content(segment)
-        if content is None:
-            return
-        self._set_left_content(content)
-
-    def _reset_ghost_state(self):
-        self._ghost_full_text = ""
-        self._ghost_base_text = ""
-        self._ghost_segment_text = ""
-        self._ghost_segments = []
-        self._ghost_segment_index = 0
-        self._ghost_segment_mode = False
-
-    def _setup_ghost_segments(self, step: Dict[str, Any]):
+    def _setup_ghost(self, step: Dict[str, Any]):
         ghost = step.get("ghost", {}) or {}
-        segments = ghost.get("segments") or []
-        if isinstance(segments, list) and segments:
-            self._ghost_segments = segments
-            self._ghost_segment_index = 0
-            self._ghost_segment_mode = True
-            self._apply_segment_explain(segments[0])
-            self._update_run_demo_label()
-        else:
-            self._ghost_full_text = str(ghost.get("final_code") or ghost.get("code") or "")
-            self._ghost_segment_mode = False
-            self._update_run_demo_label()
+        segments = ghost.get("segments")
+        self._ghost_segment_mode = isinstance(segments, list) and bool(segments)
+        # replay the user's own key rhythm when the main window has one recorded
+        demo_timing = getattr(self.main, "demo_timing", None)
+        timing = demo_timing() if callable(demo_timing) else None
+        self.ghost.load(DemoTimeline.from_ghost(ghost, self.ghost.wpm, timing=timing))
+        self._update_run_demo_label()
 
     def _update_run_demo_label(self):
         if not self._ghost_segment_mode:
             self.btn_run_demo.setText("Run Demo")
-            return
-        if self._ghost_segment_index >= len(self._ghost_segments):
+        elif self.ghost.at_end:
             self.btn_run_demo.setText("Replay")
-        elif self._ghost_segment_index == 0 and not self._ghost_base_text:
+        elif self.ghost.position == 0:
             self.btn_run_demo.setText("Run Segment")
         else:
             self.btn_run_demo.setText("Next Segment")
@@ -267,21 +248,21 @@ class HtmlDlcWindow(QMainWindow):
 
         # defaults
         self._stop_ghost()
-        self._reset_ghost_state()
+        self._ghost_segment_mode = False
         self.btn_check.setVisible(False)
         self.btn_run_demo.setVisible(False)
         self.btn_check.setEnabled(True)
         self.editor.blockSignals(True)
         self.editor.setPlainText("")
         self.editor.blockSignals(False)
-        self.preview.setHtml("")
+        self.preview_pipeline.clear()
         self.editor.setReadOnly(True)
         self.btn_continue.setEnabled(True)
 
         if stype == "ghost_demo":
             self.btn_run_demo.setVisible(True)
             self.lbl_workspace.setText("Ghost Demo")
-            self._setup_ghost_segments(step)
+            self._setup_ghost(step)
         elif stype == "now_you":
             self.btn_check.setVisible(True)
             starter = step.get("starter_code", "") or step.get("starter", "")
@@ -293,7 +274,7 @@ class HtmlDlcWindow(QMainWindow):
             requires_completion = step.get("requires_completion", True) is not False
             self.editor.setReadOnly(completed)
             self.btn_check.setEnabled(not completed)
-            self._update_preview()
+            self.preview_pipeline.render_now(self.editor.toPlainText())
             self.btn_continue.setEnabled(completed if requires_completion else True)
             self.lbl_workspace.setText("Now you")
         elif stype == "reflection":
@@ -344,79 +325,68 @@ class HtmlDlcWindow(QMainWindow):
             self.btn_continue.setEnabled(False)
         self._update_progress_ui()
 
-    def _start_ghost_segment(self, segment: Dict[str, Any]):
-        text = str(segment.get("code") or segment.get("text") or segment.get("snippet") or "")
-        self._ghost_segment_text = text
-        self.editor.setReadOnly(True)
-        self._ghost_full_text = self._ghost_base_text + text
-        self._apply_segment_explain(segment)
-        self.ghost.start(text)
-
     def _on_run_demo(self):
-        step = self.engine.current()
         if self.engine.current_type() != "ghost_demo":
             self._toast("No demo on this step.")
             return
-
-        if self._ghost_segment_mode:
-            if self._ghost_segment_index >= len(self._ghost_segments):
-                self._ghost_base_text = ""
-                self._ghost_segment_index = 0
-                self.editor.blockSignals(True)
-                self.editor.setPlainText("")
-                self.editor.blockSignals(False)
-                self.preview.setHtml("")
-            segment = self._ghost_segments[self._ghost_segment_index]
-            self._start_ghost_segment(segment)
-            return
-
-        code = self._ghost_full_text
-        if not code:
-            ghost = step.get("ghost", {}) or {}
-            code = str(ghost.get("final_code") or ghost.get("code") or "")
-        if not code:
+        if not self.ghost.text:
             self._toast("No demo code in this step.")
             return
-        self._ghost_full_text = code
         self.editor.setReadOnly(True)
-        self.editor.blockSignals(True)
-        self.editor.setPlainText("")
-        self.editor.blockSignals(False)
-        self.preview.setHtml("")
-        self.ghost.start(code)
+        if self.ghost.at_end or not self._ghost_segment_mode:
+            self.ghost.seek(0)
+        else:
+            self.ghost.seek_segment(self.ghost.segment)  # (re)type the current segment
+        self.ghost.play()
 
     def _stop_ghost(self):
         try:
             self.ghost.stop()
         except Exception:
             pass
+        self.editor.setUndoRedoEnabled(True)
 
-    def _on_ghost_typed(self, count: int):
-        if self._ghost_segment_mode and self._ghost_segment_text:
-            part = self._ghost_segment_text[:count]
-            text = self._ghost_base_text + part
-        else:
-            text = self._ghost_full_text[:count]
+    def _on_ghost_state(self, playing: bool):
+        # demo keystrokes are not undo steps
+        self.editor.setUndoRedoEnabled(not playing)
+
+    def _on_ghost_typed(self, chunk: str):
+        # append only the new characters; the editor already holds the rest
+        cursor = self.editor.textCursor()
+        cursor.movePosition(QTextCursor.End)
         self.editor.blockSignals(True)
-        self.editor.setPlainText(text)
+        cursor.insertText(chunk)
         self.editor.blockSignals(False)
-        self.preview.setHtml(text)
+        self.editor.setTextCursor(cursor)
+        self.preview_pipeline.schedule(self.editor.toPlainText)
 
-    def _on_ghost_finished(self):
-        if self._ghost_segment_mode and self._ghost_segment_text:
-            self._ghost_base_text += self._ghost_segment_text
-            self._ghost_segment_text = ""
-            self._ghost_segment_index += 1
-            self.preview.setHtml(self._ghost_base_text)
-            self._update_run_demo_label()
-            if self._ghost_segment_index < len(self._ghost_segments):
-                self._apply_segment_explain(self._ghost_segments[self._ghost_segment_index])
-                self._toast("Segment complete. Click Run Demo to continue.")
-            else:
-                self._toast("Demo finished.")
+    def _on_ghost_seeked(self, pos: int):
+        code = self.ghost.text[:pos]
+        self.editor.blockSignals(True)
+        self.editor.setPlainText(code)
+        self.editor.blockSignals(False)
+        self.editor.moveCursor(QTextCursor.End)
+        if code:
+            self.preview_pipeline.render_now(code)
+        else:
+            self.preview_pipeline.clear()
+
+    def _on_ghost_segment(self, idx: int):
+        content = self.ghost.timeline.explains[idx]
+        if content is not None:
+            self._set_left_content(content)
+
+    def _on_ghost_segment_finished(self, idx: int):
+        if not self._ghost_segment_mode:
             return
+        self.preview_pipeline.render_now(self.editor.toPlainText())
+        self._update_run_demo_label()
+        if idx + 1 < len(self.ghost.timeline):
+            self._toast("Segment complete. Click Run Demo to continue.")
 
-        self.preview.setHtml(self._ghost_full_text)
+    def _on_ghost_finished(self):
+        self.preview_pipeline.render_now(self.editor.toPlainText())
+        self._update_run_demo_label()
         self._toast("Demo finished.")
 
     def _on_editor_changed(self):
@@ -424,7 +394,7 @@ class HtmlDlcWindow(QMainWindow):
             self._update_preview()
 
     def _update_preview(self):
-        self.preview.setHtml(self.editor.toPlainText())
+        self.preview_pipeline.schedule(self.editor.toPlainText())
 
     def _toast(self, msg: str):
         try:
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import re
+import time
+from typing import Callable, Dict, Optional, Union
+
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtWidgets import QTextBrowser
+
+_WS_RE = re.compile(r"\s+")
+_TAG_START_RE = re.compile(r"<[A-Za-z/!]")
+# whitespace is rendered as typed inside these elements or under a CSS white-space rule
+_WS_KEPT_RE = re.compile(r"<(?:pre|textarea|listing|xmp|plaintext)\b|white-space", re.IGNORECASE)
+
+
+def render_key(html: str) -> str:
+    """What the preview would show, roughly: an unfinished trailing tag is
+    dropped and whitespace runs collapse, unless the document has somewhere
+    whitespace is significant (<pre>, <textarea>, ... or CSS white-space,
+    in any case). A trailing "<" only starts a tag when a name, "/" or "!"
+    follows it, so text such as "a < b" still changes the key."""
+    lt = html.rfind("<")
+    if lt > html.rfind(">") and _TAG_START_RE.match(html, lt):
+        html = html[:lt]
+    if _WS_KEPT_RE.search(html):
+        return html
+    return _WS_RE.sub(" ", html)
+
+
+class PreviewPipeline(QObject):
+    """
+    Coalesces preview updates for a QTextBrowser.
+
+    ``schedule`` restarts a single-shot timer; only the newest text is
+    rendered when it fires. The delay adapts to the measured render cost
+    (about twice the recent average, within MIN/MAX_DELAY_MS), so small
+    documents stay live while big ones render less often. A continuous
+    stream of edits still renders at least every MAX_DELAY_MS. Text whose
+    render key did not change since the last render is skipped.
+    """
+    MIN_DELAY_MS = 30
+    MAX_DELAY_MS = 400
+
+    def __init__(self, browser: QTextBrowser, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.browser = browser
+        self._pending: Optional[Union[str, Callable[[], str]]] = None
+        self._key: Optional[str] = None
+        self._since = 0.0  # when the oldest unrendered update arrived
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._flush)
+        self.stats: Dict[str, float] = {
+            "renders": 0, "skipped": 0, "coalesced": 0,
+            "last_ms": 0.0, "avg_ms": 0.0, "max_ms": 0.0,
+        }
+
+    def delay_ms(self) -> int:
+        return int(min(self.MAX_DELAY_MS, max(self.MIN_DELAY_MS, 2.0 * self.stats["avg_ms"])))
+
+    def schedule(self, html: Union[str, Callable[[], str]]):
+        """``html`` may be a callable; it is only called when the render is due."""
+        now = time.monotonic()
+        if self._pending is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self._since = now
+        self._pending = html
+        left = self.MAX_DELAY_MS - (now - self._since) * 1000.0
+        self._timer.start(int(max(0.0, min(self.delay_ms(), left))))
+
+    def render_now(self, html: str):
+        """Render immediately (step change, demo end); drops anything pending."""
+        self._pending = html
+        self._flush()
+
+    def clear(self):
+        self._timer.stop()
+        self._pending = None
+        self._key = ""
+        self.browser.setHtml("")
+
+    def _flush(self):
+        self._timer.stop()
+        html, self._pending = self._pending, None
+        if html is None:
+            return
+        if callable(html):
+            html = html()
+        key = render_key(html)
+        if key == self._key:
+            self.stats["skipped"] += 1
+            return
+        self._key = key
+        t0 = time.perf_counter()
+        self.browser.setHtml(html)
+        ms = (time.perf_counter() - t0) * 1000.0
+        s = self.stats
+        s["renders"] += 1
+        s["last_ms"] = ms
+        s["max_ms"] = max(s["max_ms"], ms)
+        # exponential moving average, so the debounce follows document size
+        s["avg_ms"] = ms if s["renders"] == 1 else 0.8 * s["avg_ms"] + 0.2 * ms
+        self.browser.setToolTip(
+            f"Preview render: {ms:.1f} ms (avg {s['avg_ms']:.1f}, max {s['max_ms']:.1f}) · "
+            f"{int(s['renders'])} renders, {int(s['skipped'])} unchanged, {int(s['coalesced'])} coalesced"
+        )
@@ -5,13 +5,23 @@ import time
 import random
 import math
 import re
-import requests
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
-from threading import Thread, Lock
+import heapq
+import asyncio
+from html import escape as html_escape
+from urllib.parse import quote
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+from threading import Lock
 from pathlib import Path
 from datetime import datetime, timezone
 from html_dlc_window import HtmlDlcWindow
+from dlc_windows.preview import PreviewPipeline
+from course_framework import CourseSpecError, DemoTimeline, GhostTyper
+from qwertype_core import (
+    NOT_MODIFIED, CorpusRegistry, CorpusView, DlcIndex, DrillSampler, GenerationToken, KeyDef,
+    LayoutRegistry, LayoutTable, NetLoop, Outbox, ProfileIndex, ResponseCache, ScoreHistory,
+    SessionLogWriter, Timeouts, TimingProfile, list_sessions, read_json, weakness, write_atomic,
+)
 import platform
 
 from PySide6.QtCore import (
@@ -19,13 +29,13 @@ from PySide6.QtCore import (
     QEasingCurve, QPropertyAnimation, QThread, QObject
 )
 from PySide6.QtGui import (
-    QColor, QPainter, QPen, QFont, QPixmap, QGuiApplication, QRadialGradient
+    QColor, QPainter, QPen, QFont, QPixmap, QGuiApplication, QRadialGradient, QTextCursor
 )
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QVBoxLayout, QHBoxLayout,
     QFrame, QLineEdit, QPushButton, QStackedWidget, QSizePolicy, QSpacerItem,
     QComboBox, QCheckBox, QDialog, QScrollArea, QGraphicsOpacityEffect,
-    QPlainTextEdit, QTextBrowser
+    QPlainTextEdit, QTextBrowser, QInputDialog
 )
 
 # ============================================================
@@ -41,10 +51,33 @@ I18N_DIR = os.path.join(BASE_DIR, "i18n")
 DATA_DIR = os.path.join(BASE_DIR, "data")
 DEFAULT_LANG = "de"
 
-SETTINGS_JSON = os.path.join(DATA_DIR, "settings.json")
-HIGHSCORES_JSON = os.path.join(DATA_DIR, "highscores.json")
+# settings.json, history.sqlite3, coach_stats.json and sessions/ are per
+# profile; the default profile keeps them directly in DATA_DIR
+HIGHSCORES_JSON = os.path.join(DATA_DIR, "highscores.json")  # legacy, migrated into the default profile's history
+SETTINGS_DEFAULTS = {
+    "name": "",
+    "lang": DEFAULT_LANG,
+    "layout": "DE",
+    "mode": "words",
+    "win_mode": "windowed",
+    "theme": "dark",
+    "kb_renderer": "widgets",
+    "demo_rhythm": True,
+}
+OUTBOX_JSONL = os.path.join(DATA_DIR, "score_outbox.jsonl")
+CORPUS_DIR = os.path.join(DATA_DIR, "corpora")
+WORDLIST_TXT = os.path.join(BASE_DIR, "wordlist.txt")
 SERVER_URL = "https://qwertype.morina-solutions.com"
 
+# Scripted DLC demos: slow enough to follow, and the reading time before a
+# step is typed when the step has no "pause" of its own
+DEMO_WPM = 120
+DEMO_PAUSE_MS = 4000
+# with "demo_rhythm" on, demos replay the profile's own key timing, learned
+# from its most recent session logs (needs a few hundred keystrokes)
+DEMO_RHYTHM_SESSIONS = 20
+DEMO_RHYTHM_MIN_KEYS = 200
+
 DEFAULT_WORDS_DE = [
     "möchten", "tastatur", "lernen", "geschwindigkeit", "technik",
     "übung", "genauigkeit", "workflow", "python", "qwertz",
@@ -166,6 +199,9 @@ def ensure_default_i18n_files():
         "settings_mode": "Modus",
         "settings_name": "Name",
         "settings_name_ph": "Spitzname",
+        "settings_profile": "Profil",
+        "profile_new": "Neues Profil",
+        "profile_new_prompt": "Name des neuen Profils:",
         "name_invalid": "Name nicht erlaubt.",
         "name_saved": "Name gespeichert.",
         "mode_words": "Wörter",
@@ -176,6 +212,8 @@ def ensure_default_i18n_files():
         "mode_rs": "Rust",
         "mode_java": "Java",
         "setting_darkmode": "Dark Mode",
+        "setting_fast_keyboard": "Schnelle Tastatur-Darstellung",
+        "setting_demo_rhythm": "Ghost-Demos in meinem Tipp-Rhythmus",
         "apply": "Übernehmen",
         "saved": "Gespeichert",
 
@@ -199,6 +237,12 @@ def ensure_default_i18n_files():
         "lb_sentences": "Sätze",
         "lb_langs": "Code",
         "lb_none": "Noch keine Einträge.",
+        "ps_title": "Deine Statistik",
+        "ps_sessions": "Sessions",
+        "ps_top": "Deine Top 5",
+        "ps_percentiles": "Punkte-Perzentile",
+        "ps_last": "Letzte Session: {points} Punkte, mindestens so gut wie {pct:.0f}% deiner Sessions",
+        "ps_trend": "Letzte {days} Tage",
 
         # splash
         "splash_sub": "Vorbereitung…",
@@ -224,6 +268,9 @@ def ensure_default_i18n_files():
         "settings_mode": "Mode",
         "settings_name": "Name",
         "settings_name_ph": "nickname",
+        "settings_profile": "Profile",
+        "profile_new": "New profile",
+        "profile_new_prompt": "Name of the new profile:",
         "name_invalid": "Name not allowed.",
         "name_saved": "Name saved.",
         "mode_words": "Words",
@@ -234,6 +281,8 @@ def ensure_default_i18n_files():
         "mode_rs": "Rust",
         "mode_java": "Java",
         "setting_darkmode": "Dark Mode",
+        "setting_fast_keyboard": "Fast keyboard rendering",
+        "setting_demo_rhythm": "Ghost demos in my typing rhythm",
         "apply": "Apply",
         "saved": "Saved",
 
@@ -254,6 +303,12 @@ def ensure_default_i18n_files():
         "lb_sentences": "Sentences",
         "lb_langs": "Code",
         "lb_none": "No entries yet.",
+        "ps_title": "Your stats",
+        "ps_sessions": "Sessions",
+        "ps_top": "Your top 5",
+        "ps_percentiles": "Points percentiles",
+        "ps_last": "Last session: {points} points, at or above {pct:.0f}% of your sessions",
+        "ps_trend": "Last {days} days",
         "splash_sub": "Preparing…",
         "close": "Close",
         "tab_train": "Trainer",
@@ -265,20 +320,14 @@ def ensure_default_i18n_files():
     save_json(os.path.join(I18N_DIR, "en.json"), en)
 
 def load_json(path: str, fallback: dict) -> dict:
-    try:
-        if os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-    except Exception:
-        pass
-    return fallback
+    return read_json(path, fallback)
 
 def save_json(path: str, data: dict):
+    """Immediate atomic write; for state that changes often use a JsonStore"""
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    except Exception:
-        pass
+        write_atomic(path, json.dumps(data, ensure_ascii=False, indent=2))
+    except OSError as e:
+        print(f"Could not save {path}: {e}")
 
 def normalize_name(name: str) -> str:
     name = (name or "").strip()
@@ -304,79 +353,163 @@ def is_name_allowed(name: str) -> bool:
 
 class ServerSync:
     """Handles adaptive syncing with highscore server"""
-    def __init__(self):
+    BATCH_SIZE = 50
+    BACKOFF_BASE = 5.0      # seconds; doubles per failed attempt
+    BACKOFF_MAX = 15 * 60.0
+    LEADERBOARD_TTL = 60.0
+    BESTS_TTL = 120.0
+    READ_CHANNEL = "leaderboard"
+    READ_TIMEOUTS = Timeouts(connect=5.0, read=10.0, total=15.0)
+    UPLOAD_TIMEOUTS = Timeouts(connect=5.0, read=15.0, total=30.0)
+    # 4xx answers worth retrying; any other 4xx rejects the score for good
+    RETRY_4XX = (408, 425, 429)
+
+    def __init__(self, outbox_path: str = None, base_url: Optional[str] = None, net: Optional[NetLoop] = None):
         self.lock = Lock()
-        self.pending_scores = []
+        # Scores survive restarts in an append-only journal until the server has them
+        self.outbox = Outbox(outbox_path or OUTBOX_JSONL)
+        self.base_url = base_url
         self.last_activity = time.time()
         self.sync_interval = 600  # 10 minutes in seconds
         self.idle_interval = 1800  # 30 minutes in seconds
         self.timer = None
-        
+
+        # All requests run as coroutines on the shared network loop, over its pooled client
+        self.net = net or NetLoop()
+        self.http = self.net.client
+        # Leaderboard / bests reads are cached with TTL + ETag revalidation;
+        # cancel_reads() aborts them
+        self.cache = ResponseCache(max_entries=64, asynchronous=True,
+                                   submit=lambda coro: self.net.submit(coro, channel=self.READ_CHANNEL))
+
+        self._bulk_supported = True
+        self._failures = 0
+        self._retry_at = 0.0
+        self._wake: Optional[asyncio.Event] = None
+        self.net.submit(self._sync_worker(), channel="upload")
+
+    @property
+    def url(self) -> str:
+        return self.base_url or SERVER_URL
+
     def add_score(self, username: str, mode: str, wpm: float, accuracy: float, points: int, completion_pct: Optional[float] = None):
         """Queue a score for syncing"""
+        self.outbox.add({
+            "username": username,
+            "mode": mode,
+            "wpm": wpm,
+            "accuracy": accuracy,
+            "points": points,
+            "completion_pct": completion_pct
+        })
         with self.lock:
-            self.pending_scores.append({
-                "username": username,
-                "mode": mode,
-                "wpm": wpm,
-                "accuracy": accuracy,
-                "points": points,
-                "completion_pct": completion_pct
-            })
             self.last_activity = time.time()
-    
+
     def sync_now(self):
-        """Sync all pending scores to server"""
-        with self.lock:
-            if not self.pending_scores:
-                return
-            
-            scores_to_sync = self.pending_scores.copy()
-            self.pending_scores.clear()
-        
-        # Sync in background thread
-        Thread(target=self._sync_thread, args=(scores_to_sync,), daemon=True).start()
-    
-    def _sync_thread(self, scores):
-        """Background thread for syncing"""
-        for score in scores:
+        """Wake the upload worker (no-op if nothing is pending or a retry is backing off)"""
+        if len(self.outbox):
+            self.net.call_soon(self._wake_worker)
+
+    def _wake_worker(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    def close(self):
+        """Stop the upload worker; pending scores stay in the outbox"""
+        self.net.cancel("upload")
+        self.net.cancel(self.READ_CHANNEL)
+
+    async def _sync_worker(self):
+        """Long-lived upload task: drains the outbox in batches, backs off on failure"""
+        self._wake = asyncio.Event()
+        while True:
+            wait = None
+            if len(self.outbox):
+                wait = max(0.0, self._retry_at - time.time())
+            if wait is None or wait > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                if time.time() < self._retry_at:
+                    continue
+
+            batch = self.outbox.pending(self.BATCH_SIZE)
+            if not batch:
+                continue
             try:
-                response = requests.post(
-                    f"{SERVER_URL}/api/scores",
-                    json=score,
-                    timeout=5
-                )
-                response.raise_for_status()
+                await self._upload(batch)
+                self._failures = 0
+                self._retry_at = 0.0
+                # our own scores may have changed rankings and bests
+                self.cache.invalidate()
             except Exception as e:
-                # Silently fail - scores are already saved locally
-                print(f"Sync failed: {e}")
-    
-    def get_leaderboard(self, mode: str, period: str = "alltime", limit: int = 30) -> list:
-        """Fetch leaderboard data from server"""
-        try:
-            response = requests.get(
-                f"{SERVER_URL}/api/leaderboard/{mode}?period={period}&limit={limit}",
-                timeout=5
+                # network errors and 5xx: scores stay in the outbox;
+                # retry later with exponential backoff + jitter
+                self._failures += 1
+                delay = min(self.BACKOFF_MAX, self.BACKOFF_BASE * (2 ** (self._failures - 1)))
+                self._retry_at = time.time() + delay * random.uniform(0.8, 1.2)
+                print(f"Sync failed ({len(batch)} pending, retry in {delay:.0f}s): {e!r}")
+
+    def _rejected(self, status: int) -> bool:
+        return 400 <= status < 500 and status not in self.RETRY_4XX
+
+    async def _upload(self, batch: List[Tuple[str, dict]]):
+        if self._bulk_supported:
+            response = await self.http.request(
+                "POST", f"{self.url}/api/scores/bulk",
+                json_body={"scores": [dict(score, client_id=rid) for rid, score in batch]},
+                timeout=self.UPLOAD_TIMEOUTS
             )
+            if response.status in (404, 405):
+                # older server without the bulk endpoint
+                self._bulk_supported = False
+            elif not self._rejected(response.status):
+                response.raise_for_status()
+                self.outbox.ack(rid for rid, _ in batch)
+                return
+            # else the batch was refused as a whole: find the bad scores one by one
+
+        for rid, score in batch:
+            response = await self.http.request("POST", f"{self.url}/api/scores", json_body=score,
+                                               timeout=self.UPLOAD_TIMEOUTS)
+            if self._rejected(response.status):
+                print(f"Score rejected by server ({response.status} {response.reason}), set aside")
+                self.outbox.reject([rid], f"{response.status} {response.reason}")
+                continue
             response.raise_for_status()
-            return response.json()
-        except Exception:
-            return []
-
-    def get_user_bests(self, username: str) -> dict:
-        """Fetch personal bests for user"""
-        url = f"{SERVER_URL}/api/user/{username}/bests"
-        print(f"[DEBUG] Fetching user bests: {url}")
-        try:
-            response = requests.get(url, timeout=5)
-            print(f"[DEBUG] Response status: {response.status_code}")
-            response.raise_for_status()
-            data = response.json()
-            print(f"[DEBUG] Received bests for {username}: {list(data.keys())}")
-            return data
-        except Exception as e:
-            print(f"[DEBUG] Error fetching user bests: {e}")
-            return {}
+            self.outbox.ack([rid])
+
+    async def _get_json(self, path: str, etag: Optional[str] = None):
+        """Conditional GET; returns (data, etag) or (NOT_MODIFIED, etag)"""
+        headers = {"If-None-Match": etag} if etag else None
+        response = await self.http.request("GET", f"{self.url}{path}", headers=headers,
+                                           timeout=self.READ_TIMEOUTS)
+        if response.status == 304:
+            return NOT_MODIFIED, etag
+        response.raise_for_status()
+        return response.json(), response.headers.get("etag")
+
+    def read_token(self) -> GenerationToken:
+        """Token for the current generation of leaderboard/bests reads"""
+        return self.net.token(self.READ_CHANNEL)
+
+    def cancel_reads(self):
+        """Abort outstanding reads; callers holding an older token ignore late results"""
+        self.net.cancel(self.READ_CHANNEL)
+
+    def fetch_leaderboard(self, mode: str, on_value, on_error=None, period: str = "alltime", limit: int = 30):
+        """Cached leaderboard lookup; on_value may be called twice (stale, then fresh)"""
+        path = f"/api/leaderboard/{mode}?period={period}&limit={limit}"
+        self.cache.get(("lb", mode, period, limit), lambda etag: self._get_json(path, etag),
+                       on_value, on_error, ttl=self.LEADERBOARD_TTL)
+
+    def fetch_user_bests(self, username: str, on_value, on_error=None):
+        """Cached personal bests lookup"""
+        path = f"/api/user/{quote(username, safe='')}/bests"
+        self.cache.get(("bests", username), lambda etag: self._get_json(path, etag),
+                       on_value, on_error, ttl=self.BESTS_TTL)
 
     def get_adaptive_interval(self) -> int:
         """Calculate sync interval based on activity"""
@@ -409,9 +542,12 @@ class LicenseManager(QObject):
     """Handles license activation and lease management"""
     status_changed = Signal(str) # For UI feedback
 
-    def __init__(self):
+    TIMEOUTS = Timeouts(connect=5.0, read=15.0, total=20.0)
+
+    def __init__(self, net: Optional[NetLoop] = None):
         super().__init__()
         self.api_base = "https://apilc.morina-solutions.com"
+        self.net = net or NetLoop()
         self.lease_file = Path(DATA_DIR) / "license_lease.json"
         self.hwid = HWIDManager.get_hwid()
         self.current_lease = self.load_lease()
@@ -452,14 +588,14 @@ class LicenseManager(QObject):
 
     def activate(self, key: str):
         """Perform online activation"""
-        Thread(target=self._activate_thread, args=(key,), daemon=True).start()
+        self.net.submit(self._activate(key), channel="license")
 
-    def _activate_thread(self, key: str):
+    async def _activate(self, key: str):
         try:
-            r = requests.post(
-                f"{self.api_base}/activate",
-                json={"license_key": key.strip(), "hwid": self.hwid},
-                timeout=15
+            r = await self.net.client.request(
+                "POST", f"{self.api_base}/activate",
+                json_body={"license_key": key.strip(), "hwid": self.hwid},
+                timeout=self.TIMEOUTS
             )
             r.raise_for_status()
             data = r.json()
@@ -474,14 +610,14 @@ class LicenseManager(QObject):
         if self.current_lease and not self.is_active():
             token = self.current_lease.get("lease_token")
             if token:
-                Thread(target=self._renew_thread, args=(token,), daemon=True).start()
+                self.net.submit(self._renew(token), channel="license")
 
-    def _renew_thread(self, token: str):
+    async def _renew(self, token: str):
         try:
-            r = requests.post(
-                f"{self.api_base}/renew",
-                json={"lease_token": token, "hwid": self.hwid},
-                timeout=15
+            r = await self.net.client.request(
+                "POST", f"{self.api_base}/renew",
+                json_body={"lease_token": token, "hwid": self.hwid},
+                timeout=self.TIMEOUTS
             )
             r.raise_for_status()
             data = r.json()
@@ -506,21 +642,24 @@ class LeaderboardFetcher:
         self.signals = LeaderboardSignals()
 
     def start(self):
-        Thread(target=self._run, daemon=True).start()
-
-    def _run(self):
-        try:
-            # 1. Global Leaderboard
-            data = self.sync.get_leaderboard(self.mode, self.period, self.limit)
-            self.signals.finished.emit(data)
-            
-            # 2. Personal Bests (if username provided)
-            if self.username:
-                bests = self.sync.get_user_bests(self.username)
-                self.signals.finished_bests.emit(bests)
-                
-        except Exception:
-            self.signals.error.emit()
+        # Served from ServerSync's cache: cached data is emitted right away,
+        # network results arrive later via the (queued) signals.
+        # The closures keep this fetcher (and its signals) alive until answered;
+        # results are dropped once a newer fetch has cancelled this generation.
+        token = self.sync.read_token()
+
+        def deliver(signal):
+            def emit(*args):
+                if token.current:
+                    signal.emit(*args)
+            return emit
+
+        # 1. Global Leaderboard
+        self.sync.fetch_leaderboard(self.mode, deliver(self.signals.finished), deliver(self.signals.error),
+                                    period=self.period, limit=self.limit)
+        # 2. Personal Bests (if username provided)
+        if self.username:
+            self.sync.fetch_user_bests(self.username, deliver(self.signals.finished_bests))
 
 def format_server_leaderboard(data: list, i18n, theme):
     if not data:
@@ -885,15 +1024,26 @@ class SquareHandPanel(QFrame):
     """
     Quadratisches Panel, zeigt fertigen Stream skaliert.
     Größe wird vom MainWindow gesetzt (set_panel_size()).
+
+    Fertig skalierte Frames werden pro (side, theme, active finger, size, dpr)
+    gecacht: ein Keystroke ist danach nur noch ein Pixmap-Tausch.
+    Theme-Wechsel und Resize leeren den Cache.
     """
+    FINGERS = (None, "pinky", "ring", "middle", "index", "thumb")
+
     def __init__(self, theme: Theme, renderer: HandRenderer):
         super().__init__()
         self.setObjectName("Panel")
         self.theme = theme
         self.renderer = renderer
-        self._last_frame: Optional[QPixmap] = None
+        self._frames: Dict[tuple, QPixmap] = {}
         self._size = 260
 
+        # warm the cache for every finger once the size has settled
+        self._prewarm_timer = QTimer(self)
+        self._prewarm_timer.setSingleShot(True)
+        self._prewarm_timer.timeout.connect(self._prewarm)
+
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.setMinimumSize(40, 40)
         self.set_panel_size(self._size)
@@ -901,41 +1051,74 @@ class SquareHandPanel(QFrame):
     def set_theme(self, theme: Theme):
         self.theme = theme
         self.renderer.set_theme(theme)
-        self.update_stream()
+        self.invalidate_frames()
 
     def set_panel_size(self, px: int):
         px = int(px)
         if px != self._size:
             self._size = px
             self.setFixedSize(px, px)
-            self.update()
+            self.invalidate_frames()
 
     def set_active_finger(self, finger: Optional[str]):
+        if finger == self.renderer.active_finger:
+            return
         self.renderer.set_active(finger)
-        self.update_stream()
+        self.update()
 
     def update_stream(self):
-        self._last_frame = self.renderer.render_frame()
         self.update()
 
+    def invalidate_frames(self):
+        self._frames.clear()
+        self._prewarm_timer.start(200)
+        self.update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.invalidate_frames()
+
+    def _square(self) -> QRect:
+        r = self.rect().adjusted(14, 14, -14, -14)
+        side = min(r.width(), r.height())
+        return QRect(r.x() + (r.width() - side)//2, r.y() + (r.height() - side)//2, side, side)
+
+    def _frame_for(self, finger: Optional[str], size: QSize) -> QPixmap:
+        dpr = self.devicePixelRatioF()
+        key = (self.renderer.side, self.theme.mode, finger, size.width(), size.height(), dpr)
+        pm = self._frames.get(key)
+        if pm is None:
+            prev = self.renderer.active_finger
+            self.renderer.set_active(finger)
+            frame = self.renderer.render_frame()
+            self.renderer.set_active(prev)
+            pm = frame.scaled(size * dpr, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            pm.setDevicePixelRatio(dpr)
+            self._frames[key] = pm
+        return pm
+
+    def _prewarm(self):
+        size = self._square().size()
+        if size.isEmpty():
+            return
+        for finger in self.FINGERS:
+            self._frame_for(finger, size)
+
     def paintEvent(self, event):
         p = QPainter(self)
         p.setRenderHint(QPainter.Antialiasing, True)
 
-        r = self.rect().adjusted(14, 14, -14, -14)
-        side = min(r.width(), r.height())
-        sq = QRect(r.x() + (r.width() - side)//2, r.y() + (r.height() - side)//2, side, side)
+        sq = self._square()
 
         p.setPen(Qt.NoPen)
         p.setBrush(QColor(255,255,255,6) if self.theme.is_dark else QColor(0,0,0,4))
         p.drawRoundedRect(sq, 18, 18)
 
-        frame = self._last_frame or self.renderer.render_frame()
-        self._last_frame = frame
-
-        scaled = frame.scaled(sq.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        x = sq.x() + (sq.width() - scaled.width())//2
-        y = sq.y() + (sq.height() - scaled.height())//2
+        scaled = self._frame_for(self.renderer.active_finger, sq.size())
+        w = int(scaled.width() / scaled.devicePixelRatio())
+        h = int(scaled.height() / scaled.devicePixelRatio())
+        x = sq.x() + (sq.width() - w)//2
+        y = sq.y() + (sq.height() - h)//2
         p.drawPixmap(x, y, scaled)
 
         p.end()
@@ -943,157 +1126,12 @@ class SquareHandPanel(QFrame):
 # KEYBOARD LAYOUTS
 # ============================================================
 
-@dataclass
-class KeyDef:
-    kid: str
-    label: str
-    label2: str = ""
-    w: float = 1.0
-    is_spacer: bool = False
-
-def de_layout() -> List[List[KeyDef]]:
-    return [
-        [KeyDef("Escape","esc"), KeyDef("F1","F1"), KeyDef("F2","F2"), KeyDef("F3","F3"), KeyDef("F4","F4"),
-         KeyDef("F5","F5"), KeyDef("F6","F6"), KeyDef("F7","F7"), KeyDef("F8","F8"), KeyDef("F9","F9"),
-         KeyDef("F10","F10"), KeyDef("F11","F11"), KeyDef("F12","F12"), KeyDef("Backspace","⌫", w=1.4)],
-
-        [KeyDef("Backquote","^","°"), KeyDef("Digit1","1","!"), KeyDef("Digit2","2","\""), KeyDef("Digit3","3","§"),
-         KeyDef("Digit4","4","$"), KeyDef("Digit5","5","%"), KeyDef("Digit6","6","&"), KeyDef("Digit7","7","/"),
-         KeyDef("Digit8","8","("), KeyDef("Digit9","9",")"), KeyDef("Digit0","0","="),
-         KeyDef("Minus","ß","?"), KeyDef("Equal","´","`"), KeyDef("Delete","del", w=1.2)],
-
-        [KeyDef("Tab","tab", w=1.3), KeyDef("KeyQ","Q"), KeyDef("KeyW","W"), KeyDef("KeyE","E"), KeyDef("KeyR","R"),
-         KeyDef("KeyT","T"), KeyDef("KeyZ","Z"), KeyDef("KeyU","U"), KeyDef("KeyI","I"), KeyDef("KeyO","O"),
-         KeyDef("KeyP","P"), KeyDef("BracketLeft","Ü"), KeyDef("BracketRight","+","*"), KeyDef("Enter","enter", w=1.6)],
-
-        [KeyDef("CapsLock","caps", w=1.5), KeyDef("KeyA","A"), KeyDef("KeyS","S"), KeyDef("KeyD","D"), KeyDef("KeyF","F"),
-         KeyDef("KeyG","G"), KeyDef("KeyH","H"), KeyDef("KeyJ","J"), KeyDef("KeyK","K"), KeyDef("KeyL","L"),
-         KeyDef("Semicolon","Ö"), KeyDef("Quote","Ä"), KeyDef("Backslash","#")],
-
-        [KeyDef("ShiftLeft","shift", w=1.7), KeyDef("IntlBackslash","<",">"), KeyDef("KeyY","Y"), KeyDef("KeyX","X"),
-         KeyDef("KeyC","C"), KeyDef("KeyV","V"), KeyDef("KeyB","B"), KeyDef("KeyN","N"), KeyDef("KeyM","M"),
-         KeyDef("Comma",",",";"), KeyDef("Period",".",":"), KeyDef("Slash","-","_"),
-         KeyDef("ShiftRight","shift", w=1.9)],
-
-        [KeyDef("ControlLeft","ctrl", w=1.2), KeyDef("AltLeft","alt", w=1.2),
-         KeyDef("Space","space", w=6.0),
-         KeyDef("AltRight","altgr", w=1.2), KeyDef("ControlRight","ctrl", w=1.2)]
-    ]
-
-def us_layout() -> List[List[KeyDef]]:
-    return [
-        [KeyDef("Escape","esc"), KeyDef("F1","F1"), KeyDef("F2","F2"), KeyDef("F3","F3"), KeyDef("F4","F4"),
-         KeyDef("F5","F5"), KeyDef("F6","F6"), KeyDef("F7","F7"), KeyDef("F8","F8"), KeyDef("F9","F9"),
-         KeyDef("F10","F10"), KeyDef("F11","F11"), KeyDef("F12","F12"), KeyDef("Backspace","⌫", w=1.4)],
-
-        [KeyDef("Backquote","`","~"), KeyDef("Digit1","1","!"), KeyDef("Digit2","2","@"), KeyDef("Digit3","3","#"),
-         KeyDef("Digit4","4","$"), KeyDef("Digit5","5","%"), KeyDef("Digit6","6","^"), KeyDef("Digit7","7","&"),
-         KeyDef("Digit8","8","*"), KeyDef("Digit9","9","("), KeyDef("Digit0","0",")"),
-         KeyDef("Minus","-","_"), KeyDef("Equal","=","+"), KeyDef("Delete","del", w=1.2)],
-
-        [KeyDef("Tab","tab", w=1.3), KeyDef("KeyQ","Q"), KeyDef("KeyW","W"), KeyDef("KeyE","E"), KeyDef("KeyR","R"),
-         KeyDef("KeyT","T"), KeyDef("KeyY","Y"), KeyDef("KeyU","U"), KeyDef("KeyI","I"), KeyDef("KeyO","O"),
-         KeyDef("KeyP","P"), KeyDef("BracketLeft","[","{"), KeyDef("BracketRight","]","}"), KeyDef("Enter","enter", w=1.6)],
-
-        [KeyDef("CapsLock","caps", w=1.5), KeyDef("KeyA","A"), KeyDef("KeyS","S"), KeyDef("KeyD","D"), KeyDef("KeyF","F"),
-         KeyDef("KeyG","G"), KeyDef("KeyH","H"), KeyDef("KeyJ","J"), KeyDef("KeyK","K"), KeyDef("KeyL","L"),
-         KeyDef("Semicolon",";",":"), KeyDef("Quote","'","\""), KeyDef("Backslash","\\","|")],
-
-        [KeyDef("ShiftLeft","shift", w=1.7), KeyDef("KeyZ","Z"), KeyDef("KeyX","X"),
-         KeyDef("KeyC","C"), KeyDef("KeyV","V"), KeyDef("KeyB","B"), KeyDef("KeyN","N"), KeyDef("KeyM","M"),
-         KeyDef("Comma",",","<"), KeyDef("Period",".",">"), KeyDef("Slash","/","?"),
-         KeyDef("ShiftRight","shift", w=1.9)],
-
-        [KeyDef("ControlLeft","ctrl", w=1.2), KeyDef("AltLeft","alt", w=1.2),
-         KeyDef("Space","space", w=6.0),
-         KeyDef("AltRight","alt", w=1.2), KeyDef("ControlRight","ctrl", w=1.2)]
-    ]
-
-def right_hand_kids(layout_name: str) -> set:
-    base = {
-        # Standard Right Hand Column Ownership
-        "Digit6","Digit7","Digit8","Digit9","Digit0","Minus","Equal",
-        "KeyU","KeyI","KeyO","KeyP","BracketLeft","BracketRight","Backspace",
-        "KeyH","KeyJ","KeyK","KeyL","Semicolon","Quote","Backslash","Enter",
-        "KeyN","KeyM","Comma","Period","Slash","ShiftRight",
-        "Delete","ControlRight","AltRight",
-    }
-    # QWERTZ: Z is top row index-right
-    if layout_name.upper() == "DE":
-        return base | {"KeyZ"}
-    # QWERTY: Y is top row index-right
-    return base | {"KeyY"}
-
-def hand_for_kid(layout_name: str, kid: Optional[str]) -> str:
-    if not kid:
-        return "unknown"
-    return "right" if kid in right_hand_kids(layout_name) else "left"
-
-def kid_for_char(layout_name: str, ch: str) -> Optional[str]:
-    if not ch:
-        return None
-    if ch == " ":
-        return "Space"
-    ch = ch.lower()
-
-    if layout_name.upper() == "DE":
-        return {
-            "a":"KeyA","b":"KeyB","c":"KeyC","d":"KeyD","e":"KeyE","f":"KeyF","g":"KeyG","h":"KeyH",
-            "i":"KeyI","j":"KeyJ","k":"KeyK","l":"KeyL","m":"KeyM","n":"KeyN","o":"KeyO","p":"KeyP",
-            "q":"KeyQ","r":"KeyR","s":"KeyS","t":"KeyT","u":"KeyU","v":"KeyV","w":"KeyW","x":"KeyX",
-            "y":"KeyY","z":"KeyZ",
-            "ä":"Quote","ö":"Semicolon","ü":"BracketLeft","ß":"Minus",
-            ",":"Comma",".":"Period","-":"Slash",
-            "1":"Digit1","2":"Digit2","3":"Digit3","4":"Digit4","5":"Digit5","6":"Digit6","7":"Digit7","8":"Digit8","9":"Digit9","0":"Digit0",
-        }.get(ch)
-    else:
-        return {
-            "a":"KeyA","b":"KeyB","c":"KeyC","d":"KeyD","e":"KeyE","f":"KeyF","g":"KeyG","h":"KeyH",
-            "i":"KeyI","j":"KeyJ","k":"KeyK","l":"KeyL","m":"KeyM","n":"KeyN","o":"KeyO","p":"KeyP",
-            "q":"KeyQ","r":"KeyR","s":"KeyS","t":"KeyT","u":"KeyU","v":"KeyV","w":"KeyW","x":"KeyX",
-            "y":"KeyY","z":"KeyZ",
-            ",":"Comma",".":"Period","/":"Slash","-":"Minus",";":"Semicolon","'":"Quote",
-            "1":"Digit1","2":"Digit2","3":"Digit3","4":"Digit4","5":"Digit5","6":"Digit6","7":"Digit7","8":"Digit8","9":"Digit9","0":"Digit0",
-        }.get(ch)
-def finger_for_kid(layout_name: str, kid: Optional[str]) -> Tuple[str, str]:
-    if not kid:
-        return ("unknown", "index")
-
-    # Universal Finger Map
-    fm = {
-        # Left Hand
-        "Digit1":"pinky","KeyQ":"pinky","KeyA":"pinky","Backquote":"pinky","Tab":"pinky","CapsLock":"pinky","ShiftLeft":"pinky","ControlLeft":"pinky",
-        "Digit2":"ring","KeyW":"ring","KeyS":"ring","KeyX":"ring",
-        "Digit3":"middle","KeyE":"middle","KeyD":"middle","KeyC":"middle",
-        "Digit4":"index","Digit5":"index","KeyR":"index","KeyT":"index","KeyF":"index","KeyG":"index","KeyV":"index","KeyB":"index",
-        # Right Hand
-        "Digit6":"index","Digit7":"index","KeyU":"index","KeyH":"index","KeyJ":"index","KeyN":"index","KeyM":"index",
-        "Digit8":"middle","KeyI":"middle","KeyK":"middle","Comma":"middle",
-        "Digit9":"ring","KeyO":"ring","KeyL":"ring","Period":"ring",
-        "Digit0":"pinky","Minus":"pinky","Equal":"pinky","KeyP":"pinky","BracketLeft":"pinky","BracketRight":"pinky","Backspace":"pinky",
-        "Semicolon":"pinky","Quote":"pinky","Backslash":"pinky","Enter":"pinky",
-        "Slash":"pinky","ShiftRight":"pinky","Delete":"pinky","ControlRight":"pinky",
-        # Thumb
-        "Space":"thumb",
-    }
-    
-    # Platform-specific and Layout-specific overrides
-    is_de = layout_name.upper() == "DE"
-    if is_de:
-        fm["KeyY"] = "pinky"    # QWERTZ: Y is bottom left
-        fm["IntlBackslash"] = "pinky"
-        fm["KeyZ"] = "index"  # QWERTZ: Z is top index
-        fm["BracketLeft"] = "pinky" # Ü
-        fm["Semicolon"] = "pinky"   # Ö
-        fm["Quote"] = "pinky"       # Ä
-        fm["Slash"] = "pinky"       # - (where Slash is)
-    else:
-        fm["KeyZ"] = "pinky"   # QWERTY: Z is bottom left
-        fm["KeyY"] = "index"   # QWERTY: Y is top index
+LAYOUTS_DIR = os.path.join(DATA_DIR, "layouts")
+LAYOUTS = LayoutRegistry(LAYOUTS_DIR, default="US")
 
-    finger = fm.get(kid, "index")
-    hand = hand_for_kid(layout_name, kid)
-    return (hand, finger)
+def layout_table(layout_name: str) -> LayoutTable:
+    """Compiled lookup table for a layout name (parsed once from data/layouts)."""
+    return LAYOUTS.table(layout_name)
 
 
 # ============================================================
@@ -1101,27 +1139,69 @@ def finger_for_kid(layout_name: str, kid: Optional[str]) -> Tuple[str, str]:
 # ============================================================
 
 class TypingCoach:
-    def __init__(self, items: List[str]):
-        self.items = [x.strip() for x in items if x.strip()] or DEFAULT_WORDS_DE[:]
-        self.reset()
+    TOP_MISSES = 5  # length of the incrementally kept miss ranking
+    ADAPTIVE_POOL = 20000  # items drawn from a large corpus for adaptive selection
+
+    def __init__(self, items):
+        self.items = self._prepare(items)
         self.per_char_hit: Dict[str, int] = {}
         self.per_char_miss: Dict[str, int] = {}
+        self.per_bigram_hit: Dict[str, int] = {}
+        self.per_bigram_miss: Dict[str, int] = {}
+        # chars with the most misses, highest first; miss counts only grow,
+        # so a char can only enter by overtaking the last entry
+        self._top_miss: List[str] = []
+        # bumped whenever suggestions() would return something different
+        self.suggestions_version = 0
+        # adaptive item selection, built on first use once there are misses
+        self._sampler: Optional[DrillSampler] = None
+        self.reset()
 
-    def set_items(self, items: List[str]):
-        self.items = [x.strip() for x in items if x.strip()] or DEFAULT_WORDS_DE[:]
+    @staticmethod
+    def _prepare(items):
+        # corpus views are served lazily and used as-is (no copy on mode switch)
+        if isinstance(items, CorpusView) and len(items):
+            return items
+        if isinstance(items, CorpusView):
+            items = []
+        return [x.strip() for x in items if x.strip()] or DEFAULT_WORDS_DE[:]
+
+    def set_items(self, items):
+        self.items = self._prepare(items)
+        self._sampler = None
         self.reset()
 
     def reset(self):
-        self.current = random.choice(self.items)
+        self.current = self._pick()
         self.index = 0
         self.total = 0
         self.mistakes = 0
         self.started = time.time()
 
     def next_item(self):
-        self.current = random.choice(self.items)
+        self.current = self._pick()
         self.index = 0
 
+    def _pick(self) -> str:
+        if self._sampler is None:
+            if not self.per_char_miss:
+                if isinstance(self.items, CorpusView):
+                    return self.items.choice(random) or random.choice(DEFAULT_WORDS_DE)
+                return random.choice(self.items)
+            pool = self.items
+            if isinstance(pool, CorpusView):
+                pool = pool.sample(self.ADAPTIVE_POOL, random) or DEFAULT_WORDS_DE[:]
+            self._sampler = DrillSampler(pool)
+            for stats_hit, stats_miss in ((self.per_char_hit, self.per_char_miss),
+                                          (self.per_bigram_hit, self.per_bigram_miss)):
+                for key, miss in stats_miss.items():
+                    self._sampler.set_weakness(key, weakness(stats_hit.get(key, 0), miss))
+        return self._sampler.pick()
+
+    def _note(self, key: str, hits: Dict[str, int], misses: Dict[str, int]):
+        if self._sampler is not None:
+            self._sampler.set_weakness(key, weakness(hits.get(key, 0), misses.get(key, 0)))
+
     def expected_char(self) -> str:
         if self.index >= len(self.current):
             return ""
@@ -1134,9 +1214,17 @@ class TypingCoach:
             exp = self.expected_char()
 
         self.total += 1
+        bigram = self.current[self.index - 1] + exp if self.index > 0 else ""
 
         if ch == exp:
             self.per_char_hit[exp] = self.per_char_hit.get(exp, 0) + 1
+            if exp in self.per_char_miss:
+                self.suggestions_version += 1
+                self._note(exp, self.per_char_hit, self.per_char_miss)
+            if bigram:
+                self.per_bigram_hit[bigram] = self.per_bigram_hit.get(bigram, 0) + 1
+                if bigram in self.per_bigram_miss:
+                    self._note(bigram, self.per_bigram_hit, self.per_bigram_miss)
             self.index += 1
             if self.index >= len(self.current):
                 self.next_item()
@@ -1144,8 +1232,50 @@ class TypingCoach:
 
         self.mistakes += 1
         self.per_char_miss[exp] = self.per_char_miss.get(exp, 0) + 1
+        self._note(exp, self.per_char_hit, self.per_char_miss)
+        if bigram:
+            self.per_bigram_miss[bigram] = self.per_bigram_miss.get(bigram, 0) + 1
+            self._note(bigram, self.per_bigram_hit, self.per_bigram_miss)
+        self._bump_top_miss(exp)
+        self.suggestions_version += 1
         return False, exp
 
+    def _bump_top_miss(self, ch: str):
+        top = self._top_miss
+        miss = self.per_char_miss
+        if ch in top:
+            i = top.index(ch)
+        elif len(top) < self.TOP_MISSES:
+            top.append(ch)
+            i = len(top) - 1
+        elif miss[ch] > miss[top[-1]]:
+            top[-1] = ch
+            i = len(top) - 1
+        else:
+            return
+        while i > 0 and miss[top[i - 1]] < miss[ch]:
+            top[i] = top[i - 1]
+            i -= 1
+        top[i] = ch
+
+    def export_stats(self) -> dict:
+        return {
+            "char_hit": self.per_char_hit,
+            "char_miss": self.per_char_miss,
+            "bigram_hit": self.per_bigram_hit,
+            "bigram_miss": self.per_bigram_miss,
+        }
+
+    def import_stats(self, stats: dict):
+        """Replace all counters (profile switch); the current item is kept."""
+        self.per_char_hit = dict(stats.get("char_hit") or {})
+        self.per_char_miss = dict(stats.get("char_miss") or {})
+        self.per_bigram_hit = dict(stats.get("bigram_hit") or {})
+        self.per_bigram_miss = dict(stats.get("bigram_miss") or {})
+        self._top_miss = heapq.nlargest(self.TOP_MISSES, self.per_char_miss, key=self.per_char_miss.get)
+        self._sampler = None
+        self.suggestions_version += 1
+
     def accuracy(self) -> float:
         if self.total <= 0:
             return 100.0
@@ -1164,9 +1294,13 @@ class TypingCoach:
         return max(0, pts)
 
     def suggestions(self, limit=5) -> List[str]:
-        items = sorted(self.per_char_miss.items(), key=lambda x: x[1], reverse=True)[:limit]
+        if limit <= self.TOP_MISSES:
+            chars = self._top_miss[:limit]
+        else:
+            chars = heapq.nlargest(limit, self.per_char_miss, key=self.per_char_miss.__getitem__)
         out = []
-        for ch, miss in items:
+        for ch in chars:
+            miss = self.per_char_miss[ch]
             hit = self.per_char_hit.get(ch, 0)
             out.append(f"'{ch}' → Fehler: {miss}, Treffer: {hit}")
         return out
@@ -1603,13 +1737,12 @@ class HtmlDlcWindowLegacy(QMainWindow):
 
         self._demo_active = False
         self._demo_code = ""
-        self._demo_timer = QTimer(self)
-        self._demo_timer.setSingleShot(True)
 
         # Ghost typer local to this window
-        self.ghost = GhostTyper(wpm=120)
-        self.ghost.char_typed.connect(self._on_demo_char)
-        self.ghost.step_finished.connect(self._on_demo_finished)
+        self.ghost = GhostTyper(wpm=DEMO_WPM, parent=self)
+        self.ghost.typed_text.connect(self._on_demo_text)
+        self.ghost.state_changed.connect(lambda playing: self.editor.setUndoRedoEnabled(not playing))
+        self.ghost.finished.connect(self._on_demo_finished)
 
         central = QWidget(self)
         self.setCentralWidget(central)
@@ -1659,6 +1792,7 @@ class HtmlDlcWindowLegacy(QMainWindow):
         self.preview.setFrameShape(QFrame.NoFrame)
         self.preview.setStyleSheet("background:#ffffff; color:#000; border-radius:12px;")
         rlay.addWidget(self.preview, 2)
+        self.preview_pipeline = PreviewPipeline(self.preview, self)
 
         # Theme editor a bit
         try:
@@ -1702,7 +1836,7 @@ class HtmlDlcWindowLegacy(QMainWindow):
         if stype == "ghost_demo":
             self.editor.setReadOnly(True)
             self.editor.setPlainText("")
-            self.preview.setHtml("")
+            self.preview_pipeline.clear()
             self.lbl_context.setText(f"Ghost Demo: {step.get('title','Demo')}")
         elif stype == "now_you":
             self.editor.setReadOnly(False)
@@ -1735,49 +1869,36 @@ class HtmlDlcWindowLegacy(QMainWindow):
 
         self.editor.setReadOnly(True)
         self.editor.setPlainText("")
-        self.preview.setHtml("")
+        self.preview_pipeline.clear()
         self.lbl_context.setText(f"Ghost Demo läuft: {step.get('title','Demo')}")
 
         # small delay so UI updates before typing
-        try:
-            self._demo_timer.timeout.disconnect()
-        except Exception:
-            pass
-        self._demo_timer.timeout.connect(self._start_demo_typing)
-        self._demo_timer.start(250)
+        self.ghost.load(DemoTimeline([{"code": code, "pause": 250}], wpm=DEMO_WPM,
+                                     timing=self.main_window.demo_timing()))
+        self.ghost.play()
 
     # ---------- ghost demo ----------
-    def _start_demo_typing(self):
-        if not self._demo_active:
-            return
-        try:
-            self.ghost.stop()
-        except Exception:
-            pass
-        self.ghost.type_string(self._demo_code)
-
-    def _on_demo_char(self, count: int):
+    def _on_demo_text(self, chunk: str):
         if not self._demo_active:
             return
-        partial = self._demo_code[:count]
+        # append at the end instead of resetting the whole document each tick
+        cur = self.editor.textCursor()
+        cur.movePosition(QTextCursor.End)
         self.editor.blockSignals(True)
-        self.editor.setPlainText(partial)
+        cur.insertText(chunk)
         self.editor.blockSignals(False)
-        self.preview.setHtml(partial)
+        self.editor.setTextCursor(cur)
+        self.preview_pipeline.schedule(self.editor.toPlainText)
 
     def _on_demo_finished(self):
         if not self._demo_active:
             return
         self._demo_active = False
         self.lbl_context.setText("✅ Demo fertig – du kannst weiter klicken.")
-        self.preview.setHtml(self._demo_code)
+        self.preview_pipeline.render_now(self._demo_code)
 
     def _stop_demo(self):
         self._demo_active = False
-        try:
-            self._demo_timer.stop()
-        except Exception:
-            pass
         try:
             self.ghost.stop()
         except Exception:
@@ -1790,7 +1911,7 @@ class HtmlDlcWindowLegacy(QMainWindow):
         self._run_preview()
 
     def _run_preview(self):
-        self.preview.setHtml(self.editor.toPlainText())
+        self.preview_pipeline.render_now(self.editor.toPlainText())
 
     def _check_now_you(self):
         step = self._current_step()
@@ -1906,6 +2027,7 @@ class ResultPreviewWidget(QWidget):
         self.view = QTextBrowser()
         self.view.setFrameShape(QFrame.NoFrame)
         cl.addWidget(self.view)
+        self.pipeline = PreviewPipeline(self.view, self)
         
         lay.addWidget(self.card)
         self.apply_theme()
@@ -1921,15 +2043,16 @@ class ResultPreviewWidget(QWidget):
         self.btn_close.setStyleSheet("QPushButton { border: none; color: #6e7681; font-weight: bold; } QPushButton:hover { color: #ff5f56; }")
 
     def show_content(self, html: str):
-        self.view.setHtml(html)
+        self.pipeline.render_now(html)
         if self.parent():
             self.setGeometry(self.parent().rect())
         self.show()
         self.raise_()
 
-    def update_live_content(self, html: str):
-        """Update browser view without popping up or stealing focus"""
-        self.view.setHtml(html)
+    def update_live_content(self, html):
+        """Update browser view without popping up or stealing focus.
+        ``html`` may be a callable, evaluated only when the debounced render runs."""
+        self.pipeline.schedule(html)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -1982,62 +2105,35 @@ class DLCManager:
         self.i18n = i18n
         self.dlc_dir = Path(DATA_DIR) / "dlc"
         self.dlc_dir.mkdir(parents=True, exist_ok=True)
-        self.modules = {} # id -> data
+        # manifest headers only; course bodies are parsed on first use
+        self.index = DlcIndex(str(self.dlc_dir))
+        self.modules: Dict[str, dict] = {}  # id -> header (title, branding, _path)
 
     def discover(self):
-        """Scan for modules in subdirectories"""
-        if not self.dlc_dir.exists():
-            return
-            
-        for d in self.dlc_dir.iterdir():
-            if d.is_dir():
-                # Look for any .json file in the subdirectory (e.g. course.json)
-                for f in d.glob("*.json"):
-                    try:
-                        data = json.loads(f.read_text(encoding="utf-8"))
-                        # Store base path for asset loading (images/videos) later
-                        data["_path"] = str(d)
-                        self.modules[data["id"]] = data
-                    except Exception as e:
-                        print(f"Failed to load DLC in {d}: {e}")
+        """Scan for modules in subdirectories (unchanged files are not re-read)"""
+        self.index.scan()
+        self.modules = self.index.headers
 
     def get_module(self, dlc_id: str) -> Optional[dict]:
-        return self.modules.get(dlc_id)
-
-class GhostTyper(QObject):
-    """Automates typing 'ghost' animation for course demos with scripting support"""
-    finished = Signal()
-    step_finished = Signal() # Finished one scripted step
-    char_typed = Signal(int) # Total chars typed so far
-
-    def __init__(self, wpm: int = 50):
-        super().__init__()
-        self.wpm = wpm
-        self.full_text = ""
-        self.current_offset = 0 # Offset for the current string being typed
-        self.total_typed = 0
-        self.queue = [] # List of strings to type
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self._on_tick)
-        self.interval = int(60000 / (wpm * 5))
+        """Module body (branding, intro, linting, ...); lessons come from lessons()."""
+        if dlc_id not in self.modules:
+            return None
+        return self.index.body(dlc_id)
 
-    def type_string(self, text: str):
-        """Start typing a new string segment"""
-        self.full_text = text
-        self.current_offset = 0
-        self.timer.start(self.interval)
+    def lessons(self, dlc_id: str) -> Iterator[dict]:
+        """The module's lessons, read one at a time (from a bundle, one member each)."""
+        for i in range(self.index.chapter_count(dlc_id)):
+            lesson = self.index.chapter(dlc_id, i)
+            if isinstance(lesson, dict):
+                yield lesson
 
-    def stop(self):
-        self.timer.stop()
+    def load_spec(self, path: str) -> dict:
+        """A course spec file, cached until it changes on disk. Raises OSError/ValueError."""
+        return self.index.load_file(path)
 
-    def _on_tick(self):
-        self.current_offset += 1
-        self.total_typed += 1
-        self.char_typed.emit(self.total_typed)
-        
-        if self.current_offset >= len(self.full_text):
-            self.timer.stop()
-            self.step_finished.emit()
+    def day_spec(self, course_id: str, day: int) -> Optional[dict]:
+        """A day spec from any installed pack or bundle. Raises OSError/ValueError."""
+        return self.index.spec(course_id, day)
 
 class DLCBrandingWidget(QFrame):
     """Branded header for DLC modules"""
@@ -2135,6 +2231,41 @@ class LeaderboardWidget(QFrame):
         self.body.setText(text)
 
 
+class PersonalStatsWidget(QFrame):
+    """The player's own sessions in the selected mode, from the local score history."""
+    def __init__(self, theme: Theme, i18n: I18N):
+        super().__init__()
+        self.setObjectName("Panel2")
+        self.theme = theme
+        self.i18n = i18n
+
+        lay = QVBoxLayout(self)
+        lay.setContentsMargins(14, 12, 14, 12)
+        lay.setSpacing(6)
+
+        self.title = QLabel("")
+        self.title.setStyleSheet("font-size: 11pt; font-weight: 800;")
+        lay.addWidget(self.title)
+
+        self.body = QLabel("")
+        self.body.setWordWrap(True)
+        self.body.setObjectName("Muted")
+        self.body.setAlignment(Qt.AlignTop)
+        lay.addWidget(self.body)
+
+        self.retranslate()
+
+    def retranslate(self):
+        self.title.setText(self.i18n.t("ps_title"))
+
+    def set_i18n(self, i18n: I18N):
+        self.i18n = i18n
+        self.retranslate()
+
+    def set_text(self, text: str):
+        self.body.setText(text)
+
+
 class ScoreHeaderWidget(QFrame):
     def __init__(self, theme: Theme, i18n: I18N):
         super().__init__()
@@ -2269,63 +2400,127 @@ class TrainerWidget(QFrame):
         self.hints.setStyleSheet("font-size:10pt;")
         root.addWidget(self.hints)
 
+        # render caches: each part of the HUD is only re-set when its content changes
+        self._word_src: Optional[str] = None
+        self._word_esc: List[str] = []
+        self._word_key = None
+        self._stats_key = None
+        self._hints_key = None
+        self._lint_active = False
+        self._lint_tip: Optional[str] = None
+
         self.refresh(remaining=60.0, session_active=False, note="")
 
+    # longer items (DLC demo code) are shown as a window around the cursor
+    WORD_WINDOW = 96
+
     def set_i18n(self, i18n: I18N):
         self.i18n = i18n
+        self._stats_key = None
+        self._hints_key = None
 
     def refresh(self, remaining: float, session_active: bool, note: str):
+        self._render_word()
+        self._render_stats(remaining, session_active, note)
+
+        # DEFAULT SUGGESTIONS (only if no lint tip is present)
+        if not self._lint_active:
+            self._render_hints()
+
+    def _render_word(self):
         word = self.coach.current
         idx = self.coach.index
-
-        if idx < len(word):
-            done = word[:idx]
-            cur = word[idx]
-            rest = word[idx + 1:]
+        key = (word, idx)
+        if key == self._word_key:
+            return
+        self._word_key = key
+
+        if word is not self._word_src:
+            self._word_src = word
+            self._word_esc = [html_escape(c) for c in word]
+        esc = self._word_esc
+
+        n = len(word)
+        lo, hi = 0, n
+        if n > self.WORD_WINDOW:
+            lo = max(0, min(idx - self.WORD_WINDOW // 3, n - self.WORD_WINDOW))
+            hi = lo + self.WORD_WINDOW
+        head = "…" if lo > 0 else ""
+        tail = "…" if hi < n else ""
+
+        if idx < n:
+            done = "".join(esc[lo:idx])
+            cur = esc[idx]
+            rest = "".join(esc[idx + 1:hi])
             html = (
-                f"<span style='color:#9aa3b2'>{done}</span>"
+                f"<span style='color:#9aa3b2'>{head}{done}</span>"
                 f"<span style='color:#7c5cff;text-decoration:underline'>{cur}</span>"
-                f"<span style='color:#9aa3b2'>{rest}</span>"
+                f"<span style='color:#9aa3b2'>{rest}{tail}</span>"
             )
         else:
-            html = f"<span style='color:#9aa3b2'>{word}</span>"
+            html = f"<span style='color:#9aa3b2'>{head}{''.join(esc[lo:hi])}{tail}</span>"
 
         self.word_label.setText(html)
 
+    def _render_stats(self, remaining: float, session_active: bool, note: str):
         time_left = max(0, int(round(remaining)))
         if session_active:
+            key = (
+                self.i18n.lang,
+                f"{self.coach.wpm():.1f}",
+                f"{self.coach.accuracy():.1f}",
+                self.coach.mistakes,
+                time_left,
+            )
+            if key == self._stats_key:
+                return
+            self._stats_key = key
             self.stats.setText(self.i18n.t(
                 "stats_line_active",
-                wpm=f"{self.coach.wpm():.1f}",
-                acc=f"{self.coach.accuracy():.1f}",
-                err=str(self.coach.mistakes),
-                left=str(time_left)
+                wpm=key[1],
+                acc=key[2],
+                err=str(key[3]),
+                left=str(key[4])
             ))
         else:
+            key = (self.i18n.lang, note)
+            if key == self._stats_key:
+                return
+            self._stats_key = key
             self.stats.setText(self.i18n.t("stats_line_idle", note=note))
 
-        # DEFAULT SUGGESTIONS (only if no lint tip is present)
-        if not hasattr(self, '_lint_active') or not self._lint_active:
-            sug = self.coach.suggestions(5)
-            if sug:
-                self.hints.setText(self.i18n.t("suggestions") + "  " + "  |  ".join(sug))
-            else:
-                self.hints.setText(self.i18n.t("suggestions_empty"))
+    def _render_hints(self):
+        key = (self.i18n.lang, self.coach.suggestions_version)
+        if key == self._hints_key:
+            return
+        self._hints_key = key
+        sug = self.coach.suggestions(5)
+        if sug:
+            self.hints.setText(self.i18n.t("suggestions") + "  " + "  |  ".join(sug))
+        else:
+            self.hints.setText(self.i18n.t("suggestions_empty"))
 
     def set_lint_tip(self, tip: str):
         """Show an educational tip in the HUD instead of standard suggestions"""
         if tip:
+            if self._lint_active and tip == self._lint_tip:
+                return
             self._lint_active = True
+            self._lint_tip = tip
             self.hints.setText(f"<span style='color:#ffae00'>💡 {tip}</span>")
             self.hints.setStyleSheet("font-weight: bold; font-size: 10pt;")
-        else:
+        elif self._lint_active:
             self._lint_active = False
+            self._lint_tip = None
+            self._hints_key = None
             self.hints.setStyleSheet("")
             # Next refresh will restore standard suggestions
 
 
 class SettingsWidget(QFrame):
     settings_changed = Signal(dict)
+    profile_selected = Signal(str)
+    profile_created = Signal(str)
 
     def __init__(self, parent_app, theme: Theme, i18n: I18N, initial_name: str):
         super().__init__()
@@ -2342,6 +2537,19 @@ class SettingsWidget(QFrame):
         self._title.setStyleSheet("font-size: 14pt; font-weight: 800;")
         root.addWidget(self._title)
 
+        # Profile row (shared machines: one profile per user)
+        row_profile = QHBoxLayout()
+        row_profile.setSpacing(12)
+        self.lbl_profile = QLabel("")
+        self.cb_profile = QComboBox()
+        self.cb_profile.activated.connect(lambda i: self.profile_selected.emit(self.cb_profile.itemData(i)))
+        self.btn_profile_new = QPushButton("")
+        self.btn_profile_new.clicked.connect(self._ask_new_profile)
+        row_profile.addWidget(self.lbl_profile)
+        row_profile.addWidget(self.cb_profile, 1)
+        row_profile.addWidget(self.btn_profile_new)
+        root.addLayout(row_profile)
+
         # Name row
         row_name = QHBoxLayout()
         row_name.setSpacing(12)
@@ -2362,8 +2570,8 @@ class SettingsWidget(QFrame):
 
         self.lbl_layout = QLabel("")
         self.cb_layout = QComboBox()
-        self.cb_layout.addItem("DE (QWERTZ)", "DE")
-        self.cb_layout.addItem("US (QWERTY)", "US")
+        for lid, lname in LAYOUTS.available():
+            self.cb_layout.addItem(lname, lid)
 
         self.lbl_mode = QLabel("")
         self.cb_mode = QComboBox()
@@ -2403,6 +2611,12 @@ class SettingsWidget(QFrame):
         self.chk_dark.setChecked(True)
         root.addWidget(self.chk_dark)
 
+        self.chk_fast_kb = QCheckBox("")
+        root.addWidget(self.chk_fast_kb)
+
+        self.chk_demo_rhythm = QCheckBox("")
+        root.addWidget(self.chk_demo_rhythm)
+
         self.btn_apply = QPushButton("")
         self.btn_apply.clicked.connect(self._emit)
         root.addWidget(self.btn_apply, alignment=Qt.AlignLeft)
@@ -2431,6 +2645,8 @@ class SettingsWidget(QFrame):
 
     def retranslate(self):
         self._title.setText(self.i18n.t("settings_title"))
+        self.lbl_profile.setText(self.i18n.t("settings_profile") + ":")
+        self.btn_profile_new.setText(self.i18n.t("profile_new"))
         self.lbl_name.setText(self.i18n.t("settings_name") + ":")
         self.ed_name.setPlaceholderText(self.i18n.t("settings_name_ph"))
 
@@ -2452,6 +2668,8 @@ class SettingsWidget(QFrame):
         self.cb_win.setItemText(2, self.i18n.t("win_borderless"))
 
         self.chk_dark.setText(self.i18n.t("setting_darkmode"))
+        self.chk_fast_kb.setText(self.i18n.t("setting_fast_keyboard"))
+        self.chk_demo_rhythm.setText(self.i18n.t("setting_demo_rhythm"))
         self.btn_apply.setText(self.i18n.t("apply"))
         
         self.lbl_lic_title.setText(self.i18n.t("licensing_title", fallback="Licensing"))
@@ -2465,8 +2683,24 @@ class SettingsWidget(QFrame):
             "mode": self.cb_mode.currentData(),
             "win_mode": self.cb_win.currentData(),
             "theme": "dark" if self.chk_dark.isChecked() else "light",
+            "kb_renderer": "atlas" if self.chk_fast_kb.isChecked() else "widgets",
+            "demo_rhythm": self.chk_demo_rhythm.isChecked(),
         })
 
+    def set_profiles(self, profiles: List[Tuple[str, str]], active: str):
+        self.cb_profile.blockSignals(True)
+        self.cb_profile.clear()
+        for pid, name in profiles:
+            self.cb_profile.addItem(name, pid)
+        idx = self.cb_profile.findData(active)
+        if idx >= 0: self.cb_profile.setCurrentIndex(idx)
+        self.cb_profile.blockSignals(False)
+
+    def _ask_new_profile(self):
+        name, ok = QInputDialog.getText(self, self.i18n.t("profile_new"), self.i18n.t("profile_new_prompt"))
+        if ok and name.strip():
+            self.profile_created.emit(name.strip())
+
     def apply_current(self, config: dict):
         self.ed_name.setText(config.get("name", ""))
         idx_l = self.cb_lang.findData(config.get("lang", "de"))
@@ -2478,10 +2712,69 @@ class SettingsWidget(QFrame):
         idx_w = self.cb_win.findData(config.get("win_mode", "windowed"))
         if idx_w >= 0: self.cb_win.setCurrentIndex(idx_w)
         self.chk_dark.setChecked(config.get("theme", "dark") == "dark")
+        self.chk_fast_kb.setChecked(config.get("kb_renderer", "widgets") == "atlas")
+        self.chk_demo_rhythm.setChecked(bool(config.get("demo_rhythm", True)))
 # ============================================================
 # KEYCAP + KEYBOARD
 # ============================================================
 
+_KEY_FONTS: Dict[Tuple[int, bool], QFont] = {}
+
+def _key_font(size: int, bold: bool = False) -> QFont:
+    f = _KEY_FONTS.get((size, bold))
+    if f is None:
+        f = QFont("Segoe UI", size)
+        f.setBold(bold)
+        _KEY_FONTS[(size, bold)] = f
+    return f
+
+def paint_keycap(p: QPainter, rect: QRect, state: str, hand: str, label: str, label2: str, theme: Theme, pal: dict):
+    """Draws one key into rect (shared by KeyCap and the atlas renderer)."""
+    w, h = rect.width(), rect.height()
+
+    if hand == "left":
+        base = QColor("#222b22") if theme.is_dark else QColor("#eafaea")
+    elif hand == "right":
+        base = QColor("#22222b") if theme.is_dark else QColor("#eaeafa")
+    else:
+        base = QColor(pal.get("key_bg", "#121620" if theme.is_dark else "#f2f5fb"))
+
+    if state == "wrong":
+        base = QColor(pal["key_wrong"])
+    elif state == "correct":
+        base = QColor(pal["key_correct"])
+    elif state == "pressed":
+        base = base.lighter(130)
+
+    p.setPen(Qt.NoPen)
+    p.setBrush(base)
+    side = min(w, h)
+    radius = max(2, int(side * 0.22))
+    p.drawRoundedRect(rect.adjusted(1, 1, -1, -1), radius, radius)
+
+    if state == "target":
+        ring = QColor(pal["key_target"])
+        p.setBrush(Qt.NoBrush)
+        p.setPen(QPen(ring, max(1, int(h * 0.10))))
+        p.drawRoundedRect(rect.adjusted(3, 3, -3, -3), radius, radius)
+
+    main_fs = max(6, int(h * 0.32)) # slightly larger ratio
+    sub_fs = max(5, int(h * 0.20))
+
+    # Relative margins for text - no hardcoded 10px anymore
+    mx = max(2, int(w * 0.12))
+    my = max(2, int(h * 0.10))
+
+    p.setPen(QColor(pal["key_text"]))
+    p.setFont(_key_font(main_fs, True))
+    p.drawText(rect.adjusted(mx, my, -mx, -my), Qt.AlignLeft | Qt.AlignTop, label)
+
+    if label2 and w > (mx * 4): # don't draw if too cramped
+        p.setPen(QColor(255, 255, 255, 180))
+        p.setFont(_key_font(sub_fs))
+        p.drawText(rect.adjusted(mx, my, -mx, -my), Qt.AlignRight | Qt.AlignTop, label2)
+
+
 class KeyCap(QFrame):
     def __init__(self, kid: str, label: str, label2: str, theme: Theme, layout_name_getter):
         super().__init__()
@@ -2509,59 +2802,10 @@ class KeyCap(QFrame):
         self.update()
 
     def paintEvent(self, event):
-        pal = self.theme.key_palette()
         p = QPainter(self)
         p.setRenderHint(QPainter.Antialiasing, True)
-
-        rect = self.rect()
-        layout_name = self.layout_name_getter()
-        hand = hand_for_kid(layout_name, self.kid)
-        
-        if hand == "left":
-            base = QColor("#222b22") if self.theme.is_dark else QColor("#eafaea")
-        elif hand == "right":
-            base = QColor("#22222b") if self.theme.is_dark else QColor("#eaeafa")
-        else:
-            base = QColor(pal.get("key_bg", "#121620" if self.theme.is_dark else "#f2f5fb"))
-
-        if self.state == "wrong":
-            base = QColor(pal["key_wrong"])
-        elif self.state == "correct":
-            base = QColor(pal["key_correct"])
-        elif self.state == "pressed":
-            base = base.lighter(130)
-
-        p.setPen(Qt.NoPen)
-        p.setBrush(base)
-        side = min(self._w, self._h)
-        radius = max(2, int(side * 0.22))
-        p.drawRoundedRect(rect.adjusted(1, 1, -1, -1), radius, radius)
-
-        if self.state == "target":
-            ring = QColor(pal["key_target"])
-            p.setBrush(Qt.NoBrush)
-            p.setPen(QPen(ring, max(1, int(self._h * 0.10))))
-            p.drawRoundedRect(rect.adjusted(3, 3, -3, -3), radius, radius)
-
-        main_fs = max(6, int(self._h * 0.32)) # slightly larger ratio
-        sub_fs = max(5, int(self._h * 0.20))
-
-        # Relative margins for text - no hardcoded 10px anymore
-        mx = max(2, int(self._w * 0.12))
-        my = max(2, int(self._h * 0.10))
-
-        p.setPen(QColor(pal["key_text"]))
-        f = QFont("Segoe UI", main_fs)
-        f.setBold(True)
-        p.setFont(f)
-        p.drawText(rect.adjusted(mx, my, -mx, -my), Qt.AlignLeft | Qt.AlignTop, self.label)
-
-        if self.label2 and self._w > (mx * 4): # don't draw if too cramped
-            p.setPen(QColor(255, 255, 255, 180))
-            f2 = QFont("Segoe UI", sub_fs)
-            p.setFont(f2)
-            p.drawText(rect.adjusted(mx, my, -mx, -my), Qt.AlignRight | Qt.AlignTop, self.label2)
-
+        hand = layout_table(self.layout_name_getter()).hand(self.kid)
+        paint_keycap(p, self.rect(), self.state, hand, self.label, self.label2, self.theme, self.theme.key_palette())
         p.end()
 
 
@@ -2579,11 +2823,11 @@ class KeyboardWidget(QFrame):
         self.row_spacers = []
         self.row_widgets = []
 
-        self._layout_cache: List[List[KeyDef]] = []
+        self._layout_cache: Tuple[Tuple[KeyDef, ...], ...] = ()
         self.build()
 
-    def current_layout(self) -> List[List[KeyDef]]:
-        return de_layout() if self.layout_name.upper() == "DE" else us_layout()
+    def current_layout(self) -> Tuple[Tuple[KeyDef, ...], ...]:
+        return LAYOUTS.get(self.layout_name).rows
 
     def set_layout(self, name: str):
         self.layout_name = name
@@ -2669,9 +2913,10 @@ class KeyboardWidget(QFrame):
             # Split row into left and right hands for a clean visual gap
             left_side = []
             right_side = []
+            table = layout_table(self.layout_name)
             for kd in row:
                 if kd.is_spacer: continue
-                hand = hand_for_kid(self.layout_name, kd.kid)
+                hand = table.hand(kd.kid)
                 if hand == "left": left_side.append(kd)
                 else: right_side.append(kd)
 
@@ -2706,7 +2951,7 @@ class KeyboardWidget(QFrame):
         super().paintEvent(event)
         # Split line and hand labels removed as requested
 
-    def _row_units(self, row: List[KeyDef]) -> float:
+    def _row_units(self, row: Tuple[KeyDef, ...]) -> float:
         return sum(kd.w for kd in row if not kd.is_spacer)
 
     def update_geometry_from_parent(self, scale: float = 1.0):
@@ -2760,33 +3005,234 @@ class KeyboardWidget(QFrame):
         self.update_geometry_from_parent()
 
 
+class AtlasKeyboardWidget(QFrame):
+    """
+    Alternative keyboard renderer: ein einziges Widget statt ~70 KeyCaps.
+    Jeder Key-State (idle/target/pressed/correct/wrong) wird einmal pro
+    (Layout, Theme, Scale) als komplette Tastatur in ein QPixmap-Atlas
+    gerendert; paintEvent kopiert nur noch Rechtecke daraus. State-Wechsel
+    invalidieren nur die Rect der betroffenen Taste.
+    Gleiche Public API wie KeyboardWidget.
+    """
+    STATES = ("idle", "target", "pressed", "correct", "wrong")
+
+    def __init__(self, theme: Theme):
+        super().__init__()
+        self.setObjectName("Panel")
+        self.theme = theme
+        self.layout_name = "DE"
+        self._target: Optional[str] = None
+        self._scale = 1.0
+
+        self._layout_cache: Tuple[Tuple[KeyDef, ...], ...] = ()
+        self._keys: Dict[str, KeyDef] = {}
+        self._rects: Dict[str, QRect] = {}
+        self._states: Dict[str, str] = {}
+        self._atlas: Dict[str, QPixmap] = {}
+        self._atlas_key = None
+
+        self.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+        self.build()
+
+    def current_layout(self) -> Tuple[Tuple[KeyDef, ...], ...]:
+        return LAYOUTS.get(self.layout_name).rows
+
+    def set_layout(self, name: str):
+        self.layout_name = name
+        self.build()
+
+    def set_theme(self, theme: Theme):
+        self.theme = theme
+        self._atlas.clear()
+        self.update()
+
+    def build(self):
+        self._layout_cache = self.current_layout()
+        self._keys = {kd.kid: kd for row in self._layout_cache for kd in row if not kd.is_spacer}
+        self._states = {kid: "idle" for kid in self._keys}
+        self._atlas.clear()
+        self.set_target_key(self._target)
+        self.update_geometry_from_parent(self._scale)
+
+    # ---------- geometry ----------
+    def update_geometry_from_parent(self, scale: float = 1.0):
+        self._scale = scale
+        unit = int(52 * scale)
+        key_h = unit
+        spacing = int(4 * scale)
+        m = int(4 * scale)
+        hs = int(10 * scale)
+        gap = hs + int(30 * scale) + hs
+
+        table = layout_table(self.layout_name)
+        rows = []
+        for row in self._layout_cache:
+            left_side = []
+            right_side = []
+            for kd in row:
+                if kd.is_spacer: continue
+                if table.hand(kd.kid) == "left": left_side.append(kd)
+                else: right_side.append(kd)
+            widths_l = [int(unit * kd.w) for kd in left_side]
+            widths_r = [int(unit * kd.w) for kd in right_side]
+            row_w = sum(widths_l) + sum(widths_r) + hs * max(0, len(widths_l) - 1) + hs * max(0, len(widths_r) - 1) + gap
+            rows.append((left_side, widths_l, right_side, widths_r, row_w))
+
+        content_w = max((r[4] for r in rows), default=0)
+        rects: Dict[str, QRect] = {}
+        y = m
+        for left_side, widths_l, right_side, widths_r, row_w in rows:
+            x = m + (content_w - row_w) // 2
+            for kd, w in zip(left_side, widths_l):
+                rects[kd.kid] = QRect(x, y, w, key_h)
+                x += w + hs
+            x += gap - hs
+            for kd, w in zip(right_side, widths_r):
+                rects[kd.kid] = QRect(x, y, w, key_h)
+                x += w + hs
+            y += key_h + spacing
+
+        self._rects = rects
+        num_rows = len(rows)
+        total_h = (num_rows * key_h) + (spacing * max(0, num_rows - 1)) + (m * 2)
+        self.setFixedSize(int(content_w + m * 2), int(total_h))
+        self._atlas.clear()
+        self.update()
+
+    # ---------- atlas ----------
+    def _atlas_for(self, state: str) -> QPixmap:
+        key = (self.layout_name, self.theme.mode, self.width(), self.height(), self.devicePixelRatioF())
+        if key != self._atlas_key:
+            self._atlas.clear()
+            self._atlas_key = key
+        pm = self._atlas.get(state)
+        if pm is None:
+            pm = self._render_atlas(state)
+            self._atlas[state] = pm
+        return pm
+
+    def _render_atlas(self, state: str) -> QPixmap:
+        dpr = self.devicePixelRatioF()
+        pm = QPixmap(max(1, int(self.width() * dpr)), max(1, int(self.height() * dpr)))
+        pm.setDevicePixelRatio(dpr)
+        pm.fill(Qt.transparent)
+        p = QPainter(pm)
+        p.setRenderHint(QPainter.Antialiasing, True)
+        pal = self.theme.key_palette()
+        table = layout_table(self.layout_name)
+        for kid, r in self._rects.items():
+            kd = self._keys[kid]
+            paint_keycap(p, r, state, table.hand(kid), kd.label, kd.label2, self.theme, pal)
+        p.end()
+        return pm
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        dirty = event.rect()
+        p = QPainter(self)
+        for kid, r in self._rects.items():
+            if not r.intersects(dirty):
+                continue
+            atlas = self._atlas_for(self._states.get(kid, "idle"))
+            p.drawPixmap(r, atlas, QRect(
+                int(r.x() * atlas.devicePixelRatio()), int(r.y() * atlas.devicePixelRatio()),
+                int(r.width() * atlas.devicePixelRatio()), int(r.height() * atlas.devicePixelRatio())
+            ))
+        p.end()
+
+    # ---------- state ----------
+    def _set_state(self, kid: str, state: str):
+        if self._states.get(kid) == state:
+            return
+        self._states[kid] = state
+        r = self._rects.get(kid)
+        if r is not None:
+            self.update(r)
+
+    def set_target_key(self, kid: Optional[str]):
+        prev = self._target
+        self._target = kid
+        if prev and prev != kid and self._states.get(prev) == "target":
+            self._set_state(prev, "idle")
+        if kid in self._states and self._states[kid] != "wrong":
+            self._set_state(kid, "target")
+
+    def _settle(self, kid: str):
+        self._set_state(kid, "target" if kid == self._target else "idle")
+
+    def flash_pressed(self, kid: Optional[str]):
+        if not kid or kid not in self._states:
+            return
+        self._set_state(kid, "pressed")
+        QTimer.singleShot(90, lambda: self._settle(kid))
+
+    def flash_wrong(self, kid: Optional[str]):
+        if not kid or kid not in self._states:
+            return
+        self._set_state(kid, "wrong")
+        QTimer.singleShot(240, lambda: self._settle(kid))
+
+    def flash_correct(self, kid: Optional[str]):
+        if not kid or kid not in self._states:
+            return
+        self._set_state(kid, "correct")
+        QTimer.singleShot(120, lambda: self._settle(kid))
+
+    def kid_center_global(self, kid: str) -> QPoint:
+        r = self._rects.get(kid)
+        if r is None:
+            return self.mapToGlobal(self.rect().center())
+        return self.mapToGlobal(r.center())
+
+
+def make_keyboard_widget(theme: Theme, renderer: str = "widgets") -> QFrame:
+    """'atlas' = single-widget pixmap renderer, anything else = one KeyCap per key."""
+    if renderer == "atlas":
+        return AtlasKeyboardWidget(theme)
+    return KeyboardWidget(theme)
+
+
 # ============================================================
 # BUBBLES
 # ============================================================
 
-@dataclass
-class Bubble:
-    x: float
-    y: float
-    r: float
-    vy: float
-    drift: float
-    color: QColor
-    life: float
-    born: float
-
-
 class BubbleBar(QFrame):
+    """
+    Partikel-Leiste über der Tastatur.
+    - Timer läuft nur, solange Partikel leben (idle = 0 CPU)
+    - spawn()-Bursts werden gesammelt und im nächsten Frame eingefügt
+    - feste, vorallokierte Arrays (kein Bubble-Objekt pro Partikel)
+    - wird ein Frame zu teuer, sinkt die Framerate (16 -> 33 -> 50 ms)
+    """
+    MAX_BUBBLES = 96
+    FRAME_MS = 16
+    MAX_FRAME_MS = 50
+    FRAME_BUDGET_MS = 6.0
+
     def __init__(self, theme: Theme):
         super().__init__()
         self.setObjectName("Panel2")
         self.theme = theme
-        self.bubbles: List[Bubble] = []
+
+        cap = self.MAX_BUBBLES
+        self._x = array("d", [0.0]) * cap
+        self._y = array("d", [0.0]) * cap
+        self._r = array("d", [0.0]) * cap
+        self._vy = array("d", [0.0]) * cap
+        self._drift = array("d", [0.0]) * cap
+        self._life = array("d", [0.0]) * cap
+        self._born = array("d", [0.0]) * cap
+        self._color: List[QColor] = [QColor() for _ in range(cap)]
+        self.count = 0
+
+        self._pending: List[Tuple[float, QColor]] = []
+        self._interval = self.FRAME_MS
+        self._cost_ms = 0.0
+        self._paint_ms = 0.0
         self.last = time.time()
 
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.tick)
-        self.timer.start(16)
 
     def apply_scale(self, s: float):
         # Reduced word bar (BubbleBar)
@@ -2798,35 +3244,82 @@ class BubbleBar(QFrame):
         # Height is now controlled by apply_scale
 
     def spawn(self, gp: QPoint, color: QColor):
-        lp = self.mapFromGlobal(gp)
-        now = time.time()
-        for _ in range(3):
-            self.bubbles.append(Bubble(
-                x=lp.x() + random.uniform(-10, 10),
-                y=self.height() + random.uniform(0, 8),
-                r=random.uniform(6, 12),
-                vy=random.uniform(70, 160),
-                drift=random.uniform(-20, 20),
-                color=color,
-                life=random.uniform(1.2, 2.1),
-                born=now
-            ))
+        if not self.isVisible():
+            return
+        self._pending.append((float(self.mapFromGlobal(gp).x()), color))
+        if not self.timer.isActive():
+            self.last = time.time()
+            self.timer.start(self._interval)
+
+    def _flush_pending(self, now: float):
+        cap = self.MAX_BUBBLES
+        h = self.height()
+        for px, color in self._pending:
+            for _ in range(3):
+                i = self.count
+                if i >= cap:
+                    # full: recycle the oldest slot
+                    i = min(range(cap), key=self._born.__getitem__)
+                else:
+                    self.count += 1
+                self._x[i] = px + random.uniform(-10, 10)
+                self._y[i] = h + random.uniform(0, 8)
+                self._r[i] = random.uniform(6, 12)
+                self._vy[i] = random.uniform(70, 160)
+                self._drift[i] = random.uniform(-20, 20)
+                self._life[i] = random.uniform(1.2, 2.1)
+                self._born[i] = now
+                self._color[i].setRgb(color.red(), color.green(), color.blue())
+        self._pending.clear()
 
     def tick(self):
+        t0 = time.perf_counter()
         now = time.time()
+        late_ms = (now - self.last) * 1000.0
         dt = min(0.05, max(0.001, now - self.last))
         self.last = now
-        alive = []
-        for b in self.bubbles:
-            if now - b.born > b.life:
+
+        if self._pending:
+            self._flush_pending(now)
+
+        x, y, vy, drift, life, born = self._x, self._y, self._vy, self._drift, self._life, self._born
+        n = self.count
+        i = 0
+        while i < n:
+            age = now - born[i]
+            if age > life[i]:
+                # swap-remove with the last live slot
+                n -= 1
+                if i != n:
+                    for arr in (x, y, self._r, vy, drift, life, born):
+                        arr[i] = arr[n]
+                    self._color[i], self._color[n] = self._color[n], self._color[i]
                 continue
-            b.y -= b.vy * dt
-            b.x += (b.drift + math.sin((now - b.born) * 4.0) * 6.0) * dt * 0.7
-            alive.append(b)
-        self.bubbles = alive
+            y[i] -= vy[i] * dt
+            x[i] += (drift[i] + math.sin(age * 4.0) * 6.0) * dt * 0.7
+            i += 1
+        self.count = n
+
         self.update()
+        if n == 0:
+            self.timer.stop()
+            self._interval = self.FRAME_MS
+            return
+
+        self._adapt_rate((time.perf_counter() - t0) * 1000.0 + self._paint_ms, late_ms)
+
+    def _adapt_rate(self, cost_ms: float, late_ms: float):
+        self._cost_ms = cost_ms if self._cost_ms == 0.0 else self._cost_ms * 0.8 + cost_ms * 0.2
+        over = self._cost_ms > self.FRAME_BUDGET_MS or late_ms > self._interval * 2.5
+        if over and self._interval < self.MAX_FRAME_MS:
+            self._interval = min(self.MAX_FRAME_MS, self._interval * 2)
+            self.timer.setInterval(self._interval)
+        elif not over and self._interval > self.FRAME_MS and self._cost_ms < self.FRAME_BUDGET_MS / 2:
+            self._interval = max(self.FRAME_MS, self._interval // 2)
+            self.timer.setInterval(self._interval)
 
     def paintEvent(self, e):
+        t0 = time.perf_counter()
         p = QPainter(self)
         p.setRenderHint(QPainter.Antialiasing, True)
 
@@ -2835,16 +3328,17 @@ class BubbleBar(QFrame):
         p.setBrush(QColor(255, 255, 255, 5) if self.theme.is_dark else QColor(0, 0, 0, 4))
         p.drawRoundedRect(r.adjusted(6, 6, -6, -6), 16, 16)
 
-        for b in self.bubbles:
-            age = time.time() - b.born
-            t = max(0.0, 1.0 - age / b.life)
-            c = QColor(b.color)
+        now = time.time()
+        for i in range(self.count):
+            t = max(0.0, 1.0 - (now - self._born[i]) / self._life[i])
+            c = self._color[i]
             c.setAlpha(int(220 * t))
             p.setBrush(c)
-            p.setPen(Qt.NoPen)
-            p.drawEllipse(QPoint(int(b.x), int(b.y)), int(b.r), int(b.r))
+            rad = int(self._r[i])
+            p.drawEllipse(QPoint(int(self._x[i]), int(self._y[i])), rad, rad)
 
         p.end()
+        self._paint_ms = (time.perf_counter() - t0) * 1000.0
 
 
 # ============================================================
@@ -2893,6 +3387,32 @@ def make_leaderboard_text(i18n: I18N, hs: dict) -> str:
 
     return "<br>".join(lines).strip()
 
+def make_personal_stats_text(i18n: I18N, history: ScoreHistory, mode: str, days: int = 7) -> str:
+    n = history.count(mode)
+    if not n:
+        return i18n.t("lb_none")
+    lines = [f"<b>{i18n.t('ps_sessions')}:</b> {n}", ""]
+
+    lines.append(f"<b>{i18n.t('ps_top')}</b>")
+    for i, e in enumerate(history.top(mode, 5), 1):
+        lines.append(f"{i}. {format_entry(e)}")
+    lines.append("")
+
+    lines.append(f"<b>{i18n.t('ps_percentiles')}</b>")
+    lines.append(" · ".join(f"P{p:g}: {v}" for p, v in history.points_percentiles(mode).items()))
+    last = history.recent(mode, 1)[0]
+    lines.append(i18n.t("ps_last", points=last["points"], pct=history.percentile_of(mode, last["points"])))
+    lines.append("")
+
+    lines.append(f"<b>{i18n.t('ps_trend', days=days)}</b>")
+    trend = history.trend(mode, days)
+    for day, count, wpm, acc in trend:
+        lines.append(f"{day}: {count}× · WPM {wpm:.1f} · ACC {acc:.1f}%")
+    if not trend:
+        lines.append(i18n.t("lb_none"))
+
+    return "<br>".join(lines).strip()
+
 
 # ============================================================
 # SECONDARY WINDOWS
@@ -2944,9 +3464,11 @@ class StatsWindow(QMainWindow):
         
         self.score_header = ScoreHeaderWidget(theme, i18n)
         self.leaderboard = LeaderboardWidget(theme, i18n)
+        self.personal = PersonalStatsWidget(theme, i18n)
         
         root.addWidget(self.score_header)
         root.addWidget(self.leaderboard)
+        root.addWidget(self.personal)
         
         self.setStyleSheet(theme.app_stylesheet())
         self.setWindowFlags(Qt.Window | Qt.Tool | Qt.WindowStaysOnTopHint)
@@ -2964,6 +3486,8 @@ class StatsWindow(QMainWindow):
         self.score_header.lbl_meta.setStyleSheet(f"font-size: {fs(10)}pt;")
         self.leaderboard.title.setStyleSheet(f"font-size: {fs(15)}pt; font-weight: 800;")
         self.leaderboard.body.setStyleSheet(f"font-size: {fs(11)}pt;")
+        self.personal.title.setStyleSheet(f"font-size: {fs(15)}pt; font-weight: 800;")
+        self.personal.body.setStyleSheet(f"font-size: {fs(11)}pt;")
 
 # ============================================================
 # MAIN WINDOW
@@ -2975,22 +3499,27 @@ class MainWindow(QMainWindow):
         self.theme = theme
         self.i18n = i18n
 
-        # load settings + highscores
+        # load settings + score history
         _ensure_dirs()
-        self.settings_data = load_json(SETTINGS_JSON, {
-            "name": "",
-            "lang": DEFAULT_LANG,
-            "layout": "DE",
-            "mode": "words",
-            "win_mode": "windowed",
-            "theme": "dark",
-        })
-        self.highscores = load_json(HIGHSCORES_JSON, hs_default())
+        # one profile per user on shared machines; its stores open lazily.
+        # In-memory copies are authoritative; saves are debounced atomic writes
+        self.profiles = ProfileIndex(DATA_DIR, SETTINGS_DEFAULTS)
+        self.profile = self.profiles.active()
+        self.settings_store = self.profile.settings
+        self.settings_data = self.settings_store.data
+
+        # every session goes into the local history; bests are queried from it
+        self.history = self.profile.history
+        if self.profile.id == ProfileIndex.DEFAULT_ID:
+            self.history.import_highscores(load_json(HIGHSCORES_JSON, {}))
 
         self.name = normalize_name(self.settings_data.get("name", ""))
         self.lang = self.settings_data.get("lang", i18n.lang)
         self.layout = self.settings_data.get("layout", "DE")
+        self.layout_table = layout_table(self.layout)
         self.mode = self.settings_data.get("mode", "words")
+        self.kb_renderer = self.settings_data.get("kb_renderer", "widgets")
+        self.demo_rhythm = bool(self.settings_data.get("demo_rhythm", True))
 
         self.setWindowTitle(APP_TITLE)
         self.setStyleSheet(theme.app_stylesheet())
@@ -2998,11 +3527,19 @@ class MainWindow(QMainWindow):
         self.items_words = DEFAULT_WORDS_DE[:]
         self.items_sent = DEFAULT_SENTENCES_DE[:]
 
+        # External corpora are only opened when a mode first needs them
+        self.corpora = CorpusRegistry(CORPUS_DIR)
+        if os.path.isfile(WORDLIST_TXT) and os.path.getsize(WORDLIST_TXT) > 0:
+            for lang in ("de", "en"):
+                self.corpora.add("words", lang, WORDLIST_TXT)
+        self._corpus_views: Dict[tuple, Optional[CorpusView]] = {}
+
         # DLC Management (Must be before coach/settings)
         self.dlc_manager = DLCManager(theme, i18n)
         self.dlc_manager.discover()
 
         self.coach = TypingCoach(self._items_for_mode(self.mode))
+        self.coach.import_stats(self.profile.coach_stats.data)
 
         self.session_active = False
         self.session_end = 0.0
@@ -3028,10 +3565,13 @@ class MainWindow(QMainWindow):
         self.right_hand = SquareHandPanel(theme, self.right_renderer)
         
         # Server Sync Integration
-        self.server_sync = ServerSync()
+        # All network I/O runs as coroutines on one event-loop thread
+        self.net = NetLoop()
+        self.server_sync = ServerSync(net=self.net)
+        self.session_log = SessionLogWriter(self.profile.sessions_dir)
         
         # Licensing
-        self.license_manager = LicenseManager()
+        self.license_manager = LicenseManager(net=self.net)
         self.license_manager.status_changed.connect(self._on_lic_status_changed)
         self.license_manager.check_silent()
         
@@ -3042,6 +3582,9 @@ class MainWindow(QMainWindow):
         
         self.win_settings = SettingsWindow(self, theme, i18n, self.name)
         self.win_settings.settings_widget.settings_changed.connect(self.apply_settings)
+        self.win_settings.settings_widget.set_profiles(self.profiles.profiles(), self.profile.id)
+        self.win_settings.settings_widget.profile_selected.connect(self.switch_profile)
+        self.win_settings.settings_widget.profile_created.connect(self.create_profile)
         self.win_stats = StatsWindow(self, theme, i18n)
         self.win_stats.mode_switched.connect(self._on_stats_mode_changed)
         
@@ -3081,13 +3624,13 @@ class MainWindow(QMainWindow):
         
         self.keyboard_lay.addWidget(self.left_hand, alignment=Qt.AlignCenter)
         
-        mid_kb = QVBoxLayout()
-        mid_kb.setContentsMargins(0, 0, 0, 0)
-        mid_kb.setSpacing(0)
-        self.keyboard = KeyboardWidget(theme)
+        self.mid_kb = QVBoxLayout()
+        self.mid_kb.setContentsMargins(0, 0, 0, 0)
+        self.mid_kb.setSpacing(0)
+        self.keyboard = make_keyboard_widget(theme, self.kb_renderer)
         self.keyboard.set_layout(self.layout)
-        mid_kb.addWidget(self.keyboard, alignment=Qt.AlignHCenter | Qt.AlignTop)
-        self.keyboard_lay.addLayout(mid_kb, 1)
+        self.mid_kb.addWidget(self.keyboard, alignment=Qt.AlignHCenter | Qt.AlignTop)
+        self.keyboard_lay.addLayout(self.mid_kb, 1)
         
         self.keyboard_lay.addWidget(self.right_hand, alignment=Qt.AlignCenter)
         
@@ -3148,13 +3691,15 @@ class MainWindow(QMainWindow):
         self.toast.setParent(central)
         self.toast.setFixedHeight(48)
 
-        # Demo orchestration state
+        # Demo playback: explanation pauses and typing come from one timeline
         self._demo_active = False
         self._current_demo_explain = ""
-        self._demo_steps = None
-        self._demo_timer = QTimer(self)
-        self._demo_timer.setSingleShot(True)
-        self._demo_timer.timeout.connect(self._exec_demo_step_typing)
+        self._demo_timing: Optional[TimingProfile] = None  # built from session logs on first demo
+        self.ghost = GhostTyper(wpm=DEMO_WPM, parent=self)
+        self.ghost.typed_count.connect(self._on_demo_char)
+        self.ghost.seeked.connect(self._on_demo_char)
+        self.ghost.segment_changed.connect(self._on_demo_segment)
+        self.ghost.finished.connect(self._on_demo_finished)
 
         self.installEventFilter(self)
 
@@ -3189,23 +3734,88 @@ class MainWindow(QMainWindow):
     def _finish_username_setup(self, name: str):
         self.name = name
         self.settings_data["name"] = name
-        save_json(SETTINGS_JSON, self.settings_data)
+        self.settings_store.save(self.settings_data)
+        self._rename_profile()
         self.user_overlay.hide()
         self.settings.ed_name.setText(name)
         self.score_header.lbl_name.setText(name)
         self.show_startup_overlay()
 
+    def _rename_profile(self):
+        # the profile list shows each profile under its user's name
+        self.profiles.rename(self.profile.id, self.name)
+        self.settings.set_profiles(self.profiles.profiles(), self.profile.id)
+
+    def switch_profile(self, pid: str):
+        """Swap to another user's stores; DLCs, corpora and the keyboard stay loaded."""
+        if pid == self.profile.id:
+            return
+        self._stop_demo()
+        if self.session_active:
+            # an interrupted session is not scored for anyone
+            self.session_active = False
+            self.timer.stop()
+            self.session_log.end()
+
+        self.profile.coach_stats.save(self.coach.export_stats())
+        self.profile.flush()
+
+        self.profile = self.profiles.activate(pid)
+        self.settings_store = self.profile.settings
+        self.history = self.profile.history
+        self.session_log.log_dir = self.profile.sessions_dir
+        self._demo_timing = None
+        self.coach.import_stats(self.profile.coach_stats.data)
+
+        cfg = dict(self.settings_store.data)
+        self.name = normalize_name(cfg.get("name", ""))
+        self.settings.apply_current(cfg)
+        self.settings.set_profiles(self.profiles.profiles(), self.profile.id)
+        # only what differs is re-applied (layout, renderer, theme, ...)
+        self.apply_settings(cfg)
+        self.score_header.lbl_name.setText(self.name)
+        self._refresh_leaderboard()  # local bests and stats are per profile
+
+        if not self.name:
+            self.show_username_setup()
+        else:
+            self.show_startup_overlay()
+
+    def create_profile(self, name: str):
+        name = normalize_name(name)
+        if not name:
+            return
+        if not is_name_allowed(name):
+            self.toast.show_msg(self.i18n.t("name_invalid"), 1400)
+            return
+        prof = self.profiles.create(name)
+        prof.settings.data.update({
+            "name": name,
+            "lang": self.lang,
+            "layout": self.layout,
+            "win_mode": self.settings_data.get("win_mode", "windowed"),
+            "theme": self.theme.mode,
+            "kb_renderer": self.kb_renderer,
+            "demo_rhythm": self.demo_rhythm,
+        })
+        prof.settings.save()
+        self.switch_profile(prof.id)
+
 
     def _items_for_mode(self, mode: str) -> List[str]:
         # Check DLCs first
         dlc = self.dlc_manager.get_module(mode)
         if dlc:
             all_items = []
-            for lesson in dlc.get("lessons", []):
+            for lesson in self.dlc_manager.lessons(mode):
                 all_items.extend(lesson.get("items", []))
             return [x.strip() + " " for x in all_items]
 
         items = []
+        if mode in ("words", "sentences"):
+            view = self._corpus_view(mode)
+            if view is not None:
+                return view
         if mode == "sentences":
             items = self.items_sent if self.lang == "de" else DEFAULT_SENTENCES_EN
             return items
@@ -3219,12 +3829,27 @@ class MainWindow(QMainWindow):
         # Add space to words for spacebar progression requirement
         return [x.strip() + " " for x in items]
 
+    def _corpus_view(self, kind: str) -> Optional[CorpusView]:
+        """Lazily served items from data/corpora (or wordlist.txt), limited to the layout's keys."""
+        key = (kind, self.lang, self.layout)
+        if key not in self._corpus_views:
+            corpus = self.corpora.get(kind, self.lang)
+            view = None
+            if corpus is not None:
+                charset = "".join(self.layout_table.char_to_kid)
+                view = corpus.view(charset=charset)
+            self._corpus_views[key] = view
+        return self._corpus_views[key]
+
     def open_html_dlc_window(self):
         """Open HTML Scholar course in a separate OS window (does NOT touch Main UI)."""
         spec_path = os.path.join(DATA_DIR, "dlc", "html", "qwertype_html_day_01.json")
+        bundled = False
         if not os.path.exists(spec_path):
             legacy_path = os.path.join(DATA_DIR, "dlc", "qwertype_html_dlc_spec_v1.json")
-            if os.path.exists(legacy_path):
+            if ("html_v1", 1) in self.dlc_manager.index.specs:
+                bundled = True  # packed .qtdlc bundle
+            elif os.path.exists(legacy_path):
                 spec_path = legacy_path
             else:
                 try:
@@ -3233,8 +3858,10 @@ class MainWindow(QMainWindow):
                     print("[ERROR] Missing spec:", spec_path)
                 return
         try:
-            with open(spec_path, "r", encoding="utf-8") as f:
-                spec_data = json.load(f)
+            if bundled:
+                spec_data = self.dlc_manager.day_spec("html_v1", 1)
+            else:
+                spec_data = self.dlc_manager.load_spec(spec_path)
         except Exception as e:
             try:
                 self.toast.show_msg(f"Error loading spec: {e}", 2500)
@@ -3247,7 +3874,11 @@ class MainWindow(QMainWindow):
             self.html_dlc_win.activateWindow()
             return
 
-        self.html_dlc_win = HtmlDlcWindow(self, self.theme, self.i18n, spec_data, DATA_DIR)
+        try:
+            self.html_dlc_win = HtmlDlcWindow(self, self.theme, self.i18n, spec_data, DATA_DIR)
+        except CourseSpecError as e:
+            self.toast.show_msg(f"Error loading spec: {e}", 4000)
+            return
         self.html_dlc_win.show()
 
     def _mode_bucket_key(self, mode: str) -> str:
@@ -3262,13 +3893,21 @@ class MainWindow(QMainWindow):
         self.settings.retranslate()
         self.score_header.set_i18n(self.i18n)
         self.leaderboard.set_i18n(self.i18n)
+        self.win_stats.personal.set_i18n(self.i18n)
 
     def closeEvent(self, event):
         # Stop sync timer
         if hasattr(self, 'sync_timer'):
             self.sync_timer.stop()
-            
-        # No need to stop lb_fetcher manually anymore because it's a daemon thread
+
+        self.session_log.close()
+        self.server_sync.close()
+        self.dlc_manager.index.close()
+        self.profile.coach_stats.save(self.coach.export_stats())
+        self.profiles.close()  # flushes settings/stats, closes history databases
+
+        # Abort in-flight requests and stop the network loop
+        self.net.shutdown()
         
         # Close secondary windows
         self.win_settings.close()
@@ -3276,18 +3915,22 @@ class MainWindow(QMainWindow):
         
         event.accept()
 
+    def _refresh_personal_stats(self, mode=None):
+        key = self._mode_bucket_key(mode if mode else self.mode)
+        self.win_stats.personal.set_text(make_personal_stats_text(self.i18n, self.history, key))
+
     def _refresh_leaderboard(self, mode=None):
         # Local fallback first
-        self.leaderboard.set_text(make_leaderboard_text(self.i18n, self.highscores))
+        self.leaderboard.set_text(make_leaderboard_text(self.i18n, self.history.bests(hs_default())))
         
         # Determine mode
         target_mode = mode if mode else self.mode
+        self._refresh_personal_stats(target_mode)
         
         # Start async fetch
         if hasattr(self, 'server_sync'):
-            if hasattr(self, 'lb_fetcher') and self.lb_fetcher and self.lb_fetcher.isRunning():
-                # For stats mode changes, we might want to kill the previous one
-                pass
+            # Supersede the previous fetch: its late results are discarded
+            self.server_sync.cancel_reads()
 
             self.leaderboard.note.setText("Fetching online...")
             
@@ -3332,6 +3975,7 @@ class MainWindow(QMainWindow):
         self.score_header._clear_added() # Clear previous list immediately
         
         # Fetch data
+        self.server_sync.cancel_reads()
         self.lb_fetcher = LeaderboardFetcher(self.server_sync, self.mode, username=username)
         # We don't really need to refresh the global leaderboard text every click, 
         # but the fetcher does both. We can just ignore the 'finished' signal if we want,
@@ -3491,6 +4135,7 @@ class MainWindow(QMainWindow):
                 self.settings.ed_name.setText(self.name)
             else:
                 self.name = new_name
+                self._rename_profile()
                 self.toast.show_msg(self.i18n.t("name_saved"), 900)
 
         new_lang = cfg.get("lang", self.lang)
@@ -3518,10 +4163,18 @@ class MainWindow(QMainWindow):
         new_layout = cfg.get("layout", self.layout)
         if new_layout != self.layout:
             self.layout = new_layout
+            self.layout_table = layout_table(self.layout)
             self.keyboard.set_layout(self.layout)
             self.toast.show_msg(self.i18n.t("saved"), 900)
             self._update_target()
 
+        new_kb = cfg.get("kb_renderer", self.kb_renderer)
+        if new_kb != self.kb_renderer:
+            self.kb_renderer = new_kb
+            self._rebuild_keyboard()
+
+        self.demo_rhythm = bool(cfg.get("demo_rhythm", self.demo_rhythm))
+
         new_mode = cfg.get("mode", self.mode)
         if True: # Always sync UI on apply to be safe
             self._stop_demo() # Safety kill
@@ -3547,8 +4200,21 @@ class MainWindow(QMainWindow):
             "mode": self.mode,
             "win_mode": cfg.get("win_mode", "windowed"),
             "theme": self.theme.mode,
+            "kb_renderer": self.kb_renderer,
+            "demo_rhythm": self.demo_rhythm,
         }
-        save_json(SETTINGS_JSON, self.settings_data)
+        self.settings_store.save(self.settings_data)
+
+    def _rebuild_keyboard(self):
+        """Swap the keyboard renderer in place (widgets <-> atlas)."""
+        old = self.keyboard
+        self.keyboard = make_keyboard_widget(self.theme, self.kb_renderer)
+        self.keyboard.set_layout(self.layout)
+        self.mid_kb.replaceWidget(old, self.keyboard)
+        old.hide()
+        old.deleteLater()
+        self._apply_responsive_sizes()
+        self._update_target()
 
     def _run_demo(self, demo_data: dict):
         """Play a scripted educational demo"""
@@ -3567,49 +4233,51 @@ class MainWindow(QMainWindow):
             if not code: return
             steps = [{"code": code, "explain": "Watching demo...", "pause": 1000}]
 
+        # Each step's "pause" is its reading time before the code is typed
+        timeline = DemoTimeline(steps, wpm=DEMO_WPM, default_pause_ms=DEMO_PAUSE_MS,
+                                timing=self.demo_timing())
+
         # Inject combined code into coach
-        full_code = "".join([s.get("code", "") for s in steps])
-        self.coach.current = full_code
+        self.coach.current = timeline.text
         self.coach.index = 0
         self.trainer.refresh(60.0, False, f"DEMO: {demo_data.get('name', 'Watching...')}")
-        
-        # ULTRA-SLOW WPM for educational demo (highly readable)
-        self.ghost = GhostTyper(wpm=120)
-        self.ghost.char_typed.connect(self._on_demo_char)
-        self.ghost.step_finished.connect(self._next_demo_step)
-        
-        self._demo_steps = iter(steps)
+
         self._current_demo_explain = ""
-        self._next_demo_step()
+        self.ghost.load(timeline)
+        self.ghost.play()
+
+    def demo_timing(self) -> Optional[TimingProfile]:
+        """This profile's recorded key rhythm for ghost demos; None when off or too little data."""
+        if not self.demo_rhythm:
+            return None
+        if self._demo_timing is None:
+            paths = list_sessions(self.profile.sessions_dir)[-DEMO_RHYTHM_SESSIONS:]
+            self._demo_timing = TimingProfile.from_sessions(paths)
+        return self._demo_timing if self._demo_timing.count >= DEMO_RHYTHM_MIN_KEYS else None
 
     def _stop_demo(self):
-        """Kills any running demo and pending timers"""
+        """Kills any running demo"""
         self._demo_active = False
-        self._demo_timer.stop()
-        if hasattr(self, 'ghost'):
-            self.ghost.stop()
-            try: self.ghost.char_typed.disconnect()
-            except: pass
-            try: self.ghost.step_finished.disconnect()
-            except: pass
-        self._demo_steps = None
+        self.ghost.stop()
         self._current_demo_explain = ""
 
     def _on_demo_char(self, count):
+        if not self._demo_active:
+            return
         self.coach.index = count
         
         # Ensure HUD and highights are perfectly in sync with typed chars
         if self._current_demo_explain:
              self.trainer.refresh(60.0, False, self._current_demo_explain)
         
-        # LIVE SYNC: Update the browser preview as we type
-        partial_code = self.coach.current[:count]
-        self.result_viewer.update_live_content(partial_code)
+        # LIVE SYNC: Update the browser preview as we type (sliced only when it renders)
+        code = self.coach.current
+        self.result_viewer.update_live_content(lambda: code[:count])
         
         # Highlight keys
         if count > 0 and count <= len(self.coach.current):
             ch = self.coach.current[count-1]
-            kid = kid_for_char(self.layout, ch.lower())
+            kid = self.layout_table.kid(ch)
             if kid:
                 self.keyboard.flash_correct(kid)
 
@@ -3631,24 +4299,16 @@ class MainWindow(QMainWindow):
              self.scholar_engine.hide()
              self._run_demo(demo_data)
 
-    def _next_demo_step(self):
-        try:
-            self._current_step_data = next(self._demo_steps)
-            self._current_demo_explain = f"📘 {self._current_step_data.get('explain', 'Teaching...')}"
-            
-            # Show explanation first
-            self.trainer.refresh(60.0, False, self._current_demo_explain)
-            
-            # Use longer delay to let user read the instruction before typing starts
-            # 4 seconds gives plenty of time to read the commentary
-            self._demo_timer.start(4000)
-            
-        except StopIteration:
-            self._current_demo_explain = "✅ Demo complete! Previewing result..."
+    def _on_demo_segment(self, idx):
+        if not self._demo_active:
+            return
+        # Show the explanation for the segment's pause, then it gets typed
+        explain = self.ghost.timeline.explains[idx]
+        self._current_demo_explain = f"📘 {explain or 'Teaching...'}"
+        self.trainer.refresh(60.0, False, self._current_demo_explain)
 
-    def _exec_demo_step_typing(self):
-        if hasattr(self, '_current_step_data'):
-            self.ghost.type_string(self._current_step_data.get("code", ""))
+    def _on_demo_finished(self):
+        self._current_demo_explain = "✅ Demo complete! Previewing result..."
 
     def _on_demo_step(self, idx):
         # Legacy callback - no longer used but kept for safety if disconnected
@@ -3681,11 +4341,13 @@ class MainWindow(QMainWindow):
         self.start_buffer = ""
         self.overlay.hide()
         self.timer.start(100)
+        self.session_log.begin(self.mode, self.layout)
         self.toast.show_msg(self.i18n.t("session_started"), 1100)
 
     def end_session(self):
         self.session_active = False
         self.timer.stop()
+        self.session_log.end()
         self.start_buffer = ""
 
         # finalize last metrics + score
@@ -3695,20 +4357,22 @@ class MainWindow(QMainWindow):
 
         self.score_header.set_score(self.last_points, self.last_wpm, self.last_acc, self.name)
 
-        # update highscores (offline)
+        # record the session (offline history); refresh the board on a new best
         key = self._mode_bucket_key(self.mode)
-        cur = self.highscores.get(key)
+        cur = self.history.best(key)
+        self.history.add(
+            key, self.name, self.last_wpm, self.last_acc, int(self.last_points),
+            duration=time.time() - self.coach.started,
+            layout=self.layout,
+            keystrokes=self.coach.total,
+            mistakes=self.coach.mistakes,
+        )
         if (not cur) or (self.last_points > int(cur.get("points", 0))):
-            self.highscores[key] = {
-                "name": self.name,
-                "points": int(self.last_points),
-                "wpm": float(self.last_wpm),
-                "acc": float(self.last_acc),
-                "ts": int(time.time()),
-            }
-            save_json(HIGHSCORES_JSON, self.highscores)
-            save_json(HIGHSCORES_JSON, self.highscores)
             self._refresh_leaderboard()
+        else:
+            self._refresh_personal_stats()
+        self.profile.coach_stats.save(self.coach.export_stats())
+        self._demo_timing = None  # pick up this session's rhythm next time
 
         # ONLINE SYNC
         if self.last_points > 0:
@@ -3787,11 +4451,11 @@ class MainWindow(QMainWindow):
 
     def _update_target(self):
         exp = self.coach.expected_char()
-        kid = kid_for_char(self.layout, exp) if exp else None
+        kid = self.layout_table.kid(exp)
         self.keyboard.set_target_key(kid)
 
         if kid:
-            hand, finger = finger_for_kid(self.layout, kid)
+            hand, finger = self.layout_table.finger(kid)
             self.left_hand.set_active_finger(finger if hand == "left" else None)
             self.right_hand.set_active_finger(finger if hand == "right" else None)
         else:
@@ -3824,7 +4488,7 @@ class MainWindow(QMainWindow):
             if not ch:
                 return False
 
-            if hasattr(self, 'ghost') and self.ghost.timer.isActive() or self._demo_timer.isActive():
+            if self.ghost.is_playing:
                 return True # Block manual keys during demo
 
             if not self.session_active:
@@ -3852,14 +4516,16 @@ class MainWindow(QMainWindow):
             correct, expected = self.coach.feed(ch2)
             self._update_target()
 
-            expected_kid = kid_for_char(self.layout, expected.lower()) if expected else None
-            typed_kid = kid_for_char(self.layout, ch2)
+            table = self.layout_table
+            expected_kid = table.kid(expected)
+            typed_kid = table.kid(ch2)
+            self.session_log.record(expected, ch2, correct, expected_kid)
 
             if typed_kid:
                 self.keyboard.flash_pressed(typed_kid)
 
             if expected_kid:
-                hand, _finger = finger_for_kid(self.layout, expected_kid)
+                hand = table.hand(expected_kid)
 
                 if correct:
                     color = QColor(70, 170, 255) if hand == "right" else QColor(70, 230, 140)
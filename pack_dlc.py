@@ -0,0 +1,53 @@
+"""
+Build a packed DLC bundle (.qtdlc) from a course pack directory.
+
+    python pack_dlc.py data/dlc/html_scholar
+    python pack_dlc.py data/dlc/html -o dist/html.qtdlc
+    python pack_dlc.py --list data/dlc/html.qtdlc
+
+Every *.json in the pack directory (course.json, qwertype_html_day_XX.json)
+becomes one document, split into one archive member per chapter/lesson;
+all other files are stored as assets. Drop the bundle into data/dlc/.
+"""
+import argparse
+import os
+import sys
+
+from qwertype_core.bundle import BUNDLE_EXT, BundleError, DlcBundle, pack_bundle
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Pack qwerType course files into a .qtdlc bundle")
+    ap.add_argument("sources", nargs="+", help="pack directories and/or course JSON files (or bundles with --list)")
+    ap.add_argument("-o", "--output", help=f"bundle path (default: <first source>{BUNDLE_EXT})")
+    ap.add_argument("--name", help="bundle name stored in the index")
+    ap.add_argument("--list", action="store_true", help="show the index of existing bundles instead")
+    args = ap.parse_args(argv)
+
+    try:
+        if args.list:
+            for path in args.sources:
+                with DlcBundle(path) as b:
+                    print(f"{path}: {b.index.get('name')}")
+                    for doc in b.documents():
+                        head = doc.get("header", {})
+                        label = head.get("id") or (head.get("meta") or {}).get("title") or ""
+                        print(f"  {doc['name']}: {label} ({len(doc.get('chapters', []))} chapters)")
+                    for asset in b.assets():
+                        print(f"  asset {asset}")
+            return 0
+
+        out = args.output or os.path.normpath(args.sources[0]).rstrip(os.sep) + BUNDLE_EXT
+        index = pack_bundle(args.sources, out, args.name)
+    except (OSError, ValueError, BundleError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    chapters = sum(len(d["chapters"]) for d in index["documents"])
+    print(f"Wrote {out}: {len(index['documents'])} documents, {chapters} chapters, "
+          f"{len(index['assets'])} assets, {os.path.getsize(out)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
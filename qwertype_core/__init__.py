@@ -0,0 +1,19 @@
+"""QwerType Core (internal module)
+
+UI-independent building blocks for the trainer window.
+"""
+
+from .layouts import KeyDef, Layout, LayoutError, LayoutRegistry, LayoutTable
+from .sessionlog import Keystroke, SessionLog, SessionLogWriter, list_sessions
+from .timing import TimingProfile
+from .drills import DrillSampler, weakness
+from .corpus import Corpus, CorpusRegistry, CorpusView
+from .outbox import Outbox
+from .netcache import NOT_MODIFIED, ResponseCache
+from .generations import ChannelTracker, GenerationToken
+from .aionet import AsyncHttpClient, HttpError, HttpResponse, NetLoop, Timeouts
+from .store import JsonStore, read_json, write_atomic
+from .history import ScoreHistory
+from .profiles import Profile, ProfileIndex
+from .bundle import BundleError, DlcBundle, pack_bundle
+from .dlcindex import DlcIndex
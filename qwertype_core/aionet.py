@@ -0,0 +1,328 @@
+from __future__ import annotations
+import asyncio
+import base64
+import json
+import ssl
+from concurrent.futures import Future
+from threading import Thread
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote, unquote, urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass
+
+from .generations import ChannelTracker
+
+# Minimal HTTP/1.1 JSON client on asyncio streams (stdlib only) plus a
+# dedicated event-loop thread. Any number of concurrent requests share the
+# loop thread and a small keep-alive connection pool per host.
+#
+# Like requests, it honours the system / HTTP(S)_PROXY / NO_PROXY proxy
+# settings (plain http:// proxies; https targets are tunnelled with CONNECT)
+# and follows redirects the same way: 307/308 repeat the request with its
+# body, 303 (and 302, or 301 after a POST) continue as a body-less GET. A
+# redirect that is not followed (too many, no Location) makes
+# raise_for_status() fail instead of passing as success.
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 5
+
+
+class Timeouts(NamedTuple):
+    connect: float = 5.0   # TCP + TLS handshake
+    read: float = 10.0     # each read from the socket
+    total: float = 20.0    # whole request, including queueing for a connection
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, reason: str, url: str):
+        super().__init__(f"{status} {reason} for {url}")
+        self.status = status
+
+
+class HttpResponse:
+    __slots__ = ("url", "status", "reason", "headers", "body")
+
+    def __init__(self, url: str, status: int, reason: str, headers: Dict[str, str], body: bytes):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers  # lower-case names
+        self.body = body
+
+    def json(self) -> Any:
+        return json.loads(self.body.decode("utf-8"))
+
+    def raise_for_status(self):
+        if self.status >= 400 or self.status in REDIRECT_CODES:
+            raise HttpError(self.status, self.reason, self.url)
+
+
+_Conn = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+_Proxy = Tuple[str, int, Optional[str]]  # host, port, Proxy-Authorization value
+_HostKey = Tuple[str, str, int, Optional[_Proxy]]
+
+
+def _parse_proxy(url: str) -> _Proxy:
+    if "://" not in url:
+        url = "http://" + url
+    parts = urlsplit(url)
+    if parts.scheme.lower() != "http" or not parts.hostname:
+        raise ValueError(f"unsupported proxy (only http:// proxies): {url}")
+    auth = None
+    if parts.username:
+        cred = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+        auth = "Basic " + base64.b64encode(cred.encode("utf-8")).decode("ascii")
+    return parts.hostname, parts.port or 80, auth
+
+
+class AsyncHttpClient:
+    """
+    One pooled client for the whole app. Must be used from a single event
+    loop (the NetLoop thread). ``proxies`` maps a scheme to a proxy URL;
+    by default the system settings are used (urllib's getproxies()).
+    """
+    def __init__(self, max_per_host: int = 4, user_agent: str = "qwerType",
+                 proxies: Optional[Dict[str, str]] = None):
+        self.max_per_host = max_per_host
+        self.user_agent = user_agent
+        self.proxies = getproxies() if proxies is None else proxies
+        self._idle: Dict[_HostKey, List[_Conn]] = {}
+        self._slots: Dict[_HostKey, asyncio.Semaphore] = {}
+        self._ssl: Optional[ssl.SSLContext] = None
+
+    async def request(self, method: str, url: str, json_body: Any = None,
+                      headers: Optional[Dict[str, str]] = None,
+                      timeout: Timeouts = Timeouts()) -> HttpResponse:
+        return await asyncio.wait_for(self._follow(method, url, json_body, headers, timeout), timeout.total)
+
+    async def _follow(self, method, url, json_body, headers, timeout: Timeouts) -> HttpResponse:
+        for _ in range(MAX_REDIRECTS + 1):
+            resp = await self._request(method, url, json_body, headers, timeout)
+            location = resp.headers.get("location")
+            if not location or resp.status not in REDIRECT_CODES:
+                return resp
+            url = urljoin(url, location)
+            if method != "HEAD" and (resp.status in (302, 303) or (resp.status == 301 and method == "POST")):
+                method, json_body = "GET", None
+        raise HttpError(resp.status, "too many redirects", url)
+
+    def _proxy_for(self, scheme: str, hostname: str) -> Optional[_Proxy]:
+        url = self.proxies.get(scheme) or self.proxies.get("all")
+        if not url or proxy_bypass(hostname):
+            return None
+        return _parse_proxy(url)
+
+    async def _request(self, method, url, json_body, headers, timeout: Timeouts) -> HttpResponse:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"unsupported URL: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        host = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+        # percent-encode as UTF-8 (user names in paths may hold spaces, umlauts, ...)
+        target = quote(parts.path or "/", safe="/%")
+        if parts.query:
+            target += "?" + quote(parts.query, safe="=&%+")
+
+        extra = []
+        proxy = self._proxy_for(scheme, parts.hostname)
+        if proxy is not None and scheme == "http":
+            # plain http goes to the proxy itself, one pool for all origins
+            key: _HostKey = ("http", "", 0, proxy)
+            target = f"http://{host}{target}"
+            if proxy[2]:
+                extra.append(f"Proxy-Authorization: {proxy[2]}")
+        else:
+            key = (scheme, parts.hostname, port, proxy)
+
+        body = b""
+        head = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {host}",
+            *extra,
+            f"User-Agent: {self.user_agent}",
+            "Accept: application/json",
+            "Accept-Encoding: identity",
+            "Connection: keep-alive",
+        ]
+        if json_body is not None:
+            body = json.dumps(json_body, ensure_ascii=False).encode("utf-8")
+            head.append("Content-Type: application/json")
+        if json_body is not None or method in ("POST", "PUT", "PATCH"):
+            head.append(f"Content-Length: {len(body)}")
+        for name, value in (headers or {}).items():
+            head.append(f"{name}: {value}")
+        payload = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+        slots = self._slots.get(key)
+        if slots is None:
+            slots = self._slots[key] = asyncio.Semaphore(self.max_per_host)
+        async with slots:
+            for attempt in (0, 1):
+                conn, reused = await self._acquire(key, timeout.connect)
+                try:
+                    resp, keep = await self._exchange(conn, url, method, payload, timeout.read)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    self._discard(conn)
+                    if reused and attempt == 0:
+                        continue  # the server closed an idle keep-alive connection
+                    raise
+                except BaseException:
+                    self._discard(conn)
+                    raise
+                if keep:
+                    self._idle.setdefault(key, []).append(conn)
+                else:
+                    self._discard(conn)
+                return resp
+        raise ConnectionError(f"no connection to {host}")
+
+    async def _acquire(self, key: _HostKey, connect_timeout: float) -> Tuple[_Conn, bool]:
+        idle = self._idle.get(key)
+        while idle:
+            conn = idle.pop()
+            if not conn[1].is_closing() and not conn[0].at_eof():
+                return conn, True
+            self._discard(conn)
+        scheme, hostname, port, proxy = key
+        ctx = None
+        if scheme == "https":
+            if self._ssl is None:
+                self._ssl = ssl.create_default_context()
+            ctx = self._ssl
+        if proxy is None:
+            opening = asyncio.open_connection(hostname, port, ssl=ctx)
+        elif ctx is None:
+            opening = asyncio.open_connection(proxy[0], proxy[1])
+        else:
+            opening = self._tunnel(proxy, hostname, port, ctx)
+        conn = await asyncio.wait_for(opening, connect_timeout)
+        return conn, False
+
+    @staticmethod
+    async def _tunnel(proxy: _Proxy, hostname: str, port: int, ctx: ssl.SSLContext) -> _Conn:
+        """CONNECT through an http proxy, then TLS to the target over the tunnel."""
+        reader, writer = await asyncio.open_connection(proxy[0], proxy[1])
+        try:
+            head = [f"CONNECT {hostname}:{port} HTTP/1.1", f"Host: {hostname}:{port}"]
+            if proxy[2]:
+                head.append(f"Proxy-Authorization: {proxy[2]}")
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+            await writer.drain()
+            status = (await reader.readline()).decode("latin-1").strip()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            if status.split(" ", 2)[1:2] != ["200"]:
+                raise ConnectionError(f"proxy {proxy[0]}:{proxy[1]} refused CONNECT "
+                                      f"to {hostname}:{port}: {status or 'no response'}")
+            if not hasattr(writer, "start_tls"):
+                raise ConnectionError("https through a proxy needs Python 3.11 or newer")
+            await writer.start_tls(ctx, server_hostname=hostname)
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    @staticmethod
+    def _discard(conn: _Conn):
+        try:
+            conn[1].close()
+        except Exception:
+            pass
+
+    async def _exchange(self, conn: _Conn, url: str, method: str, payload: bytes,
+                        read_timeout: float) -> Tuple[HttpResponse, bool]:
+        reader, writer = conn
+
+        async def read(op):
+            return await asyncio.wait_for(op, read_timeout)
+
+        writer.write(payload)
+        await read(writer.drain())
+
+        while True:
+            line = await read(reader.readline())
+            if not line:
+                raise ConnectionError("connection closed before response")
+            version, _, rest = line.decode("latin-1").strip().partition(" ")
+            code, _, reason = rest.partition(" ")
+            status = int(code)
+            headers: Dict[str, str] = {}
+            while True:
+                h = await read(reader.readline())
+                if h in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = h.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            if status != 100:
+                break
+
+        keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await read(reader.readline())).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await read(reader.readline())) not in (b"\r\n", b"\n", b""):
+                        pass  # trailers
+                    break
+                chunks.append(await read(reader.readexactly(size)))
+                await read(reader.readexactly(2))
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await read(reader.readexactly(int(headers["content-length"])))
+        else:
+            body = await read(reader.read())
+            keep = False
+        return HttpResponse(url, status, reason, headers, body), keep
+
+    async def close(self):
+        for conns in self._idle.values():
+            for conn in conns:
+                self._discard(conn)
+        self._idle.clear()
+
+
+class NetLoop(ChannelTracker):
+    """
+    A dedicated thread running an asyncio event loop, with the shared
+    AsyncHttpClient. ``submit`` schedules a coroutine from any thread and
+    returns a concurrent Future, grouped into ChannelTracker channels;
+    cancel() aborts queued and running requests alike, and generation
+    tokens mark any result that still arrives as superseded.
+    """
+    def __init__(self, name: str = "net-loop"):
+        super().__init__()
+        self.loop = asyncio.new_event_loop()
+        self.client = AsyncHttpClient()
+        self._thread = Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro, channel: str = "default") -> Optional[Future]:
+        fut = self._track(channel, lambda: asyncio.run_coroutine_threadsafe(coro, self.loop))
+        if fut is None:
+            coro.close()
+        return fut
+
+    def call_soon(self, fn, *args):
+        """Run a plain callable on the loop thread."""
+        if not self._closed:
+            self.loop.call_soon_threadsafe(fn, *args)
+
+    def shutdown(self, timeout: float = 2.0):
+        """Cancel everything in flight, close pooled connections, stop the loop."""
+        if self._closed:
+            return
+        self.cancel()
+        try:
+            asyncio.run_coroutine_threadsafe(self.client.close(), self.loop).result(timeout)
+        except Exception:
+            pass
+        with self._lock:
+            self._closed = True
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
@@ -0,0 +1,201 @@
+from __future__ import annotations
+import json
+import os
+import zipfile
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence
+
+# A DLC bundle (``*.qtdlc``) is a zip archive, so every member can be read on
+# its own (random access through the central directory):
+#
+#   index.json                     header index, always the first member
+#   docs/<doc>/body.json           the document minus its chapter list
+#   docs/<doc>/chapters/NNN.json   one member per chapter (or lesson)
+#   assets/<path>                  images etc. from the pack directory
+#
+# JSON members are written compact. A document is any of today's course
+# files: a module (course.json, has "id", chapters are its "lessons") or a
+# day spec (qwertype_html_day_XX.json, has "meta", "course": {"chapters"}).
+BUNDLE_EXT = ".qtdlc"
+BUNDLE_FORMAT = "qwertype-dlc-bundle"
+BUNDLE_VERSION = 1
+INDEX_MEMBER = "index.json"
+
+HEADER_KEYS = ("id", "title", "version", "author", "branding")
+SPLIT_PATHS = (("course", "chapters"), ("lessons",))
+# already compressed; deflating them again only costs time
+STORED_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".mp3", ".mp4", ".webm", ".ogg", ".zip"}
+
+
+class BundleError(Exception):
+    pass
+
+
+def _compact(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def chapter_path(doc: dict) -> Optional[Sequence[str]]:
+    for path in SPLIT_PATHS:
+        node: Any = doc
+        for key in path:
+            node = node.get(key) if isinstance(node, dict) else None
+        if isinstance(node, list):
+            return path
+    return None
+
+
+def doc_header(doc: dict) -> Dict[str, Any]:
+    """The small fields kept in the index (course header or day-spec meta)."""
+    head: Dict[str, Any] = {k: doc[k] for k in HEADER_KEYS if k in doc}
+    if isinstance(doc.get("meta"), dict):
+        head["meta"] = doc["meta"]
+    return head
+
+
+class DlcBundle:
+    """Read access to one bundle; chapters and assets are inflated one at a time."""
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = Lock()  # ZipFile reads share one file handle
+        self._zip = zipfile.ZipFile(path)
+        try:
+            index = json.loads(self._zip.read(INDEX_MEMBER))
+        except (KeyError, ValueError) as e:
+            self._zip.close()
+            raise BundleError(f"{path}: no valid {INDEX_MEMBER}: {e}") from None
+        if index.get("format") != BUNDLE_FORMAT or index.get("version") != BUNDLE_VERSION:
+            self._zip.close()
+            raise BundleError(f"{path}: unsupported bundle format")
+        self.index = index
+        self._docs: Dict[str, dict] = {d["name"]: d for d in index.get("documents", [])}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._zip.close()
+
+    def _json(self, member: str) -> Any:
+        with self._lock:
+            data = self._zip.read(member)
+        return json.loads(data)
+
+    def documents(self) -> List[dict]:
+        """Index entries: name, header, chapters (title + member per chapter)."""
+        return list(self._docs.values())
+
+    def _doc(self, name: str) -> dict:
+        try:
+            return self._docs[name]
+        except KeyError:
+            raise BundleError(f"{self.path}: no document {name!r}") from None
+
+    def chapter_count(self, name: str) -> int:
+        return len(self._doc(name).get("chapters", []))
+
+    def chapter(self, name: str, i: int) -> Any:
+        chapters = self._doc(name).get("chapters", [])
+        if not 0 <= i < len(chapters):
+            raise BundleError(f"{self.path}: {name!r} has no chapter {i}")
+        return self._json(chapters[i]["member"])
+
+    def body(self, name: str) -> dict:
+        """The document without its chapters (the list is left empty)."""
+        return self._json(self._doc(name)["body"])
+
+    def document(self, name: str) -> dict:
+        """The whole document, as it was before packing."""
+        entry = self._doc(name)
+        doc = self.body(name)
+        split = entry.get("split")
+        if split:
+            node = doc
+            for key in split[:-1]:
+                node = node[key]
+            node[split[-1]] = [self._json(c["member"]) for c in entry["chapters"]]
+        return doc
+
+    def assets(self) -> List[str]:
+        return list(self.index.get("assets", []))
+
+
+def pack_bundle(sources: Sequence[str], out_path: str, name: Optional[str] = None) -> dict:
+    """
+    Build a bundle from pack directories and/or single JSON files. Every
+    ``*.json`` of a directory becomes a document; its other files become
+    assets. Returns the written index.
+    """
+    docs: List[tuple] = []     # (doc name, file path)
+    assets: List[tuple] = []   # (asset name, file path)
+    for src in sources:
+        if os.path.isdir(src):
+            for dirpath, dirnames, filenames in os.walk(src):
+                dirnames.sort()
+                for fn in sorted(filenames):
+                    path = os.path.join(dirpath, fn)
+                    rel = os.path.relpath(path, src).replace(os.sep, "/")
+                    if fn.endswith(".json") and dirpath == src:
+                        docs.append((fn[:-5], path))
+                    elif not fn.startswith("."):
+                        assets.append((rel, path))
+        else:
+            docs.append((os.path.splitext(os.path.basename(src))[0], src))
+    if not docs:
+        raise BundleError("nothing to pack: no course JSON found")
+
+    index: Dict[str, Any] = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "name": name or os.path.splitext(os.path.basename(out_path))[0],
+        "documents": [],
+        "assets": [],
+    }
+    members: List[tuple] = []  # (member name, bytes)
+    seen = set()
+    for doc_name, path in docs:
+        if doc_name in seen:
+            raise BundleError(f"duplicate document name {doc_name!r}")
+        seen.add(doc_name)
+        with open(path, "r", encoding="utf-8") as f:
+            doc = json.load(f)
+        if not isinstance(doc, dict):
+            raise BundleError(f"{path}: not a JSON object")
+        entry: Dict[str, Any] = {"name": doc_name, "header": doc_header(doc),
+                                 "body": f"docs/{doc_name}/body.json", "chapters": []}
+        split = chapter_path(doc)
+        if split:
+            entry["split"] = list(split)
+            node = doc
+            for key in split[:-1]:
+                node = node[key]
+            for i, ch in enumerate(node[split[-1]]):
+                member = f"docs/{doc_name}/chapters/{i:03d}.json"
+                ch_d = ch if isinstance(ch, dict) else {}
+                title = ch_d.get("title") or ch_d.get("name")
+                steps = ch_d.get("steps") or ch_d.get("items")
+                entry["chapters"].append({"title": title or f"{i + 1}", "member": member,
+                                          "size": len(steps) if isinstance(steps, list) else 0})
+                members.append((member, _compact(ch)))
+            node[split[-1]] = []
+        members.append((entry["body"], _compact(doc)))
+        index["documents"].append(entry)
+    index["assets"] = [a for a, _ in assets]
+
+    tmp = f"{out_path}.tmp{os.getpid()}"
+    try:
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as z:
+            z.writestr(INDEX_MEMBER, _compact(index))
+            for member, data in members:
+                z.writestr(member, data)
+            for rel, path in assets:
+                ctype = zipfile.ZIP_STORED if os.path.splitext(rel)[1].lower() in STORED_EXTS else zipfile.ZIP_DEFLATED
+                z.write(path, "assets/" + rel, compress_type=ctype)
+        os.replace(tmp, out_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return index
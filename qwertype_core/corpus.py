@@ -0,0 +1,206 @@
+from __future__ import annotations
+import mmap
+import os
+import random
+import struct
+from array import array
+from threading import Lock
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+# Corpus files are UTF-8 text, one item per line, most frequent first
+# (the usual layout of frequency lists). Anything after a TAB is ignored,
+# so "word<TAB>count" lists work unchanged. Blank lines are skipped.
+#
+# The line-offset index is kept next to the corpus as ``<file>.idx``:
+# a 32-byte header (magic, version, source size, source mtime) followed by
+# one uint64 start offset per item. It is rebuilt when the source changes.
+IDX_MAGIC = b"QTIX"
+IDX_VERSION = 1
+IDX_HEADER = struct.Struct("<4sIQd8x")
+IDX_EXT = ".idx"
+
+
+class Corpus:
+    """
+    A memory-mapped item list. Nothing is read until the first access;
+    items are decoded one line at a time on demand.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = Lock()
+        self._mm: Optional[mmap.mmap] = None
+        self._offsets: Optional[Sequence[int]] = None
+
+    def _open(self):
+        if self._offsets is not None:
+            return
+        with self._lock:
+            if self._offsets is not None:
+                return
+            st = os.stat(self.path)
+            if st.st_size == 0:
+                self._offsets = ()
+                return
+            with open(self.path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._offsets = self._load_index(st) or self._build_index(st)
+
+    def _load_index(self, st) -> Optional[Sequence[int]]:
+        try:
+            with open(self.path + IDX_EXT, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(mm) < IDX_HEADER.size:
+            mm.close()
+            return None
+        magic, version, size, mtime = IDX_HEADER.unpack_from(mm, 0)
+        body = len(mm) - IDX_HEADER.size
+        if magic != IDX_MAGIC or version != IDX_VERSION or size != st.st_size \
+                or mtime != st.st_mtime or body % 8:
+            mm.close()
+            return None
+        # zero-copy view; keeps the index mapping alive
+        return memoryview(mm)[IDX_HEADER.size:].cast("Q")
+
+    def _build_index(self, st) -> Sequence[int]:
+        mm = self._mm
+        offsets = array("Q")
+        pos, end = 0, len(mm)
+        while pos < end:
+            nl = mm.find(b"\n", pos)
+            if nl < 0:
+                nl = end
+            if mm[pos:nl].strip():
+                offsets.append(pos)
+            pos = nl + 1
+        tmp = self.path + IDX_EXT + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(IDX_HEADER.pack(IDX_MAGIC, IDX_VERSION, st.st_size, st.st_mtime))
+                offsets.tofile(f)
+            os.replace(tmp, self.path + IDX_EXT)
+        except OSError:
+            pass  # read-only location: the in-memory index still works
+        return offsets
+
+    def __len__(self) -> int:
+        self._open()
+        return len(self._offsets)
+
+    def __getitem__(self, i: int) -> str:
+        self._open()
+        start = self._offsets[i]
+        mm = self._mm
+        end = mm.find(b"\n", start)
+        if end < 0:
+            end = len(mm)
+        tab = mm.find(b"\t", start, end)
+        if tab >= 0:
+            end = tab
+        return mm[start:end].decode("utf-8", "replace").strip()
+
+    def view(self, band: Optional[Tuple[float, float]] = None,
+             charset: Optional[str] = None,
+             min_len: int = 0, max_len: int = 0) -> "CorpusView":
+        return CorpusView(self, band, charset, min_len, max_len)
+
+
+class CorpusView:
+    """
+    A lazily served slice of a Corpus: a frequency band (fractions of the
+    rank range, e.g. (0.0, 0.1) for the top 10 %), optionally restricted to
+    a character set and an item length. Creating a view is O(1); items are
+    drawn by rejection sampling inside the band. Only a filter that rejects
+    almost everything triggers a one-off scan of the band.
+    """
+    MAX_TRIES = 64
+
+    def __init__(self, corpus: Corpus, band: Optional[Tuple[float, float]] = None,
+                 charset: Optional[str] = None, min_len: int = 0, max_len: int = 0):
+        self.corpus = corpus
+        self.band = band or (0.0, 1.0)
+        self.charset: Optional[FrozenSet[str]] = frozenset(charset) if charset else None
+        self.min_len = min_len
+        self.max_len = max_len
+        self._range: Optional[Tuple[int, int]] = None
+        self._matches: Optional[array] = None
+
+    def _bounds(self) -> Tuple[int, int]:
+        if self._range is None:
+            n = len(self.corpus)
+            lo = max(0, min(n, int(self.band[0] * n)))
+            hi = max(lo, min(n, int(round(self.band[1] * n))))
+            self._range = (lo, hi)
+        return self._range
+
+    def accepts(self, item: str) -> bool:
+        if not item:
+            return False
+        if self.min_len and len(item) < self.min_len:
+            return False
+        if self.max_len and len(item) > self.max_len:
+            return False
+        if self.charset is not None and not self.charset.issuperset(item):
+            return False
+        return True
+
+    def __len__(self) -> int:
+        lo, hi = self._bounds()
+        return hi - lo
+
+    def __getitem__(self, i: int) -> str:
+        lo, hi = self._bounds()
+        if i < 0:
+            i += hi - lo
+        if not 0 <= i < hi - lo:
+            raise IndexError(i)
+        return self.corpus[lo + i]
+
+    def choice(self, rng=random) -> Optional[str]:
+        lo, hi = self._bounds()
+        if hi <= lo:
+            return None
+        corpus = self.corpus
+        if self._matches is None:
+            for _ in range(self.MAX_TRIES):
+                item = corpus[lo + int(rng.random() * (hi - lo))]
+                if self.accepts(item):
+                    return item
+            # the filter is too sparse for rejection sampling: index the
+            # matching ranks once, then keep drawing from that list
+            self._matches = array("I", (i for i in range(lo, hi) if self.accepts(corpus[i])))
+        if not self._matches:
+            return None
+        return corpus[self._matches[int(rng.random() * len(self._matches))]]
+
+    def sample(self, k: int, rng=random) -> List[str]:
+        """Up to ``k`` matching items (with repetition for small views)."""
+        out: List[str] = []
+        for _ in range(k):
+            item = self.choice(rng)
+            if item is None:
+                break
+            out.append(item)
+        return out
+
+
+class CorpusRegistry:
+    """
+    Finds ``<corpus_dir>/<kind>_<lang>.txt`` (e.g. ``words_de.txt``) on demand.
+    Files are only opened when a mode actually uses them.
+    """
+    def __init__(self, corpus_dir: str):
+        self.corpus_dir = corpus_dir
+        self._cache: Dict[str, Optional[Corpus]] = {}
+
+    def get(self, kind: str, lang: str) -> Optional[Corpus]:
+        key = f"{kind}_{lang}"
+        if key not in self._cache:
+            path = os.path.join(self.corpus_dir, key + ".txt")
+            self._cache[key] = Corpus(path) if os.path.isfile(path) and os.path.getsize(path) > 0 else None
+        return self._cache[key]
+
+    def add(self, kind: str, lang: str, path: str):
+        """Register an explicit file (e.g. a user word list) for ``kind``/``lang``."""
+        self._cache[f"{kind}_{lang}"] = Corpus(path)
@@ -0,0 +1,281 @@
+from __future__ import annotations
+import json
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .bundle import BUNDLE_EXT, BundleError, DlcBundle, chapter_path, doc_header
+from .store import read_json, write_atomic
+
+# Course packs are data/dlc/<pack>/*.json or packed data/dlc/*.qtdlc
+# bundles. The manifest (``<dlc_dir>/.index.json``) keeps, per file, its
+# size and mtime plus the small header fields the UI needs before a course
+# is opened; a file is only read again when its size or mtime changed.
+#
+# Documents with an "id" are trainer modules (listed in ``headers``); day
+# specs (``"meta": {"course_id", "day"}``) are listed in ``specs``.
+MANIFEST_NAME = ".index.json"
+MANIFEST_VERSION = 2
+
+_Stamp = Tuple[int, int]
+_DocRef = Tuple[str, Optional[str]]  # (file relative to dlc_dir, bundle document or None)
+
+
+def _stamp(path: str) -> _Stamp:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _read(path: str) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _describe_doc(head: dict) -> dict:
+    """Manifest entry of one document: module header, day-spec key, or error."""
+    meta = head.get("meta")
+    if isinstance(head.get("id"), str) and head["id"]:
+        out = {k: v for k, v in head.items() if k != "meta"}
+        out.setdefault("title", head["id"])
+        return {"header": out}
+    if isinstance(meta, dict) and meta.get("course_id") and meta.get("day") is not None:
+        return {"spec": [str(meta["course_id"]), int(meta["day"])]}
+    return {"error": "no course id"}
+
+
+class DlcIndex:
+    """
+    Installed course packs: headers from the manifest, bodies on demand.
+
+    ``scan()`` touches every pack file with a stat only (reading new or
+    changed ones); ``load(id)`` parses a course on first use and keeps the
+    ``max_loaded`` most recently used bodies. ``body(id)`` skips the
+    chapters where it can, and ``chapter(id, i)`` reads one of them: from a
+    bundle only that member is inflated.
+    """
+    def __init__(self, dlc_dir: str, max_loaded: int = 4):
+        self.dlc_dir = dlc_dir
+        self.manifest_path = os.path.join(dlc_dir, MANIFEST_NAME)
+        self.max_loaded = max_loaded
+        self.headers: Dict[str, dict] = {}  # id -> header fields + "_path", "_file" (+ "_doc")
+        self.specs: Dict[Tuple[str, int], _DocRef] = {}  # (course_id, day) -> document
+        self._files: Dict[str, dict] = {}   # relative file -> manifest record
+        self._lock = Lock()
+        self._loaded: "OrderedDict[str, Tuple[_Stamp, Any]]" = OrderedDict()
+        self._bundles: Dict[str, Tuple[_Stamp, DlcBundle]] = {}
+
+    # --- manifest ---
+
+    def _candidates(self) -> List[str]:
+        out = []
+        try:
+            entries = sorted(os.scandir(self.dlc_dir), key=lambda e: e.name)
+        except OSError:
+            return out
+        for e in entries:
+            if e.is_dir():
+                out.extend(f"{e.name}/{n}" for n in sorted(os.listdir(e.path)) if n.endswith(".json"))
+            elif e.name.endswith(BUNDLE_EXT):
+                out.append(e.name)
+        return out
+
+    def scan(self) -> int:
+        """Refresh the manifest from disk; returns how many files had to be read."""
+        cached = read_json(self.manifest_path, None)
+        old = cached.get("files", {}) if isinstance(cached, dict) and cached.get("version") == MANIFEST_VERSION else {}
+        files: Dict[str, dict] = {}
+        parsed = 0
+        for rel in self._candidates():
+            path = os.path.join(self.dlc_dir, rel)
+            try:
+                size, mtime_ns = _stamp(path)
+            except OSError:
+                continue
+            rec = old.get(rel)
+            if not rec or rec.get("size") != size or rec.get("mtime_ns") != mtime_ns:
+                rec = {"size": size, "mtime_ns": mtime_ns, "docs": self._describe(path)}
+                parsed += 1
+                for doc in rec["docs"]:
+                    if doc.get("error"):
+                        print(f"Failed to load DLC {rel}: {doc['error']}")
+            files[rel] = rec
+
+        headers: Dict[str, dict] = {}
+        specs: Dict[Tuple[str, int], _DocRef] = {}
+        for rel, rec in files.items():
+            bundled = rel.endswith(BUNDLE_EXT)
+            for doc in rec.get("docs", []):
+                ref = (rel, doc.get("name") if bundled else None)
+                head = doc.get("header")
+                if head is not None:
+                    if head["id"] in headers:
+                        print(f"Duplicate DLC id {head['id']!r} in {rel}, ignored")
+                        continue
+                    pack_path = os.path.join(self.dlc_dir, rel if bundled else rel.split("/", 1)[0])
+                    headers[head["id"]] = dict(head, _path=pack_path, _file=rel, _doc=ref[1])
+                elif doc.get("spec"):
+                    specs.setdefault((doc["spec"][0], doc["spec"][1]), ref)
+
+        with self._lock:
+            self._files = files
+            self.headers = headers
+            self.specs = specs
+        if files != old:
+            self._save_manifest()
+        return parsed
+
+    @staticmethod
+    def _describe(path: str) -> List[dict]:
+        if path.endswith(BUNDLE_EXT):
+            try:
+                with DlcBundle(path) as b:
+                    return [dict(_describe_doc(d.get("header", {})), name=d["name"]) for d in b.documents()]
+            except (OSError, ValueError, BundleError) as e:
+                return [{"error": str(e)}]
+        try:
+            data = _read(path)
+        except (OSError, ValueError) as e:
+            return [{"error": str(e)}]
+        if not isinstance(data, dict):
+            return [{"error": "not a JSON object"}]
+        return [_describe_doc(doc_header(data))]
+
+    def _save_manifest(self):
+        try:
+            write_atomic(self.manifest_path, json.dumps(
+                {"version": MANIFEST_VERSION, "files": self._files}, ensure_ascii=False))
+        except OSError as e:
+            print(f"Could not save {self.manifest_path}: {e}")
+
+    # --- bodies ---
+
+    def _cached(self, key: str, path: str, validate: bool, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            hit = self._loaded.get(key)
+        if hit is not None:
+            if not validate or hit[0] == _stamp(path):
+                with self._lock:
+                    if key in self._loaded:
+                        self._loaded.move_to_end(key)
+                return hit[1]
+        stamp = _stamp(path)
+        data = loader()
+        with self._lock:
+            self._loaded[key] = (stamp, data)
+            self._loaded.move_to_end(key)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return data
+
+    def _bundle(self, path: str) -> DlcBundle:
+        stamp = _stamp(path)
+        with self._lock:
+            hit = self._bundles.get(path)
+            if hit is not None and hit[0] == stamp:
+                return hit[1]
+            bundle = DlcBundle(path)
+            self._bundles[path] = (stamp, bundle)
+        if hit is not None:
+            hit[1].close()
+        return bundle
+
+    def _load_ref(self, ref: _DocRef, validate: bool) -> Any:
+        rel, doc = ref
+        path = os.path.join(self.dlc_dir, rel)
+        if doc is None:
+            return self.load_file(path, validate)
+        return self._cached(f"{os.path.abspath(path)}#{doc}", path, validate,
+                            lambda: self._bundle(path).document(doc))
+
+    def load(self, dlc_id: str) -> Optional[dict]:
+        """Full course body (with "_path"), or None for unknown/broken packs."""
+        return self._module(dlc_id, chapters=True)
+
+    def body(self, dlc_id: str) -> Optional[dict]:
+        """Like load(), but a bundled course comes without its chapters (an
+        empty list); read those with chapter(). A loose file is read whole."""
+        return self._module(dlc_id, chapters=False)
+
+    def _module(self, dlc_id: str, chapters: bool) -> Optional[dict]:
+        head = self.headers.get(dlc_id)
+        if head is None:
+            return None
+        rel, doc = head["_file"], head["_doc"]
+        try:
+            if doc is None or chapters:
+                data = self._load_ref((rel, doc), validate=False)
+            else:
+                path = os.path.join(self.dlc_dir, rel)
+                data = self._cached(f"{os.path.abspath(path)}#{doc}#body", path, False,
+                                    lambda: self._bundle(path).body(doc))
+        except (OSError, ValueError, KeyError, BundleError) as e:
+            print(f"Failed to load DLC {rel}: {e}")
+            return None
+        if not isinstance(data, dict) or data.get("id") != dlc_id:
+            return None
+        data["_path"] = head["_path"]
+        return data
+
+    def _loose_chapters(self, dlc_id: str) -> List[Any]:
+        data = self.load(dlc_id)
+        split = chapter_path(data) if data else None
+        if not split:
+            return []
+        node: Any = data
+        for key in split:
+            node = node[key]
+        return node
+
+    def chapter_count(self, dlc_id: str) -> int:
+        head = self.headers.get(dlc_id)
+        if head is None:
+            return 0
+        if head["_doc"] is not None:
+            path = os.path.join(self.dlc_dir, head["_file"])
+            try:
+                return self._bundle(path).chapter_count(head["_doc"])
+            except (OSError, ValueError, BundleError):
+                return 0
+        return len(self._loose_chapters(dlc_id))
+
+    def chapter(self, dlc_id: str, i: int) -> Optional[Any]:
+        """One chapter/lesson; from a bundle only that member is inflated."""
+        head = self.headers.get(dlc_id)
+        if head is None:
+            return None
+        if head["_doc"] is not None:
+            path = os.path.join(self.dlc_dir, head["_file"])
+            try:
+                return self._bundle(path).chapter(head["_doc"], i)
+            except (OSError, ValueError, BundleError):
+                return None
+        node = self._loose_chapters(dlc_id)
+        return node[i] if 0 <= i < len(node) else None
+
+    def spec(self, course_id: str, day: int) -> Optional[dict]:
+        """A day spec by course and day, revalidated against its file. Raises OSError/ValueError."""
+        ref = self.specs.get((course_id, day))
+        if ref is None:
+            return None
+        return self._load_ref(ref, validate=True)
+
+    def load_file(self, path: str, validate: bool = True) -> Any:
+        """
+        Parsed JSON of ``path`` from the LRU cache. With ``validate`` the
+        cached copy is checked against the file's size/mtime first (for
+        files edited while the app runs). Raises OSError/ValueError.
+        """
+        path = os.path.abspath(path)
+        return self._cached(path, path, validate, lambda: _read(path))
+
+    def loaded(self) -> List[str]:
+        """Keys of the bodies currently held, least recently used first."""
+        with self._lock:
+            return list(self._loaded)
+
+    def close(self):
+        with self._lock:
+            bundles, self._bundles = self._bundles, {}
+        for _, b in bundles.values():
+            b.close()
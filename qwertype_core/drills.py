@@ -0,0 +1,120 @@
+from __future__ import annotations
+import random
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+
+def weakness(hit: int, miss: int, prior: float = 2.0) -> float:
+    """Smoothed miss rate in [0, 1); unseen keys count as not weak."""
+    return miss / (hit + miss + prior)
+
+
+class _Fenwick:
+    """Binary indexed tree over float weights: point update and prefix search in O(log n)."""
+    __slots__ = ("n", "tree", "values")
+
+    def __init__(self, weights: Sequence[float]):
+        self.n = len(weights)
+        self.values = array("d", weights)
+        tree = array("d", [0.0]) * (self.n + 1)
+        for i, w in enumerate(weights, 1):
+            tree[i] += w
+            j = i + (i & -i)
+            if j <= self.n:
+                tree[j] += tree[i]
+        self.tree = tree
+
+    def total(self) -> float:
+        s = 0.0
+        i = self.n
+        while i > 0:
+            s += self.tree[i]
+            i -= i & -i
+        return s
+
+    def set(self, idx: int, w: float):
+        delta = w - self.values[idx]
+        if delta == 0.0:
+            return
+        self.values[idx] = w
+        i = idx + 1
+        while i <= self.n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def find(self, u: float) -> int:
+        """Index of the component whose cumulative range contains ``u``."""
+        pos = 0
+        step = 1 << self.n.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and self.tree[nxt] <= u:
+                pos = nxt
+                u -= self.tree[nxt]
+            step >>= 1
+        return min(pos, self.n - 1)
+
+
+class DrillSampler:
+    """
+    Weighted item selection for adaptive drills.
+
+    An item's weight is ``1 + Σ char_alpha·weakness(c) + Σ bigram_alpha·weakness(b)``
+    over the characters and bigrams it contains. Instead of scoring items, the
+    sampler keeps one mixture component per character / bigram (weight =
+    alpha · weakness · occurrences in the corpus) plus a uniform component,
+    and draws an item uniformly from the chosen component's occurrence list.
+    This picks items with exactly the weights above, costs O(log K) per draw
+    (K = distinct chars + bigrams, independent of the corpus size), and a new
+    miss only touches the component of the key involved.
+
+    With no recorded misses every item is equally likely, as before.
+    """
+    CHAR_ALPHA = 4.0
+    BIGRAM_ALPHA = 2.0
+
+    def __init__(self, items: List[str], rng: Optional[random.Random] = None):
+        self.items = items
+        self.rng = rng or random
+        self._slot: Dict[str, int] = {}    # char or bigram -> component index
+        self._alpha: List[float] = [0.0]
+        self._occ: List[array] = [array("I")]
+        self._build()
+        self._tree = _Fenwick([float(len(items))] + [0.0] * (len(self._occ) - 1))
+
+    def _build(self):
+        slot = self._slot
+        occ = self._occ
+        alpha = self._alpha
+
+        def index(key: str, a: float, i: int):
+            k = slot.get(key)
+            if k is None:
+                k = slot[key] = len(occ)
+                occ.append(array("I"))
+                alpha.append(a)
+            occ[k].append(i)
+
+        for i, item in enumerate(self.items):
+            prev = ""
+            for ch in item:
+                index(ch, self.CHAR_ALPHA, i)
+                if prev:
+                    index(prev + ch, self.BIGRAM_ALPHA, i)
+                prev = ch
+
+    def set_weakness(self, key: str, w: float):
+        """Update the weakness of one char or bigram (no-op if the corpus lacks it)."""
+        k = self._slot.get(key)
+        if k is not None:
+            self._tree.set(k, self._alpha[k] * w * len(self._occ[k]))
+
+    def pick(self) -> str:
+        if not self.items:
+            return ""
+        u = self.rng.random() * self._tree.total()
+        k = self._tree.find(u)
+        if k == 0 or not self._occ[k]:
+            return self.items[int(self.rng.random() * len(self.items))]
+        occ = self._occ[k]
+        return self.items[occ[int(self.rng.random() * len(occ))]]
@@ -0,0 +1,66 @@
+from __future__ import annotations
+from concurrent.futures import Future
+from threading import Lock
+from typing import Callable, Dict, Optional, Set
+
+
+class GenerationToken:
+    """Snapshot of a channel's generation; stale once the channel is cancelled."""
+    __slots__ = ("_tracker", "channel", "generation")
+
+    def __init__(self, tracker: "ChannelTracker", channel: str, generation: int):
+        self._tracker = tracker
+        self.channel = channel
+        self.generation = generation
+
+    @property
+    def current(self) -> bool:
+        return self._tracker.generation(self.channel) == self.generation
+
+
+class ChannelTracker:
+    """
+    Bookkeeping for an executor (NetLoop): futures grouped into named
+    channels, each with a generation counter.
+
+    ``cancel(channel)`` cancels that channel's outstanding futures and bumps
+    its generation, so results that still arrive can be recognised as
+    superseded (``token.current`` is False) and discarded by the caller.
+    """
+    def __init__(self):
+        self._lock = Lock()
+        self._generations: Dict[str, int] = {}
+        self._futures: Dict[str, Set[Future]] = {}
+        self._closed = False
+
+    def generation(self, channel: str) -> int:
+        return self._generations.get(channel, 0)
+
+    def token(self, channel: str) -> GenerationToken:
+        return GenerationToken(self, channel, self.generation(channel))
+
+    def _track(self, channel: str, start: Callable[[], Future]) -> Optional[Future]:
+        with self._lock:
+            if self._closed:
+                return None
+            fut = start()
+            self._futures.setdefault(channel, set()).add(fut)
+        fut.add_done_callback(lambda f: self._forget(channel, f))
+        return fut
+
+    def _forget(self, channel: str, fut: Future):
+        with self._lock:
+            futs = self._futures.get(channel)
+            if futs is not None:
+                futs.discard(fut)
+
+    def cancel(self, channel: Optional[str] = None):
+        """Supersede everything submitted so far on ``channel`` (all channels if None)."""
+        with self._lock:
+            channels = [channel] if channel is not None else list(set(self._futures) | set(self._generations))
+            for ch in channels:
+                self._generations[ch] = self._generations.get(ch, 0) + 1
+            futs = [f for ch in channels for f in self._futures.get(ch, ())]
+        for f in futs:
+            f.cancel()
+
@@ -0,0 +1,153 @@
+from __future__ import annotations
+import os
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id         INTEGER PRIMARY KEY,
+    ts         INTEGER NOT NULL,
+    mode       TEXT    NOT NULL,
+    name       TEXT    NOT NULL DEFAULT '',
+    wpm        REAL    NOT NULL,
+    accuracy   REAL    NOT NULL,
+    points     INTEGER NOT NULL,
+    duration   REAL,
+    layout     TEXT,
+    keystrokes INTEGER,
+    mistakes   INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_mode_ts ON sessions (mode, ts);
+CREATE INDEX IF NOT EXISTS idx_sessions_mode_points ON sessions (mode, points);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class ScoreHistory:
+    """
+    Every finished session, in SQLite (WAL). All per-mode queries are
+    answered from the (mode, ts) / (mode, points) indexes, so they stay in
+    the millisecond range over tens of thousands of sessions.
+
+    Entries returned by ``best``/``top`` use the highscores.json shape:
+    {"name", "points", "wpm", "acc", "ts"}.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            self.db.executescript(_SCHEMA)
+            self.db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self):
+        self.db.close()
+
+    # --- writing ---
+
+    def add(self, mode: str, name: str, wpm: float, accuracy: float, points: int,
+            duration: Optional[float] = None, layout: Optional[str] = None,
+            keystrokes: Optional[int] = None, mistakes: Optional[int] = None,
+            ts: Optional[int] = None) -> int:
+        with self.db:
+            cur = self.db.execute(
+                "INSERT INTO sessions (ts, mode, name, wpm, accuracy, points, duration, layout, keystrokes, mistakes)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (int(ts if ts is not None else time.time()), mode, name, float(wpm), float(accuracy),
+                 int(points), duration, layout, keystrokes, mistakes),
+            )
+        return cur.lastrowid
+
+    def import_highscores(self, highscores: Dict[str, Optional[dict]]) -> int:
+        """One-time migration of the old single-best highscores.json; returns rows added."""
+        if self._meta("migrated_highscores_json"):
+            return 0
+        rows = []
+        for mode, e in (highscores or {}).items():
+            if not isinstance(e, dict):
+                continue
+            rows.append((int(e.get("ts") or time.time()), mode, str(e.get("name") or ""),
+                         float(e.get("wpm") or 0.0), float(e.get("acc") or 0.0), int(e.get("points") or 0)))
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO sessions (ts, mode, name, wpm, accuracy, points) VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._set_meta("migrated_highscores_json", str(int(time.time())))
+        return len(rows)
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # --- queries ---
+
+    @staticmethod
+    def _entry(row) -> dict:
+        name, points, wpm, acc, ts = row
+        return {"name": name, "points": points, "wpm": wpm, "acc": acc, "ts": ts}
+
+    def top(self, mode: str, limit: int = 10) -> List[dict]:
+        rows = self.db.execute(
+            "SELECT name, points, wpm, accuracy, ts FROM sessions WHERE mode = ?"
+            " ORDER BY points DESC, ts ASC LIMIT ?", (mode, limit)).fetchall()
+        return [self._entry(r) for r in rows]
+
+    def best(self, mode: str) -> Optional[dict]:
+        top = self.top(mode, 1)
+        return top[0] if top else None
+
+    def bests(self, modes: Iterable[str]) -> Dict[str, Optional[dict]]:
+        return {m: self.best(m) for m in modes}
+
+    def count(self, mode: str) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM sessions WHERE mode = ?", (mode,)).fetchone()[0]
+
+    def recent(self, mode: str, limit: int = 20) -> List[dict]:
+        rows = self.db.execute(
+            "SELECT name, points, wpm, accuracy, ts FROM sessions WHERE mode = ?"
+            " ORDER BY ts DESC LIMIT ?", (mode, limit)).fetchall()
+        return [self._entry(r) for r in rows]
+
+    def trend(self, mode: str, days: int = 30) -> List[Tuple[str, int, float, float]]:
+        """Per day (local date) over the last ``days`` days, today included:
+        (date, sessions, avg wpm, avg accuracy)."""
+        since = int(datetime.combine(date.today() - timedelta(days=days - 1), datetime.min.time()).timestamp())
+        return self.db.execute(
+            "SELECT date(ts, 'unixepoch', 'localtime') AS day, COUNT(*), AVG(wpm), AVG(accuracy)"
+            " FROM sessions WHERE mode = ? AND ts >= ? GROUP BY day ORDER BY day",
+            (mode, since)).fetchall()
+
+    def points_percentiles(self, mode: str, pcts: Iterable[float] = (50, 90, 99)) -> Dict[float, int]:
+        """Points at the given percentiles, read by offset from the (mode, points) index."""
+        n = self.count(mode)
+        out: Dict[float, int] = {}
+        if not n:
+            return out
+        for p in pcts:
+            k = min(n - 1, max(0, int(round(p / 100.0 * (n - 1)))))
+            out[p] = self.db.execute(
+                "SELECT points FROM sessions WHERE mode = ? ORDER BY points LIMIT 1 OFFSET ?",
+                (mode, k)).fetchone()[0]
+        return out
+
+    def percentile_of(self, mode: str, points: int) -> float:
+        """Share of sessions in ``mode`` (0..100) that scored at most ``points``."""
+        n = self.count(mode)
+        if not n:
+            return 100.0
+        below = self.db.execute(
+            "SELECT COUNT(*) FROM sessions WHERE mode = ? AND points <= ?", (mode, int(points))).fetchone()[0]
+        return below * 100.0 / n
@@ -0,0 +1,229 @@
+from __future__ import annotations
+import json
+import os
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+HANDS = ("left", "right")
+FINGERS = ("pinky", "ring", "middle", "index", "thumb")
+
+
+class LayoutError(ValueError):
+    """Raised when a layout file is missing or does not validate."""
+
+
+@dataclass(frozen=True)
+class KeyDef:
+    kid: str
+    label: str
+    label2: str = ""
+    w: float = 1.0
+    is_spacer: bool = False
+    hand: str = "left"
+    finger: str = "index"
+
+
+class LayoutTable:
+    """
+    Precomputed lookups for one layout (built once, afterwards plain dict hits):
+    char -> kid, kid -> (hand, finger), kid -> hand.
+    Upper-case variants are pre-entered so the hot path needs no lower().
+    """
+    __slots__ = ("name", "right_kids", "char_to_kid", "kid_to_hand", "kid_to_finger")
+
+    def __init__(self, name: str, chars: Dict[str, str], shifted: Dict[str, str],
+                 hands: Dict[str, str], fingers: Dict[str, str]):
+        self.name = name
+
+        self.char_to_kid: Dict[str, str] = {" ": "Space"}
+        self.char_to_kid.update(chars)
+        for ch, kid in chars.items():
+            up = ch.upper()
+            if len(up) == 1 and up not in chars and up not in shifted:
+                self.char_to_kid[up] = kid
+        for ch, kid in shifted.items():
+            self.char_to_kid.setdefault(ch, kid)
+
+        kids = set(hands) | set(fingers) | set(self.char_to_kid.values())
+        self.kid_to_hand: Dict[str, str] = {k: hands.get(k, "left") for k in kids}
+        self.kid_to_finger: Dict[str, Tuple[str, str]] = {
+            k: (self.kid_to_hand[k], fingers.get(k, "index")) for k in kids
+        }
+        self.right_kids = frozenset(k for k, h in self.kid_to_hand.items() if h == "right")
+
+    def kid(self, ch: str) -> Optional[str]:
+        if not ch:
+            return None
+        kid = self.char_to_kid.get(ch)
+        if kid is None and len(ch) > 1:
+            kid = self.char_to_kid.get(ch.lower())
+        return kid
+
+    def hand(self, kid: Optional[str]) -> str:
+        if not kid:
+            return "unknown"
+        return self.kid_to_hand.get(kid, "left")
+
+    def finger(self, kid: Optional[str]) -> Tuple[str, str]:
+        if not kid:
+            return ("unknown", "index")
+        return self.kid_to_finger.get(kid) or ("left", "index")
+
+
+@dataclass(frozen=True)
+class Layout:
+    """Parsed, validated keyboard layout. Immutable; shared by every caller."""
+    id: str
+    name: str
+    rows: Tuple[Tuple[KeyDef, ...], ...]
+    table: LayoutTable
+
+
+def _parse_key(raw: Any, where: str) -> KeyDef:
+    if not isinstance(raw, dict):
+        raise LayoutError(f"{where}: key must be an object")
+    kid = raw.get("kid")
+    if not isinstance(kid, str) or not kid:
+        raise LayoutError(f"{where}: missing 'kid'")
+    label = raw.get("label", "")
+    label2 = raw.get("label2", "")
+    if not isinstance(label, str) or not isinstance(label2, str):
+        raise LayoutError(f"{where} ({kid}): labels must be strings")
+    w = raw.get("w", 1.0)
+    if not isinstance(w, (int, float)) or w <= 0:
+        raise LayoutError(f"{where} ({kid}): 'w' must be a positive number")
+    hand = raw.get("hand", "left")
+    if hand not in HANDS:
+        raise LayoutError(f"{where} ({kid}): unknown hand '{hand}'")
+    finger = raw.get("finger", "index")
+    if finger not in FINGERS:
+        raise LayoutError(f"{where} ({kid}): unknown finger '{finger}'")
+    return KeyDef(kid, label, label2, float(w), bool(raw.get("is_spacer", False)), hand, finger)
+
+
+def _parse_char_map(raw: Any, field: str, kids: set, lid: str) -> Dict[str, str]:
+    if raw is None:
+        return {}
+    if not isinstance(raw, dict):
+        raise LayoutError(f"{lid}: '{field}' must be an object")
+    out: Dict[str, str] = {}
+    for ch, kid in raw.items():
+        if len(ch) != 1:
+            raise LayoutError(f"{lid}: '{field}' key {ch!r} must be a single character")
+        if kid not in kids:
+            raise LayoutError(f"{lid}: '{field}' maps {ch!r} to unknown key '{kid}'")
+        out[ch] = kid
+    return out
+
+
+def parse_layout(data: Dict[str, Any], source: str = "<layout>") -> Layout:
+    """Validate a layout definition (as loaded from JSON) and compile it."""
+    if not isinstance(data, dict):
+        raise LayoutError(f"{source}: layout must be an object")
+    lid = data.get("id")
+    if not isinstance(lid, str) or not lid:
+        raise LayoutError(f"{source}: missing 'id'")
+    raw_rows = data.get("rows")
+    if not isinstance(raw_rows, list) or not raw_rows:
+        raise LayoutError(f"{lid}: 'rows' must be a non-empty list")
+
+    rows: List[Tuple[KeyDef, ...]] = []
+    seen: set = set()
+    for ri, raw_row in enumerate(raw_rows):
+        if not isinstance(raw_row, list) or not raw_row:
+            raise LayoutError(f"{lid}: row {ri} must be a non-empty list")
+        row = []
+        for ki, raw_key in enumerate(raw_row):
+            kd = _parse_key(raw_key, f"{lid} row {ri} key {ki}")
+            if not kd.is_spacer:
+                if kd.kid in seen:
+                    raise LayoutError(f"{lid}: duplicate key '{kd.kid}'")
+                seen.add(kd.kid)
+            row.append(kd)
+        rows.append(tuple(row))
+
+    chars = _parse_char_map(data.get("chars"), "chars", seen, lid)
+    shifted = _parse_char_map(data.get("shifted"), "shifted", seen, lid)
+
+    keys = [kd for row in rows for kd in row if not kd.is_spacer]
+    table = LayoutTable(
+        lid, chars, shifted,
+        {kd.kid: kd.hand for kd in keys},
+        {kd.kid: kd.finger for kd in keys},
+    )
+    return Layout(lid, str(data.get("name") or lid), tuple(rows), table)
+
+
+class LayoutRegistry:
+    """
+    Loads layout definitions from ``<layout_dir>/*.json``.
+    Every file is parsed and validated at most once; the resulting Layout
+    objects are immutable and cached. Unknown or broken layouts fall back
+    to ``default``.
+    """
+    def __init__(self, layout_dir: str, default: str = "US"):
+        self.layout_dir = layout_dir
+        self.default = default.upper()
+        self._lock = Lock()
+        self._files: Optional[Dict[str, str]] = None  # ID -> path
+        self._cache: Dict[str, Layout] = {}
+        self._errors: Dict[str, str] = {}
+
+    def _index(self) -> Dict[str, str]:
+        if self._files is None:
+            files: Dict[str, str] = {}
+            try:
+                names = sorted(os.listdir(self.layout_dir))
+            except OSError:
+                names = []
+            for fn in names:
+                if fn.endswith(".json"):
+                    files[os.path.splitext(fn)[0].upper()] = os.path.join(self.layout_dir, fn)
+            self._files = files
+        return self._files
+
+    def ids(self) -> List[str]:
+        return list(self._index().keys())
+
+    def available(self) -> List[Tuple[str, str]]:
+        """(id, display name) for every layout that validates."""
+        out = []
+        for lid in self.ids():
+            lay = self._load(lid)
+            if lay:
+                out.append((lay.id, lay.name))
+        return out
+
+    def _load(self, key: str) -> Optional[Layout]:
+        lay = self._cache.get(key)
+        if lay is not None or key in self._errors:
+            return lay
+        with self._lock:
+            lay = self._cache.get(key)
+            if lay is not None or key in self._errors:
+                return lay
+            path = self._index().get(key)
+            if not path:
+                self._errors[key] = "not found"
+                return None
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                lay = parse_layout(data, path)
+            except (OSError, ValueError) as e:
+                print(f"Failed to load layout {path}: {e}")
+                self._errors[key] = str(e)
+                return None
+            self._cache[key] = lay
+            return lay
+
+    def get(self, name: Optional[str]) -> Layout:
+        key = (name or self.default).upper()
+        lay = self._load(key) or self._load(self.default)
+        if lay is None:
+            raise LayoutError(f"No usable layout '{key}' and default '{self.default}' is missing in {self.layout_dir}")
+        return lay
+
+    def table(self, name: Optional[str]) -> LayoutTable:
+        return self.get(name).table
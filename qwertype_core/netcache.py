@@ -0,0 +1,152 @@
+from __future__ import annotations
+import time
+from collections import OrderedDict
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+# fetch(etag) -> (value, etag); value NOT_MODIFIED means "304, keep what you have".
+# With ``asynchronous=True`` fetch returns an awaitable of that pair instead.
+NOT_MODIFIED = object()
+Fetch = Callable[[Optional[str]], Tuple[Any, Optional[str]]]
+
+
+def _thread_submit(fn: Callable[[], None]):
+    Thread(target=fn, daemon=True).start()
+    return True
+
+
+class _Entry:
+    __slots__ = ("value", "etag", "fetched_at", "ttl")
+
+    def __init__(self, value, etag, ttl):
+        self.value = value
+        self.etag = etag
+        self.fetched_at = time.monotonic()
+        self.ttl = ttl
+
+    def fresh(self) -> bool:
+        return time.monotonic() - self.fetched_at < self.ttl
+
+
+class ResponseCache:
+    """
+    Small LRU cache for HTTP GET results.
+
+    * fresh entries are answered immediately, without a request
+    * stale entries are answered immediately too, then revalidated in the
+      background (``If-None-Match`` via the fetch's etag argument); callers
+      are called again only if the server sent something new
+    * concurrent requests for the same key share one in-flight fetch
+
+    Callbacks run on the fetching thread for network results and on the
+    caller's thread for cached ones; Qt users pass a signal's ``emit``.
+    ``submit`` schedules the fetch job: a callable (a thread per fetch by
+    default, or a pool's submit), or a coroutine when ``asynchronous`` is
+    set (an event loop's submit). A returned Future that gets cancelled
+    fails its waiters.
+    """
+    def __init__(self, max_entries: int = 64, submit: Callable[[Any], Any] = _thread_submit,
+                 asynchronous: bool = False):
+        self.max_entries = max_entries
+        self.submit = submit
+        self.asynchronous = asynchronous
+        self._lock = Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        # key -> [(on_value, on_error, wants_unchanged)]
+        self._inflight: Dict[Hashable, List[Tuple[Callable, Optional[Callable], bool]]] = {}
+
+    def get(self, key: Hashable, fetch: Fetch, on_value: Callable[[Any], None],
+            on_error: Optional[Callable[[], None]] = None, ttl: float = 60.0):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if entry.fresh():
+                    value, start = entry.value, False
+                else:
+                    # stale-while-revalidate: answer now, refresh behind it
+                    value = entry.value
+                    start = self._join(key, (on_value, None, False))
+            else:
+                value = None
+                start = self._join(key, (on_value, on_error, True))
+            etag = entry.etag if entry is not None else None
+
+        if entry is not None:
+            on_value(value)
+        if start:
+            if self.asynchronous:
+                fut = self.submit(self._arun(key, fetch, etag, ttl))
+            else:
+                fut = self.submit(lambda: self._run(key, fetch, etag, ttl))
+            if fut is None:
+                self._abandon(key)
+            elif hasattr(fut, "add_done_callback"):
+                fut.add_done_callback(lambda f: f.cancelled() and self._abandon(key))
+
+    def _abandon(self, key):
+        """The fetch failed or was cancelled: release (and fail) its waiters."""
+        with self._lock:
+            waiters = self._inflight.pop(key, [])
+        for _, on_error, _ in waiters:
+            if on_error is not None:
+                on_error()
+
+    def _join(self, key, waiter) -> bool:
+        waiters = self._inflight.get(key)
+        if waiters is not None:
+            waiters.append(waiter)
+            return False
+        self._inflight[key] = [waiter]
+        return True
+
+    def _run(self, key, fetch: Fetch, etag: Optional[str], ttl: float):
+        try:
+            value, new_etag = fetch(etag)
+        except Exception:
+            self._abandon(key)
+            return
+        self._resolve(key, value, new_etag, ttl)
+
+    async def _arun(self, key, fetch, etag: Optional[str], ttl: float):
+        try:
+            value, new_etag = await fetch(etag)
+        except Exception:
+            self._abandon(key)
+            return
+        self._resolve(key, value, new_etag, ttl)
+
+    def _resolve(self, key, value, new_etag: Optional[str], ttl: float):
+        with self._lock:
+            entry = self._entries.get(key)
+            changed = True
+            if value is NOT_MODIFIED and entry is not None:
+                entry.fetched_at = time.monotonic()
+                entry.ttl = ttl
+                changed = False
+            elif value is not NOT_MODIFIED:
+                self._entries[key] = entry = _Entry(value, new_etag, ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            waiters = self._inflight.pop(key, [])
+            value = entry.value if entry is not None else None
+
+        for on_value, on_error, wants_unchanged in waiters:
+            if entry is None:
+                if on_error is not None:
+                    on_error()
+            elif changed or wants_unchanged:
+                on_value(value)
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry is not None else None
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
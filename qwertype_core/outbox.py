@@ -0,0 +1,123 @@
+from __future__ import annotations
+import json
+import os
+import uuid
+from threading import Lock
+from typing import Dict, Iterable, List, Tuple
+
+# Append-only journal, one JSON object per line:
+#   {"add": "<id>", "item": {...}}   queued
+#   {"ack": ["<id>", ...]}           delivered
+# Replaying the journal yields everything added but not yet acked. A torn
+# last line (crash mid-write) is skipped. The file is compacted (rewritten
+# with only the pending entries, via temp file + rename) when acked entries
+# dominate it.
+#
+# Items the server refuses for good are moved to a side file
+# (<name>.rejected<ext>, one {"id", "item", "reason"} per line) and acked,
+# so one bad item never holds up the ones queued after it.
+
+
+class Outbox:
+    """Durable FIFO of items waiting to be uploaded."""
+    COMPACT_MIN_LINES = 64
+
+    def __init__(self, path: str):
+        self.path = path
+        root, ext = os.path.splitext(path)
+        self.rejected_path = f"{root}.rejected{ext}"
+        self._lock = Lock()
+        self._pending: Dict[str, dict] = {}  # insertion ordered
+        self._lines = 0
+        self._replay()
+
+    def _replay(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    self._lines += 1
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    if "add" in rec:
+                        self._pending[rec["add"]] = rec.get("item") or {}
+                    for rid in rec.get("ack", ()):
+                        self._pending.pop(rid, None)
+        except OSError:
+            return
+        if self._lines > len(self._pending):
+            self._compact()
+
+    def _append(self, records: Iterable[dict]):
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        d = os.path.dirname(self.path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._lines += data.count("\n")
+
+    def _compact(self):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                for rid, item in self._pending.items():
+                    f.write(json.dumps({"add": rid, "item": item}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self._lines = len(self._pending)
+        except OSError as e:
+            print(f"Outbox compaction failed: {e}")
+
+    def add(self, item: dict) -> str:
+        rid = uuid.uuid4().hex
+        with self._lock:
+            self._pending[rid] = item
+            try:
+                self._append([{"add": rid, "item": item}])
+            except OSError as e:
+                # still queued in memory for this run
+                print(f"Outbox write failed: {e}")
+        return rid
+
+    def pending(self, limit: int = 0) -> List[Tuple[str, dict]]:
+        with self._lock:
+            items = list(self._pending.items())
+        return items[:limit] if limit else items
+
+    def ack(self, ids: Iterable[str]):
+        ids = [rid for rid in ids]
+        if not ids:
+            return
+        with self._lock:
+            for rid in ids:
+                self._pending.pop(rid, None)
+            try:
+                self._append([{"ack": ids}])
+            except OSError as e:
+                print(f"Outbox write failed: {e}")
+            if self._lines >= self.COMPACT_MIN_LINES and self._lines > 2 * len(self._pending):
+                self._compact()
+
+    def reject(self, ids: Iterable[str], reason: str):
+        """Set items aside in the rejected file and ack them."""
+        ids = [rid for rid in ids]
+        with self._lock:
+            records = [{"id": rid, "item": self._pending[rid], "reason": reason}
+                       for rid in ids if rid in self._pending]
+        if records:
+            try:
+                with open(self.rejected_path, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError as e:
+                print(f"Outbox write failed: {e}")
+        self.ack(ids)
+
+    def __len__(self) -> int:
+        return len(self._pending)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .history import ScoreHistory
+from .store import JsonStore
+
+# data/profiles/index.json lists the profiles and which one is active.
+# Each profile owns a directory with its settings.json, history.sqlite3,
+# coach_stats.json and sessions/. The first profile ("default") lives
+# directly in data/, so installs from before profiles keep their files.
+
+
+class Profile:
+    """One user's stores; each is opened on first access only."""
+    def __init__(self, pid: str, name: str, directory: str, settings_defaults: dict):
+        self.id = pid
+        self.name = name
+        self.dir = directory
+        self._settings_defaults = settings_defaults
+        self._settings: Optional[JsonStore] = None
+        self._history: Optional[ScoreHistory] = None
+        self._coach_stats: Optional[JsonStore] = None
+
+    @property
+    def settings(self) -> JsonStore:
+        if self._settings is None:
+            self._settings = JsonStore(os.path.join(self.dir, "settings.json"), self._settings_defaults)
+        return self._settings
+
+    @property
+    def history(self) -> ScoreHistory:
+        if self._history is None:
+            self._history = ScoreHistory(os.path.join(self.dir, "history.sqlite3"))
+        return self._history
+
+    @property
+    def coach_stats(self) -> JsonStore:
+        """Per-key hit/miss counters of the typing coach."""
+        if self._coach_stats is None:
+            self._coach_stats = JsonStore(os.path.join(self.dir, "coach_stats.json"), {}, indent=None)
+        return self._coach_stats
+
+    @property
+    def sessions_dir(self) -> str:
+        return os.path.join(self.dir, "sessions")
+
+    def flush(self):
+        for store in (self._settings, self._coach_stats):
+            if store is not None:
+                store.flush()
+
+    def close(self):
+        self.flush()
+        if self._history is not None:
+            self._history.close()
+            self._history = None
+
+
+class ProfileIndex:
+    DEFAULT_ID = "default"
+
+    def __init__(self, data_dir: str, settings_defaults: dict):
+        self.data_dir = data_dir
+        self.settings_defaults = settings_defaults
+        self._index = JsonStore(os.path.join(data_dir, "profiles", "index.json"), {
+            "active": self.DEFAULT_ID,
+            "profiles": [{"id": self.DEFAULT_ID, "name": "", "dir": "."}],
+        })
+        self._loaded: Dict[str, Profile] = {}
+
+    def _record(self, pid: str) -> Optional[dict]:
+        for rec in self._index.data.get("profiles", []):
+            if rec.get("id") == pid:
+                return rec
+        return None
+
+    def profiles(self) -> List[Tuple[str, str]]:
+        """(id, display name) of every profile."""
+        return [(r["id"], r.get("name") or r["id"]) for r in self._index.data.get("profiles", [])]
+
+    def get(self, pid: str) -> Profile:
+        prof = self._loaded.get(pid)
+        if prof is None:
+            rec = self._record(pid) or self._record(self.DEFAULT_ID)
+            if rec is None:
+                raise KeyError(pid)
+            prof = Profile(rec["id"], rec.get("name", ""),
+                           os.path.normpath(os.path.join(self.data_dir, rec.get("dir", "."))),
+                           self.settings_defaults)
+            self._loaded[prof.id] = prof
+        return prof
+
+    def active(self) -> Profile:
+        return self.get(self._index.data.get("active") or self.DEFAULT_ID)
+
+    def activate(self, pid: str) -> Profile:
+        prof = self.get(pid)
+        if self._index.data.get("active") != prof.id:
+            self._index.data["active"] = prof.id
+            self._index.save()
+        return prof
+
+    def create(self, name: str) -> Profile:
+        base = re.sub(r"[^a-z0-9]+", "-", name.casefold()).strip("-")[:24] or "profile"
+        pid, n = base, 2
+        while self._record(pid) is not None:
+            pid, n = f"{base}-{n}", n + 1
+        self._index.data.setdefault("profiles", []).append({
+            "id": pid, "name": name, "dir": os.path.join("profiles", pid), "created": int(time.time()),
+        })
+        self._index.save()
+        return self.get(pid)
+
+    def rename(self, pid: str, name: str):
+        rec = self._record(pid)
+        if rec is not None and rec.get("name") != name:
+            rec["name"] = name
+            self._index.save()
+            if pid in self._loaded:
+                self._loaded[pid].name = name
+
+    def close(self):
+        for prof in self._loaded.values():
+            prof.close()
+        self._index.flush()
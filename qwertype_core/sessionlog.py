@@ -0,0 +1,226 @@
+from __future__ import annotations
+import mmap
+import os
+import queue
+import struct
+import time
+from datetime import datetime
+from threading import Thread
+from typing import Iterator, List, NamedTuple, Optional
+
+# One file per session: a fixed header followed by fixed-width keystroke
+# records. Record count is derived from the file size, so a truncated tail
+# (crash while writing) is simply ignored by readers.
+#
+# header (64 bytes):  magic, version, record size, start epoch, mode, layout
+# record (32 bytes):  dt since previous key (ms), expected / typed code point,
+#                     flags (bit 0 = correct), key id (ASCII, NUL padded)
+MAGIC = b"QTSL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHd24s8s16x")
+RECORD = struct.Struct("<III B3x16s")
+FLAG_CORRECT = 0x01
+FILE_EXT = ".qts"
+
+
+class Keystroke(NamedTuple):
+    dt_ms: int
+    expected: str
+    typed: str
+    correct: bool
+    kid: str
+
+
+class SessionHeader(NamedTuple):
+    started: float
+    mode: str
+    layout: str
+
+
+def _fixed(text: Optional[str], size: int) -> bytes:
+    return (text or "").encode("ascii", "replace")[:size]
+
+
+def _unfixed(raw: bytes) -> str:
+    return raw.rstrip(b"\0").decode("ascii", "replace")
+
+
+def _cp(ch: Optional[str]) -> int:
+    return ord(ch[0]) if ch else 0
+
+
+class SessionLog:
+    """
+    Read-only, memory-mapped view of one session file.
+    Records are decoded on access; nothing is parsed up front.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError(f"{path}: not a session log")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rec_size, started, mode, layout = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or rec_size != RECORD.size:
+            self._mm.close()
+            raise ValueError(f"{path}: unsupported session log")
+        self.header = SessionHeader(started, _unfixed(mode), _unfixed(layout))
+        self._count = (size - HEADER.size) // RECORD.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> Keystroke:
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        dt, exp, typed, flags, kid = RECORD.unpack_from(self._mm, HEADER.size + i * RECORD.size)
+        return Keystroke(dt, chr(exp) if exp else "", chr(typed) if typed else "",
+                         bool(flags & FLAG_CORRECT), _unfixed(kid))
+
+    def __iter__(self) -> Iterator[Keystroke]:
+        for i in range(self._count):
+            yield self[i]
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def list_sessions(log_dir: str) -> List[str]:
+    """Session files in ``log_dir``, oldest first (file names sort by start time)."""
+    try:
+        names = sorted(os.listdir(log_dir))
+    except OSError:
+        return []
+    return [os.path.join(log_dir, n) for n in names if n.endswith(FILE_EXT)]
+
+
+_STOP = object()
+
+
+class SessionLogWriter:
+    """
+    Writes keystrokes of the running session to a new ``<log_dir>/<start>-<mode>.qts``
+    (start to the millisecond).
+
+    The UI thread only timestamps the key and puts a tuple on a queue; packing
+    and all file I/O happen on one background thread, so ``record`` never
+    waits for the disk.
+    """
+    def __init__(self, log_dir: str):
+        self.log_dir = log_dir  # may be changed between sessions (profile switch)
+        self._q: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._last: Optional[float] = None
+        self._active = False
+        self._thread = Thread(target=self._run, name="session-log", daemon=True)
+        self._thread.start()
+
+    def begin(self, mode: str, layout: str):
+        if self._active:
+            self.end()
+        now = time.time()
+        self._last = time.perf_counter()
+        self._active = True
+        self._q.put(("begin", self.log_dir, now, mode, layout))
+
+    def record(self, expected: str, typed: str, correct: bool, kid: Optional[str]):
+        if not self._active:
+            return
+        t = time.perf_counter()
+        dt = int((t - self._last) * 1000.0)
+        self._last = t
+        self._q.put(("key", dt, expected, typed, correct, kid))
+
+    def end(self):
+        if self._active:
+            self._active = False
+            self._q.put(("end",))
+
+    def close(self, timeout: float = 2.0):
+        """Flush pending records and stop the writer thread."""
+        self.end()
+        self._q.put(_STOP)
+        self._thread.join(timeout)
+
+    # --- writer thread ---
+
+    def _open(self, log_dir: str, started: float, mode: str, layout: str):
+        os.makedirs(log_dir, exist_ok=True)
+        stamp = datetime.fromtimestamp(started).strftime("%Y%m%d-%H%M%S-%f")[:-3]
+        safe_mode = "".join(c if c.isalnum() or c in "-_" else "_" for c in mode)[:24]
+        # a new file per session, even for two started in the same millisecond
+        n = 0
+        while True:
+            suffix = f"_{n:02d}" if n else ""  # sorts after the plain name
+            try:
+                f = open(os.path.join(log_dir, f"{stamp}-{safe_mode}{suffix}{FILE_EXT}"), "xb")
+                break
+            except FileExistsError:
+                n += 1
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, started,
+                            _fixed(mode, 24), _fixed(layout, 8)))
+        return f
+
+    def _run(self):
+        f = None
+        buf = bytearray()
+        while True:
+            item = self._q.get()
+            # drain whatever queued up meanwhile and write it in one go
+            batch = [item]
+            try:
+                while len(batch) < 1024:
+                    batch.append(self._q.get_nowait())
+            except queue.Empty:
+                pass
+
+            stop = False
+            for it in batch:
+                if it is _STOP:
+                    stop = True
+                    break
+                kind = it[0]
+                try:
+                    if kind == "key":
+                        if f is not None:
+                            _, dt, exp, typed, correct, kid = it
+                            buf += RECORD.pack(min(dt, 0xFFFFFFFF), _cp(exp), _cp(typed),
+                                               FLAG_CORRECT if correct else 0, _fixed(kid, 16))
+                    elif kind == "begin":
+                        if f is not None:
+                            f.write(buf)
+                            f.close()
+                        buf.clear()
+                        f = self._open(*it[1:])
+                    elif kind == "end" and f is not None:
+                        f.write(buf)
+                        f.close()
+                        buf.clear()
+                        f = None
+                except OSError as e:
+                    print(f"Session log error: {e}")
+                    buf.clear()
+                    if f is not None and not f.closed:
+                        f.close()
+                    f = None
+
+            if f is not None and buf:
+                try:
+                    f.write(buf)
+                    f.flush()
+                except OSError as e:
+                    print(f"Session log error: {e}")
+                    f = None
+                buf.clear()
+            if stop:
+                if f is not None:
+                    f.close()
+                return
@@ -0,0 +1,127 @@
+from __future__ import annotations
+import copy
+import heapq
+import json
+import os
+import time
+from threading import Condition, Lock, Thread
+from typing import Any, List, Optional, Tuple
+
+
+def write_atomic(path: str, text: str):
+    """Write ``text`` to ``path`` via temp file + fsync + rename (never a torn file)."""
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def read_json(path: str, fallback: Any) -> Any:
+    """
+    Load JSON, or return ``fallback`` if the file is missing. A file that
+    does not parse is moved aside to ``<path>.corrupt`` (and reported)
+    instead of being silently overwritten with defaults later.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return fallback
+    except (OSError, ValueError) as e:
+        print(f"Could not read {path}: {e}")
+        try:
+            os.replace(path, path + ".corrupt")
+        except OSError:
+            pass
+        return fallback
+
+
+class _Flusher:
+    """One background thread that writes due stores in deadline order."""
+    def __init__(self):
+        self._cond = Condition()
+        self._heap: List[Tuple[float, int, "JsonStore"]] = []
+        self._seq = 0
+        self._thread: Optional[Thread] = None
+
+    def schedule(self, store: "JsonStore", when: float):
+        with self._cond:
+            self._seq += 1
+            heapq.heappush(self._heap, (when, self._seq, store))
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="store-flush", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                when, _, store = self._heap[0]
+                delay = when - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+            store.flush()
+
+
+_FLUSHER = _Flusher()
+
+
+class JsonStore:
+    """
+    A JSON document with an authoritative in-memory copy.
+
+    ``save()`` only records a snapshot and schedules a write; every save
+    within the ``debounce`` window collapses into one atomic disk write,
+    done off the UI thread. ``flush()`` writes synchronously (use on exit).
+    """
+    def __init__(self, path: str, default: Any, debounce: float = 0.5, indent: Optional[int] = 2):
+        self.path = path
+        self.debounce = debounce
+        self.indent = indent
+        loaded = read_json(path, None)
+        if isinstance(default, dict) and isinstance(loaded, dict):
+            # keys added in newer versions get their defaults
+            self.data = {**default, **loaded}
+        else:
+            self.data = loaded if loaded is not None else copy.deepcopy(default)
+        self._lock = Lock()        # guards _pending/_scheduled (held only briefly)
+        self._write_lock = Lock()  # serializes disk writes, keeps them in order
+        self._pending: Optional[str] = None
+        self._scheduled = False
+
+    def save(self, data: Any = None):
+        if data is not None:
+            self.data = data
+        # serialize now: the caller may keep mutating self.data afterwards
+        text = json.dumps(self.data, ensure_ascii=False, indent=self.indent)
+        with self._lock:
+            self._pending = text
+            if self._scheduled:
+                return
+            self._scheduled = True
+        _FLUSHER.schedule(self, time.monotonic() + self.debounce)
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                text, self._pending = self._pending, None
+                self._scheduled = False
+            if text is None:
+                return
+            try:
+                write_atomic(self.path, text)
+            except OSError as e:
+                print(f"Could not save {self.path}: {e}")
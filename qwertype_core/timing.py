@@ -0,0 +1,74 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List
+
+from .sessionlog import SessionLog
+
+# A typist's rhythm from recorded session logs: the mean interval before a
+# key, per bigram (previous expected char + expected char), with per-char and
+# overall means as fallbacks for pairs seen too rarely. Only a correct key
+# right after a correct key counts, and gaps over MAX_GAP_MS (reading,
+# hesitating, a break) are left out.
+MAX_GAP_MS = 1500
+MIN_SAMPLES = 3
+
+
+class TimingProfile:
+    """Per-bigram inter-key intervals; feeds humanized ghost playback."""
+    def __init__(self):
+        self.bigrams: Dict[str, List[float]] = {}  # "ab" -> [count, total ms] for b after a
+        self.chars: Dict[str, List[float]] = {}    # "b" -> [count, total ms] after anything
+        self.count = 0
+        self.total_ms = 0.0
+
+    @classmethod
+    def from_sessions(cls, paths: Iterable[str]) -> "TimingProfile":
+        prof = cls()
+        for path in paths:
+            try:
+                with SessionLog(path) as log:
+                    prof.add_session(log)
+            except (OSError, ValueError):
+                continue
+        return prof
+
+    def add_session(self, log: SessionLog):
+        prev = ""
+        for k in log:
+            if not k.correct:
+                prev = ""
+                continue
+            if prev and 0 < k.dt_ms <= MAX_GAP_MS:
+                self.add(prev, k.expected, k.dt_ms)
+            prev = k.expected
+
+    def add(self, prev: str, ch: str, dt_ms: float):
+        for table, key in ((self.bigrams, prev + ch), (self.chars, ch)):
+            rec = table.get(key)
+            if rec is None:
+                table[key] = [1, dt_ms]
+            else:
+                rec[0] += 1
+                rec[1] += dt_ms
+        self.count += 1
+        self.total_ms += dt_ms
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def interval(self, prev: str, ch: str) -> float:
+        """Expected ms before ``ch`` when it follows ``prev``."""
+        rec = self.bigrams.get(prev + ch)
+        if rec is None or rec[0] < MIN_SAMPLES:
+            rec = self.chars.get(ch)
+            if rec is None or rec[0] < MIN_SAMPLES:
+                return self.mean_ms
+        return rec[1] / rec[0]
+
+    def intervals(self, text: str, prev: str = "") -> List[float]:
+        """One interval per char of ``text``; ``prev`` is the char typed before it."""
+        out = []
+        for ch in text:
+            out.append(self.interval(prev, ch))
+            prev = ch
+        return out